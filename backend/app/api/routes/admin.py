@@ -1,19 +1,34 @@
 # app/api/routes/admin.py
 
 from fastapi import APIRouter, Depends, HTTPException
-from app.core.dependencies import get_current_user
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from datetime import datetime
+from typing import Any, Dict, Literal, Optional
+from app.core.dependencies import get_current_principal
+from app.core.metrics import collect_metrics
+from app.schemas.user_schema import UserAccessUpdateSchema
+from app.services.export_service import (
+    export_stream,
+    export_media_type,
+    export_headers,
+)
+from app.services.reference_data import get_snapshot, update_reference_table
+from app.services.user_service import update_user_access, revoke_user_tokens
 from app.services.analytics_service import (
     get_overview_metrics,
     get_monthly_advisory_trends,
     get_advisory_by_district,
     get_total_co2_saved,
     get_alternative_mix_distribution,
+    get_analytics_summary,
+    invalidate_analytics,
 )
 
 router = APIRouter()
 
 
-async def require_admin(user=Depends(get_current_user)):
+async def require_admin(user=Depends(get_current_principal)):
     if user.get("role") != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     return user
@@ -25,20 +40,153 @@ async def overview(user=Depends(require_admin)):
 
 
 @router.get("/analytics/monthly")
-async def monthly(year: int, user=Depends(require_admin)):
-    return await get_monthly_advisory_trends(year)
+async def monthly(
+    year: int,
+    district: Optional[str] = None,
+    state: Optional[str] = None,
+    user=Depends(require_admin),
+):
+    return await get_monthly_advisory_trends(year, district, state)
 
 
 @router.get("/analytics/by-district")
-async def by_district(user=Depends(require_admin)):
-    return await get_advisory_by_district()
+async def by_district(
+    state: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user=Depends(require_admin),
+):
+    return await get_advisory_by_district(state, start, end)
 
 
 @router.get("/analytics/co2")
-async def co2(user=Depends(require_admin)):
-    return await get_total_co2_saved()
+async def co2(
+    district: Optional[str] = None,
+    state: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user=Depends(require_admin),
+):
+    return await get_total_co2_saved(district, state, start, end)
 
 
 @router.get("/analytics/alternative-mix")
-async def mix(user=Depends(require_admin)):
-    return await get_alternative_mix_distribution()
\ No newline at end of file
+async def mix(
+    district: Optional[str] = None,
+    state: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user=Depends(require_admin),
+):
+    return await get_alternative_mix_distribution(district, state, start, end)
+
+
+@router.get("/analytics/summary")
+async def summary(
+    year: Optional[int] = None,
+    district: Optional[str] = None,
+    state: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user=Depends(require_admin),
+):
+    return await get_analytics_summary(
+        year or datetime.utcnow().year,
+        district,
+        state,
+        start,
+        end,
+    )
+
+
+@router.delete("/analytics/cache")
+async def clear_analytics_cache(
+    panel: Optional[Literal[
+        "overview", "monthly", "by_district", "co2", "alternative_mix"
+    ]] = None,
+    user=Depends(require_admin),
+):
+    return {"invalidated": invalidate_analytics(panel)}
+
+
+@router.patch("/users/{user_id}/access")
+async def update_access(
+    user_id: str,
+    payload: UserAccessUpdateSchema,
+    user=Depends(require_admin),
+):
+    try:
+        return await update_user_access(
+            user_id=user_id,
+            role=payload.role,
+            is_active=payload.is_active,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+
+
+@router.post("/users/{user_id}/revoke-tokens")
+async def revoke_tokens(user_id: str, user=Depends(require_admin)):
+    try:
+        return await revoke_user_tokens(user_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+
+
+@router.get("/reference")
+async def reference_tables(user=Depends(require_admin)):
+    snapshot = get_snapshot()
+    return {
+        "version": snapshot.version,
+        "alternatives": snapshot.alternatives,
+        "weights": snapshot.weights,
+        "weight_profiles": snapshot.weight_profiles,
+        "district_demand": snapshot.district_demand,
+        "base_prices": snapshot.base_prices,
+        "district_multipliers": snapshot.district_multipliers,
+        "carbon": snapshot.carbon,
+        "risk": snapshot.risk,
+        "cashflow": snapshot.cashflow,
+    }
+
+
+@router.put("/reference/{table}")
+async def replace_reference_table(
+    table: str,
+    payload: Dict[str, Any],
+    user=Depends(require_admin),
+):
+    try:
+        snapshot = await update_reference_table(table, payload)
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors(include_url=False))
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    return {
+        "message": "Reference table updated",
+        "version": snapshot.version,
+    }
+
+
+@router.get("/export/{collection}")
+async def export_collection(
+    collection: Literal["advisories", "orders", "listings"],
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    user=Depends(require_admin),
+):
+    return StreamingResponse(
+        export_stream(collection, {}, format, gzip, since, until),
+        media_type=export_media_type(format, gzip),
+        headers=export_headers(collection, format, gzip),
+    )
+
+
+@router.get("/metrics")
+async def metrics(user=Depends(require_admin)):
+    return collect_metrics()
@@ -1,19 +1,29 @@
 # app/api/routes/advisory.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.schemas.advisory_schema import AdvisoryRequestSchema
-from app.core.dependencies import get_current_user
-from app.core.database import get_database
-from app.services.residue_service import calculate_residue
-from app.services.financial_service import calculate_financials
-from app.services.ranking_service import rank_alternatives
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.schemas.advisory_schema import (
+    AdvisoryRequestSchema,
+    SensitivityRequestSchema,
+)
+from app.core.dependencies import get_current_principal
+from app.core.config import settings
+from app.services.advisory_service import (
+    analyze_advisory_batch,
+    analyze_field,
+    persist_advisory,
+)
+from app.services.risk_service import simulate_risk_async
+from app.services.sensitivity_service import run_sensitivity
 from app.models.advisory_model import AdvisoryModel
-from typing import Dict, Optional
+from app.repositories.collections import advisories_repo
+from app.utils.pagination import clamp_page_size, fetch_page
+from app.utils.response import cursor_paginated_response
+from typing import Dict, List, Optional
 
 router = APIRouter()
 
 
-async def require_farmer(user=Depends(get_current_user)):
+async def require_farmer(user=Depends(get_current_principal)):
     if user.get("role") != "farmer":
         raise HTTPException(status_code=403, detail="Farmer access required")
     return user
@@ -22,6 +32,9 @@ async def require_farmer(user=Depends(get_current_user)):
 @router.post("/analyze")
 async def analyze_advisory(
     payload: AdvisoryRequestSchema,
+    weight_profile: Optional[str] = None,
+    top_n: Optional[int] = Query(None, ge=1),
+    pareto_only: bool = False,
     user=Depends(require_farmer),
 ):
     field_size = payload.field_size_acres
@@ -29,36 +42,27 @@ async def analyze_advisory(
     district = payload.location_district
     state = payload.state
 
-    residue_tons = await calculate_residue(field_size, crop_type)
-
-    financials = calculate_financials(
-    residue_tons=residue_tons,
-    district=district,
-    demand_score=0.7,
-)
+    try:
+        residue_tons, recommendations = await analyze_field(
+            payload,
+            weight_profile=weight_profile,
+            pareto_only=pareto_only,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
-    recommendations = []
+    if top_n:
+        recommendations = recommendations[:top_n]
 
-    for alt, data in financials.items():
-        rec = AdvisoryModel.recommendation(
-            type=alt,
-            setup_cost=data["setup_cost"],
-            expected_income=data["expected_income"],
-            break_even_months=data["break_even_months"],
-            viability_score=0,  # ranking will compute final_score
-            co2_saved_tons=data["co2_saved_tons"],
+    risk = None
+    if payload.simulate:
+        risk = await simulate_risk_async(
+            {rec["type"]: rec for rec in recommendations},
+            payload.samples,
+            payload.seed,
         )
-        rec.update({
-            "profit": data["profit"],
-            "total_income": data["total_income"],
-            "carbon_credit_income": data["carbon_credit_income"],
-        })
-        recommendations.append(rec)
-
-    recommendations = rank_alternatives(
-        recommendations=recommendations,
-        district=district,
-    )
+        for rec in recommendations:
+            rec["risk"] = risk["alternatives"][rec["type"]]
 
     advisory_doc = AdvisoryModel.create(
         farmer_id=str(user["_id"]),
@@ -70,10 +74,89 @@ async def analyze_advisory(
         recommendations=recommendations,
     )
 
-    db = get_database()
-    await db.advisories.insert_one(advisory_doc)
+    await persist_advisory(advisory_doc)
 
-    return {
+    response = {
         "residue_estimate_tons": residue_tons,
         "recommendations": recommendations,
-    }
\ No newline at end of file
+    }
+
+    if risk:
+        response["simulation"] = {
+            key: risk[key]
+            for key in ("samples", "seed", "budget_capped", "elapsed_ms")
+        }
+
+    return response
+
+
+@router.post("/analyze/batch")
+async def analyze_advisory_batch_route(
+    payload: List[AdvisoryRequestSchema],
+    weight_profile: Optional[str] = None,
+    top_n: Optional[int] = Query(None, ge=1),
+    pareto_only: bool = False,
+    user=Depends(require_farmer),
+):
+    if not payload:
+        raise HTTPException(status_code=400, detail="No fields to analyze")
+
+    if len(payload) > settings.ADVISORY_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.ADVISORY_BATCH_MAX_ITEMS} fields per batch",
+        )
+
+    try:
+        results = await analyze_advisory_batch(
+            items=payload,
+            farmer_id=str(user["_id"]),
+            weight_profile=weight_profile,
+            top_n=top_n,
+            pareto_only=pareto_only,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    return {
+        "total": len(results),
+        "failed": sum(1 for r in results if "error" in r),
+        "results": results,
+    }
+
+
+@router.post("/sensitivity")
+async def sensitivity_sweep_route(
+    payload: SensitivityRequestSchema,
+    user=Depends(get_current_principal),
+):
+    """
+    What-if grid over price, residue ratio, setup cost and demand.
+    Nothing is persisted.
+    """
+
+    try:
+        return await run_sensitivity(payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.get("/history")
+async def advisory_history(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    user=Depends(require_farmer),
+):
+    try:
+        advisories, next_cursor = await fetch_page(
+            advisories_repo,
+            {"farmer_id": str(user["_id"])},
+            cursor,
+            limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    return cursor_paginated_response(
+        advisories, next_cursor, clamp_page_size(limit),
+    )
@@ -1,6 +1,7 @@
 # app/api/routes/auth.py
 
 from fastapi import APIRouter, HTTPException, status
+from pymongo.errors import DuplicateKeyError
 from app.schemas.user_schema import (
     UserRegisterSchema,
     UserLoginSchema,
@@ -8,16 +9,26 @@ from app.schemas.user_schema import (
 )
 from app.core.database import get_database
 from app.core.security import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_and_update_password_async,
     create_access_token,
+    PasswordPoolOverloaded,
 )
 from app.models.user_model import UserModel
+from app.repositories.collections import users_repo
 
 
 router = APIRouter()
 
 
+def _overloaded() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
 # ---------------------------------------------------------
 # Register
 # ---------------------------------------------------------
@@ -27,15 +38,21 @@ async def register_user(payload: UserRegisterSchema):
     db = get_database()
 
     # Check existing user
-    existing_user = await db.users.find_one({"phone": payload.phone})
+    existing_user = await users_repo.find_one(
+        {"phone": payload.phone},
+        fields=[],
+    )
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User already exists with this phone number",
         )
 
-    # Hash password
-    hashed_password = hash_password(payload.password)
+    # Hash password (off the event loop)
+    try:
+        hashed_password = await hash_password_async(payload.password)
+    except PasswordPoolOverloaded:
+        raise _overloaded()
 
     # Create user document
     user_doc = UserModel.create_user(
@@ -45,8 +62,14 @@ async def register_user(payload: UserRegisterSchema):
         role=payload.role,
     )
 
-    # Insert into DB
-    result = await db.users.insert_one(user_doc)
+    # Insert into DB (unique phone index guards concurrent registers)
+    try:
+        result = await db.users.insert_one(user_doc)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User already exists with this phone number",
+        )
 
     return {
         "message": "User registered successfully",
@@ -63,24 +86,45 @@ async def login_user(payload: UserLoginSchema):
     db = get_database()
 
     # Find user
-    user = await db.users.find_one({"phone": payload.phone})
+    user = await users_repo.find_one(
+        {"phone": payload.phone},
+        fields=["name", "role", "password_hash", "token_epoch"],
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid phone or password",
         )
 
-    # Verify password
-    if not verify_password(payload.password, user["password_hash"]):
+    # Verify password (off the event loop)
+    try:
+        valid, new_hash = await verify_and_update_password_async(
+            payload.password,
+            user["password_hash"],
+        )
+    except PasswordPoolOverloaded:
+        raise _overloaded()
+
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid phone or password",
         )
 
+    # Transparently upgrade hashes created with an older cost factor
+    if new_hash:
+        await db.users.update_one(
+            {"_id": user["_id"]},
+            {"$set": {"password_hash": new_hash}},
+        )
+
     # Create JWT token
     token = create_access_token(
         subject=str(user["_id"]),
-        extra_data={"role": user["role"]},
+        extra_data={
+            "role": user["role"],
+            "epoch": user.get("token_epoch", 0),
+        },
     )
 
     return {
@@ -1,11 +1,23 @@
 # app/api/routes/buyer.py
 
 from fastapi import APIRouter, Depends, HTTPException
-from app.core.dependencies import get_current_user
+from fastapi.responses import StreamingResponse
+from typing import Literal, Optional
+from app.core.dependencies import get_current_principal
 from app.services.buyer_service import (
     get_dashboard_summary,
     fetch_listings,
     submit_bid,
+    get_orders,
+    get_alerts,
+)
+from app.repositories.base import Repository
+from app.repositories.collections import listings_repo, orders_repo, alerts_repo
+
+from app.services.export_service import (
+    export_stream,
+    export_media_type,
+    export_headers,
 )
 
 from app.schemas.buyer_schema import BidCreateSchema
@@ -13,20 +25,104 @@ from app.schemas.buyer_schema import BidCreateSchema
 router = APIRouter()
 
 
-async def require_buyer(user=Depends(get_current_user)):
+async def require_buyer(user=Depends(get_current_principal)):
     if user.get("role") != "buyer":
         raise HTTPException(status_code=403, detail="Buyer access required")
     return user
 
 
+def parse_fields(repo: Repository, fields: Optional[str]):
+    try:
+        return repo.parse_fields(fields)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
 @router.get("/dashboard-summary")
 async def dashboard(user=Depends(require_buyer)):
     return await get_dashboard_summary(str(user["_id"]))
 
 
 @router.get("/listings")
-async def listings(user=Depends(require_buyer)):
-    return await fetch_listings()
+async def listings(
+    residue_type: Optional[str] = None,
+    district: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    user=Depends(require_buyer),
+):
+    try:
+        return await fetch_listings(
+            residue_type=residue_type,
+            district=district,
+            fields=parse_fields(listings_repo, fields),
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.get("/orders")
+async def orders(
+    status: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    user=Depends(require_buyer),
+):
+    try:
+        return await get_orders(
+            buyer_id=str(user["_id"]),
+            status=status,
+            fields=parse_fields(orders_repo, fields),
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.get("/alerts")
+async def alerts(
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    user=Depends(require_buyer),
+):
+    try:
+        return await get_alerts(
+            buyer_id=str(user["_id"]),
+            fields=parse_fields(alerts_repo, fields),
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.get("/export/listings")
+async def export_listings(
+    residue_type: Optional[str] = None,
+    district: Optional[str] = None,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+    user=Depends(require_buyer),
+):
+    query = {"status": "active"}
+
+    if residue_type:
+        query["residue_type"] = residue_type
+
+    if district:
+        query["district"] = district
+
+    return StreamingResponse(
+        export_stream("listings", query, format, gzip),
+        media_type=export_media_type(format, gzip),
+        headers=export_headers("listings", format, gzip),
+    )
 
 
 @router.post("/bid")
@@ -1,12 +1,16 @@
 # app/api/routes/crops.py
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from typing import List, Optional
 from bson import ObjectId
 from datetime import datetime
 
 from app.core.database import get_database
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_principal
+from app.repositories.collections import crops_repo
+from app.services.reference_data import bump_reference_version
+from app.utils.pagination import clamp_page_size, fetch_page
+from app.utils.response import cursor_paginated_response
 
 router = APIRouter()
 
@@ -16,31 +20,38 @@ router = APIRouter()
 # ---------------------------------------------------------
 
 @router.get("/")
-async def get_all_crops():
+async def get_all_crops(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+):
     """
-    Returns all supported crop types.
+    Returns supported crop types, one keyset page at a time.
+    Crops are ordered by _id, so seeded crops without created_at
+    page correctly too.
     """
 
-    db = get_database()
-
-    cursor = db.crops.find({})
-
-    crops = []
-    async for doc in cursor:
-        crops.append({
-            "id": str(doc["_id"]),
-            "name": doc.get("name"),
-            "residue_ratio": doc.get("residue_ratio"),
-        })
+    try:
+        crops, next_cursor = await fetch_page(
+            crops_repo,
+            {},
+            cursor,
+            limit,
+            fields=["name", "residue_ratio"],
+            sort_field=None,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
-    return crops
+    return cursor_paginated_response(
+        crops, next_cursor, clamp_page_size(limit),
+    )
 
 
 # ---------------------------------------------------------
 # 2️⃣ Add Crop (Admin Only)
 # ---------------------------------------------------------
 
-async def require_admin(user=Depends(get_current_user)):
+async def require_admin(user=Depends(get_current_principal)):
     if user.get("role") != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -74,7 +85,7 @@ async def add_crop(
             detail="name and residue_ratio required"
         )
 
-    existing = await db.crops.find_one({"name": name})
+    existing = await crops_repo.find_one({"name": name}, fields=[])
     if existing:
         raise HTTPException(
             status_code=400,
@@ -89,6 +100,9 @@ async def add_crop(
 
     result = await db.crops.insert_one(crop_data)
 
+    # Publish the new crop to every worker's reference snapshot
+    await bump_reference_version()
+
     return {
         "message": "Crop added successfully",
         "crop_id": str(result.inserted_id)
@@ -1,7 +1,7 @@
 # app/api/routes/farmer.py
 
 from fastapi import APIRouter, Depends, HTTPException
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_current_principal
 from app.services.buyer_service import get_dashboard_summary
 from app.core.database import get_database
 from app.schemas.farmer_schema import FieldCreateSchema
@@ -11,14 +11,18 @@ from app.utils.helpers import serialize_mongo_document
 router = APIRouter()
 
 
-async def require_farmer(user=Depends(get_current_user)):
+async def require_farmer(user=Depends(get_current_principal)):
     if user.get("role") != "farmer":
         raise HTTPException(status_code=403, detail="Farmer access required")
     return user
 
 
 @router.get("/profile")
-async def get_profile(user=Depends(require_farmer)):
+async def get_profile(
+    principal=Depends(require_farmer),
+    user=Depends(get_current_user),
+):
+    # Profile data needs the full user document, not just claims
     return {
         "id": str(user["_id"]),
         "name": user["name"],
@@ -0,0 +1,208 @@
+# app/core/cache.py
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+
+class AsyncLRUCache:
+    """
+    Bounded in-process cache with TTL expiry, LRU eviction
+    and single-flight loading.
+
+    Concurrent misses for the same key share one loader call,
+    so a burst of identical requests costs one backend read.
+
+    With stale_seconds > 0 an entry past its TTL is still served for
+    that long while a single background refresh replaces it
+    (stale-while-revalidate).
+
+    With max_bytes and weigh set, entries are also evicted (LRU first)
+    while their estimated total size exceeds max_bytes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        ttl_seconds: float,
+        stale_seconds: float = 0.0,
+        max_bytes: Optional[int] = None,
+        weigh: Optional[Callable[[Any], int]] = None,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_bytes = max_bytes
+        self.weigh = weigh
+
+        self._sizes: Dict[Hashable, int] = {}
+        self.bytes = 0
+
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._refreshes: Set[asyncio.Task] = set()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.refresh_failures = 0
+        self.evictions = 0
+
+    # ---------------------------------------------------------
+    # Lookup
+    # ---------------------------------------------------------
+
+    def _lookup(self, key: Hashable) -> Tuple[Optional[Any], bool]:
+        """
+        Return (value, fresh). Entries past TTL + stale window are dropped.
+        """
+
+        entry = self._entries.get(key)
+
+        if entry is None:
+            return None, False
+
+        fresh_until, value = entry
+        now = time.monotonic()
+
+        if fresh_until + self.stale_seconds <= now:
+            self._discard(key)
+            return None, False
+
+        self._entries.move_to_end(key)
+        return value, fresh_until > now
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value, fresh = self._lookup(key)
+        return value if fresh else None
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        value, fresh = self._lookup(key)
+
+        if value is not None:
+            if fresh:
+                self.hits += 1
+            else:
+                # Serve the stale value, refresh once in the background
+                self.stale_hits += 1
+                if key not in self._inflight:
+                    task = asyncio.create_task(self._refresh(key, loader))
+                    self._refreshes.add(task)
+                    task.add_done_callback(self._refreshes.discard)
+            return value
+
+        self.misses += 1
+        return await self._load(key, loader)
+
+    async def _load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        # Single-flight: join an in-progress load for the same key
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+
+        try:
+            self.loads += 1
+            value = await loader()
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark retrieved so unjoined failures do not log warnings
+            future.exception()
+            raise
+        else:
+            if value is not None:
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _refresh(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> None:
+        try:
+            await self._load(key, loader)
+        except Exception as exc:
+            # Keep serving the stale entry until it ages out
+            self.refresh_failures += 1
+            print(f"⚠️ Cache {self.name} refresh failed for {key!r}: {exc}")
+
+    # ---------------------------------------------------------
+    # Mutation
+    # ---------------------------------------------------------
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._discard(key)
+
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+        if self.weigh is not None:
+            size = self.weigh(value)
+            self._sizes[key] = size
+            self.bytes += size
+
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None
+            and self.bytes > self.max_bytes
+            and len(self._entries) > 1
+        ):
+            self._discard(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _discard(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+        self.bytes -= self._sizes.pop(key, 0)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._discard(key)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        keys = [key for key in self._entries if predicate(key)]
+        for key in keys:
+            self._discard(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._sizes.clear()
+        self.bytes = 0
+
+    # ---------------------------------------------------------
+    # Metrics
+    # ---------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "stale_seconds": self.stale_seconds,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "refresh_failures": self.refresh_failures,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4)
+            if lookups else 0.0,
+        }
@@ -9,10 +9,125 @@ class Settings(BaseSettings):
 
     MONGO_URL: Optional[str] = None
     DATABASE_NAME: str = "agrochar_db"
+
+    # MongoDB connection pool
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 10
+    MONGO_MAX_IDLE_TIME_MS: int = 300000
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 5000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    # zstd/snappy need their optional modules; zlib ships with Python
+    MONGO_COMPRESSORS: List[str] = ["zlib"]
+    MONGO_ANALYTICS_READ_PREFERENCE: str = "secondaryPreferred"
     JWT_SECRET: Optional[str] = None
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # Authorize role-gated routes from verified JWT claims only
+    AUTH_CLAIMS_ONLY: bool = False
+    TOKEN_EPOCH_REFRESH_SECONDS: float = 5.0
+
+    # Authenticated principal cache
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+
+    # Password hashing worker pool
+    PASSWORD_EXECUTOR: str = "thread"  # thread | process
+    PASSWORD_WORKERS: int = 4
+    PASSWORD_QUEUE_SIZE: int = 64
+    BCRYPT_ROUNDS: int = 12
+
+    # Write-behind persistence for /advisory/analyze
+    ADVISORY_WRITE_BEHIND: bool = False
+    ADVISORY_QUEUE_MAX_SIZE: int = 10000
+    ADVISORY_FLUSH_BATCH_SIZE: int = 500
+    ADVISORY_FLUSH_INTERVAL_MS: int = 200
+    # Failed flushes are retried with exponential backoff from this delay
+    ADVISORY_FLUSH_MAX_RETRIES: int = 5
+    ADVISORY_FLUSH_RETRY_BACKOFF_MS: int = 100
+
+    # Upper bound on items per POST /advisory/analyze/batch
+    ADVISORY_BATCH_MAX_ITEMS: int = 10000
+
+    # Reference data snapshot (crops + economic tables)
+    REFERENCE_DATA_POLL_SECONDS: float = 2.0
+    REFERENCE_NEGATIVE_CACHE_SECONDS: float = 300.0
+
+    # Keyset pagination
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 200
+
+    # Streaming exports: documents per cursor batch / output chunk,
+    # and the size at which a chunk is sent early
+    EXPORT_BATCH_SIZE: int = 1000
+    EXPORT_CHUNK_BYTES: int = 64 * 1024
+
+    # Serve admin analytics from advisory_rollups (run the backfill first)
+    ANALYTICS_USE_ROLLUPS: bool = False
+
+    # Analytics response cache: fresh for TTL, then served stale for
+    # up to STALE seconds while one background refresh runs
+    ANALYTICS_CACHE_SIZE: int = 512
+    ANALYTICS_CACHE_TTL_SECONDS: float = 60.0
+    ANALYTICS_CACHE_STALE_SECONDS: float = 300.0
+
+    # Demand-score steps on the precomputed price table (101 = 0.01 resolution)
+    PRICE_TABLE_DEMAND_LEVELS: int = 101
+
+    # Monte Carlo risk simulation: samples are capped so one advisory
+    # stays within RISK_LATENCY_BUDGET_MS
+    RISK_SAMPLES_DEFAULT: int = 10000
+    RISK_SAMPLES_MAX: int = 100000
+    RISK_LATENCY_BUDGET_MS: float = 20.0
+    # Planned cost of one sample × alternative draw (draws, percentiles
+    # and break-even) for that cap; ~350 ns measured on one core. Fixed
+    # rather than measured, so a seed reproduces on any machine load
+    RISK_NS_PER_DRAW: float = 400.0
+
+    # What-if sensitivity sweeps
+    SENSITIVITY_MAX_CELLS: int = 10000
+    SENSITIVITY_CACHE_SIZE: int = 256
+    SENSITIVITY_CACHE_TTL_SECONDS: float = 600.0
+
+    # Memoized single advisories (per-acre results scaled by field size)
+    ADVISORY_MEMO_ENABLED: bool = True
+    ADVISORY_MEMO_MAX_ENTRIES: int = 10000
+    ADVISORY_MEMO_MAX_BYTES: int = 32 * 1024 * 1024
+    ADVISORY_MEMO_TTL_SECONDS: float = 3600.0
+
+    # Learned price model (app.ml.train_price_model). PRICE_MODEL_DIR is
+    # its registry directory; PRICE_MODEL_PATH pins one artifact instead
+    PRICE_MODEL_DIR: str = "models/price"
+    PRICE_MODEL_PATH: Optional[str] = None
+    PRICE_MODEL_TRAIN_CHUNK_SIZE: int = 5000
+
+    # Model registry: how often workers check for a promoted version
+    MODEL_REGISTRY_POLL_SECONDS: float = 10.0
+
+    # Online price corrections from the bid stream (app.ml.online_prices)
+    ONLINE_PRICE_ENABLED: bool = True
+    ONLINE_PRICE_HALF_LIFE_HOURS: float = 72.0
+    # Bids' worth of "no change" the correction is shrunk towards
+    ONLINE_PRICE_PRIOR_WEIGHT: float = 5.0
+    # Single bids are clipped to this factor off the table price
+    ONLINE_PRICE_MAX_RATIO: float = 3.0
+    ONLINE_PRICE_SYNC_SECONDS: float = 15.0
+    ONLINE_PRICE_CHECKPOINT_PATH: str = "models/online/price_stats.json"
+    ONLINE_PRICE_CHECKPOINT_SECONDS: float = 60.0
+
+    # Live demand signals (app.services.demand_service)
+    DEMAND_SIGNALS_ENABLED: bool = True
+    DEMAND_WINDOW_DAYS: int = 30
+    DEMAND_SYNC_SECONDS: float = 30.0
+    # The newest seconds are left for the next sync, so late inserts count
+    # (also used by the online price tail)
+    DEMAND_SYNC_LAG_SECONDS: float = 5.0
+    # Bids per listing at which bid pressure reaches ~63%
+    DEMAND_BIDS_PER_LISTING: float = 2.0
+    # Events' worth of weight the district_demand table keeps
+    DEMAND_PRIOR_WEIGHT: float = 10.0
+    DEMAND_STATE_PATH: str = "models/demand/counters.npz"
+
     ALLOWED_ORIGINS: List[str] = [
         "http://localhost:3000",
         "http://127.0.0.1:5500",
@@ -1,17 +1,82 @@
 # app/core/database.py
 
+import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import read_pref_mode_from_name, make_read_preference
 from app.core.config import settings
 
 client: AsyncIOMotorClient | None = None
 database = None
+analytics_database = None
+
+# Why the last pool warm-up failed; None once one succeeds
+warm_up_error: str | None = None
 
 
 async def connect_to_mongo():
-    global client, database
-    client = AsyncIOMotorClient(settings.MONGO_URL)
+    global client, database, analytics_database
+    client = AsyncIOMotorClient(
+        settings.MONGO_URL,
+        maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+        waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        compressors=settings.MONGO_COMPRESSORS,
+    )
     database = client[settings.DATABASE_NAME]
-    print("✅ MongoDB Connected")
+
+    # Heavy analytics reads go through their own read preference
+    # so admin dashboards do not compete with the primary
+    analytics_database = client.get_database(
+        settings.DATABASE_NAME,
+        read_preference=make_read_preference(
+            read_pref_mode_from_name(settings.MONGO_ANALYTICS_READ_PREFERENCE),
+            None,
+        ),
+    )
+
+    # A cold pool is slower, not broken: startup carries on and
+    # /health/ready keeps reporting the failure until a retry succeeds
+    if await warm_up_pool():
+        print("✅ MongoDB Connected")
+    else:
+        print(f"⚠️ MongoDB pool warm-up failed, starting cold: {warm_up_error}")
+
+
+async def warm_up_pool() -> bool:
+    """
+    Open MONGO_MIN_POOL_SIZE connections up front so the first
+    requests after a deploy skip connection setup and TLS handshakes.
+    Returns False, with warm_up_error set, when MongoDB does not answer.
+    """
+
+    global warm_up_error
+
+    try:
+        await client.admin.command("ping")
+
+        await asyncio.gather(*(
+            client.admin.command("ping")
+            for _ in range(settings.MONGO_MIN_POOL_SIZE)
+        ))
+    except Exception as exc:
+        warm_up_error = f"{type(exc).__name__}: {exc}"
+        return False
+
+    warm_up_error = None
+    return True
+
+
+async def ping_database() -> bool:
+    if client is None:
+        return False
+
+    try:
+        await client.admin.command("ping")
+        return True
+    except Exception:
+        return False
 
 
 async def close_mongo_connection():
@@ -24,4 +89,10 @@ async def close_mongo_connection():
 def get_database():
     if database is None:
         raise RuntimeError("Database not initialized")
-    return database
\ No newline at end of file
+    return database
+
+
+def get_analytics_database():
+    if analytics_database is None:
+        raise RuntimeError("Database not initialized")
+    return analytics_database
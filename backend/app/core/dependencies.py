@@ -2,17 +2,50 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from bson import ObjectId
-from typing import Any
+from bson.errors import InvalidId
+from typing import Any, Optional
 
 from app.core.config import settings
-from app.core.database import get_database
+from app.core.cache import AsyncLRUCache
+from app.core.metrics import register_metrics
+from app.core.token_epochs import is_token_revoked
+from app.repositories.collections import users_repo
 
 security = HTTPBearer()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-):
+# ---------------------------------------------------------
+# Principal Cache
+# ---------------------------------------------------------
+
+principal_cache = AsyncLRUCache(
+    name="principals",
+    max_entries=settings.PRINCIPAL_CACHE_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+register_metrics("principal_cache", principal_cache.stats)
+
+
+def invalidate_principal(user_id: str) -> None:
+    """
+    Drop a cached principal, e.g. after its role or is_active changed.
+    """
+
+    principal_cache.invalidate(user_id)
+
+
+async def _load_principal(user_id: str) -> Optional[dict]:
+    # Default users projection never includes password_hash,
+    # so credentials are not cached alongside the principal
+    return await users_repo.find_one({"_id": ObjectId(user_id)})
+
+
+# ---------------------------------------------------------
+# Token Verification
+# ---------------------------------------------------------
+
+def _decode_token(credentials: HTTPAuthorizationCredentials) -> dict[str, Any]:
     token = credentials.credentials
 
     try:
@@ -40,9 +73,31 @@ async def get_current_user(
             detail="Invalid or expired token",
         )
 
-    db = get_database()
+    if is_token_revoked(user_id, payload.get("epoch", 0)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+        )
+
+    return payload
 
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+):
+    payload = _decode_token(credentials)
+    user_id = payload["sub"]
+
+    try:
+        user = await principal_cache.get_or_load(
+            user_id,
+            lambda: _load_principal(user_id),
+        )
+    except InvalidId:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token payload",
+        )
 
     if user is None:
         raise HTTPException(
@@ -50,4 +105,33 @@ async def get_current_user(
             detail="User not found",
         )
 
-    return user
\ No newline at end of file
+    if not user.get("is_active", True):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User is inactive",
+        )
+
+    return user
+
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+):
+    """
+    Identity for role-gated routes.
+
+    With AUTH_CLAIMS_ONLY enabled the principal is built from the
+    verified token claims alone ({"_id", "role"}); revocation is
+    enforced through token epochs. Otherwise the full user document
+    is loaded as in get_current_user.
+    """
+
+    if not settings.AUTH_CLAIMS_ONLY:
+        return await get_current_user(credentials)
+
+    payload = _decode_token(credentials)
+
+    return {
+        "_id": payload["sub"],
+        "role": payload.get("role"),
+    }
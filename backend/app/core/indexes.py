@@ -0,0 +1,258 @@
+# app/core/indexes.py
+
+"""
+Declarative index registry for every collection the services query.
+
+Apply on startup (idempotent) and verify query plans from the CLI:
+
+    python -m app.core.indexes --apply --verify
+
+--verify runs explain() on each registered service query and exits
+non-zero if any winning plan contains a COLLSCAN.
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+
+# ---------------------------------------------------------
+# 1️⃣ Index Registry
+# ---------------------------------------------------------
+
+INDEX_REGISTRY: Dict[str, List[IndexModel]] = {
+    "users": [
+        # Unique phone also closes the check-then-insert race at register
+        IndexModel([("phone", ASCENDING)], name="phone_unique", unique=True),
+        IndexModel([("token_epoch", ASCENDING)], name="token_epoch", sparse=True),
+        IndexModel([("is_active", ASCENDING)], name="is_active"),
+    ],
+    "crops": [
+        IndexModel([("name", ASCENDING)], name="name"),
+    ],
+    # Keyset pages sort on (created_at, _id) after the equality filters
+    "listings": [
+        IndexModel(
+            [
+                ("status", ASCENDING),
+                ("residue_type", ASCENDING),
+                ("district", ASCENDING),
+                ("created_at", DESCENDING),
+                ("_id", DESCENDING),
+            ],
+            name="status_residue_type_district_page",
+        ),
+        IndexModel(
+            [("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="status_page",
+        ),
+        IndexModel(
+            [
+                ("status", ASCENDING),
+                ("district", ASCENDING),
+                ("created_at", DESCENDING),
+                ("_id", DESCENDING),
+            ],
+            name="status_district_page",
+        ),
+        # Demand signals tail listings, bids and orders by created_at
+        IndexModel([("created_at", ASCENDING)], name="created_at"),
+    ],
+    "bids": [
+        IndexModel([("buyer_id", ASCENDING)], name="buyer_id"),
+        IndexModel([("created_at", ASCENDING)], name="created_at"),
+    ],
+    "orders": [
+        IndexModel(
+            [("buyer_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="buyer_id_page",
+        ),
+        IndexModel([("created_at", ASCENDING)], name="created_at"),
+    ],
+    "alerts": [
+        IndexModel(
+            [("buyer_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="buyer_id_page",
+        ),
+    ],
+    "advisories": [
+        IndexModel([("created_at", DESCENDING)], name="created_at"),
+        IndexModel([("location_district", ASCENDING)], name="location_district"),
+        IndexModel(
+            [("state", ASCENDING), ("created_at", DESCENDING)],
+            name="state_created_at",
+        ),
+        IndexModel(
+            [("farmer_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="farmer_id_page",
+        ),
+    ],
+    # One row per day × state × district; $merge in the backfill needs it unique
+    "advisory_rollups": [
+        IndexModel(
+            [("day", ASCENDING), ("state", ASCENDING), ("district", ASCENDING)],
+            name="day_state_district_unique",
+            unique=True,
+        ),
+    ],
+}
+
+
+async def ensure_indexes(db) -> None:
+    """
+    Create every registered index. Re-running with the same
+    specs is a no-op on the server.
+    """
+
+    for collection, models in INDEX_REGISTRY.items():
+        try:
+            await db[collection].create_indexes(models)
+        except OperationFailure as exc:
+            # Conflicting spec or duplicate data; keep serving traffic
+            print(f"⚠️ Index creation failed on {collection}: {exc}")
+
+
+# ---------------------------------------------------------
+# 2️⃣ Service Query Plans
+# ---------------------------------------------------------
+
+def service_queries() -> List[Dict[str, Any]]:
+    """
+    Representative shapes of the hot service queries.
+    """
+
+    now = datetime.utcnow()
+    page_sort = [("created_at", DESCENDING), ("_id", DESCENDING)]
+
+    return [
+        {"name": "users.by_phone", "collection": "users",
+         "filter": {"phone": "0000000000"}},
+        {"name": "crops.by_name", "collection": "crops",
+         "filter": {"name": "Wheat"}},
+        {"name": "listings.active", "collection": "listings",
+         "filter": {"status": "active"}, "sort": page_sort},
+        {"name": "listings.active_by_district", "collection": "listings",
+         "filter": {"status": "active", "district": "Pune"}, "sort": page_sort},
+        {"name": "listings.active_filtered", "collection": "listings",
+         "filter": {"status": "active", "residue_type": "biochar", "district": "Pune"},
+         "sort": page_sort},
+        {"name": "bids.by_buyer", "collection": "bids",
+         "filter": {"buyer_id": "0"}},
+        {"name": "orders.by_buyer", "collection": "orders",
+         "filter": {"buyer_id": "0"}, "sort": page_sort},
+        {"name": "alerts.by_buyer", "collection": "alerts",
+         "filter": {"buyer_id": "0"}, "sort": page_sort},
+        {"name": "demand.listings_tail", "collection": "listings",
+         "filter": {"created_at": {"$gt": now - timedelta(minutes=1), "$lte": now}}},
+        {"name": "demand.bids_tail", "collection": "bids",
+         "filter": {"created_at": {"$gt": now - timedelta(minutes=1), "$lte": now}}},
+        {"name": "demand.orders_tail", "collection": "orders",
+         "filter": {"created_at": {"$gt": now - timedelta(minutes=1), "$lte": now},
+                    "status": {"$ne": "cancelled"}}},
+        {"name": "advisories.by_farmer", "collection": "advisories",
+         "filter": {"farmer_id": "0"}, "sort": page_sort},
+        {"name": "advisories.created_range", "collection": "advisories",
+         "filter": {"created_at": {"$gte": datetime(now.year, 1, 1), "$lt": now}}},
+        {"name": "advisories.by_district", "collection": "advisories",
+         "pipeline": [
+             {"$sort": {"location_district": 1}},
+             {"$group": {"_id": "$location_district", "count": {"$sum": 1}}},
+         ]},
+    ]
+
+
+def _has_collscan(node: Any, in_winning_plan: bool = False) -> bool:
+    if isinstance(node, dict):
+        if in_winning_plan and node.get("stage") == "COLLSCAN":
+            return True
+
+        return any(
+            _has_collscan(value, in_winning_plan or key == "winningPlan")
+            for key, value in node.items()
+        )
+
+    if isinstance(node, list):
+        return any(_has_collscan(item, in_winning_plan) for item in node)
+
+    return False
+
+
+async def verify_query_plans(db) -> List[Dict[str, Any]]:
+    """
+    Explain every service query and report its plan status.
+    """
+
+    results = []
+
+    for query in service_queries():
+        collection = query["collection"]
+
+        if "pipeline" in query:
+            explain = await db.command(
+                "aggregate",
+                collection,
+                pipeline=query["pipeline"],
+                explain=True,
+            )
+        else:
+            cursor = db[collection].find(query["filter"])
+            if "sort" in query:
+                cursor = cursor.sort(query["sort"])
+            explain = await cursor.explain()
+
+        results.append({
+            "name": query["name"],
+            "collscan": _has_collscan(explain),
+        })
+
+    return results
+
+
+# ---------------------------------------------------------
+# 3️⃣ CLI
+# ---------------------------------------------------------
+
+async def _main(apply: bool, verify: bool) -> int:
+    from app.core.database import (
+        connect_to_mongo,
+        close_mongo_connection,
+        get_database,
+    )
+
+    await connect_to_mongo()
+    db = get_database()
+
+    exit_code = 0
+
+    try:
+        if apply:
+            await ensure_indexes(db)
+            print("✅ Indexes applied")
+
+        if verify:
+            for result in await verify_query_plans(db):
+                marker = "❌ COLLSCAN" if result["collscan"] else "✅ indexed"
+                print(f"{marker}  {result['name']}")
+                if result["collscan"]:
+                    exit_code = 1
+    finally:
+        await close_mongo_connection()
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage MongoDB indexes")
+    parser.add_argument("--apply", action="store_true", help="create registered indexes")
+    parser.add_argument("--verify", action="store_true", help="fail on any COLLSCAN plan")
+    args = parser.parse_args()
+
+    if not (args.apply or args.verify):
+        parser.error("nothing to do, pass --apply and/or --verify")
+
+    sys.exit(asyncio.run(_main(args.apply, args.verify)))
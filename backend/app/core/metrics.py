@@ -0,0 +1,22 @@
+# app/core/metrics.py
+
+from typing import Any, Callable, Dict
+
+
+# ---------------------------------------------------------
+# In-process Metrics Registry
+# ---------------------------------------------------------
+
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register_metrics(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    """
+    Register a callable returning a snapshot of component metrics.
+    """
+
+    _providers[name] = provider
+
+
+def collect_metrics() -> Dict[str, Dict[str, Any]]:
+    return {name: provider() for name, provider in _providers.items()}
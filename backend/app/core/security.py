@@ -1,13 +1,26 @@
 # app/core/security.py
 
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from jose import jwt
 from passlib.context import CryptContext
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from app.core.config import settings
+from app.core.metrics import register_metrics
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+class PasswordPoolOverloaded(Exception):
+    """
+    Raised when the password worker queue is full.
+    """
 
 
 # ------------------------------
@@ -22,6 +35,98 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str,
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and return a fresh hash when the stored one
+    uses outdated settings (e.g. a lower bcrypt cost factor).
+    """
+
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+# ------------------------------
+# Password Worker Pool
+# ------------------------------
+
+_executor: Optional[Executor] = None
+_pending = 0
+_rejected = 0
+
+
+def start_password_pool() -> None:
+    global _executor
+
+    if _executor is not None:
+        return
+
+    if settings.PASSWORD_EXECUTOR == "process":
+        _executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_WORKERS)
+    else:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_WORKERS,
+            thread_name_prefix="password",
+        )
+
+
+def shutdown_password_pool() -> None:
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+async def _run_in_pool(func, *args):
+    global _pending, _rejected
+
+    if _executor is None:
+        start_password_pool()
+
+    # In-flight work = running + queued; bound it so a login burst
+    # fails fast instead of piling up unbounded latency.
+    if _pending >= settings.PASSWORD_WORKERS + settings.PASSWORD_QUEUE_SIZE:
+        _rejected += 1
+        raise PasswordPoolOverloaded("Password service overloaded")
+
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, func, *args)
+    finally:
+        _pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_pool(hash_password, password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str,
+    hashed_password: str,
+) -> Tuple[bool, Optional[str]]:
+    return await _run_in_pool(
+        verify_and_update_password,
+        plain_password,
+        hashed_password,
+    )
+
+
+def password_pool_stats() -> Dict[str, Any]:
+    return {
+        "executor": settings.PASSWORD_EXECUTOR,
+        "workers": settings.PASSWORD_WORKERS,
+        "queue_size": settings.PASSWORD_QUEUE_SIZE,
+        "pending": _pending,
+        "rejected": _rejected,
+    }
+
+
+register_metrics("password_pool", password_pool_stats)
+
+
 # ------------------------------
 # JWT Token Creation
 # ------------------------------
@@ -50,4 +155,4 @@ def create_access_token(
         payload,
         secret_key,
         algorithm=settings.JWT_ALGORITHM,
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,154 @@
+# app/core/token_epochs.py
+
+import asyncio
+from typing import Dict, Optional, Set
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.metrics import register_metrics
+
+
+# ---------------------------------------------------------
+# Per-user Token Epochs
+# ---------------------------------------------------------
+# Every access token carries the user's "epoch" at issue time.
+# Bumping the stored epoch revokes all older tokens. Only users
+# with a non-zero epoch or a disabled account are held in memory,
+# so the map stays small regardless of the user count.
+
+_epochs: Dict[str, int] = {}
+_inactive: Set[str] = set()
+_refresh_task: Optional[asyncio.Task] = None
+_refreshes = 0
+
+
+def current_epoch(user_id: str) -> int:
+    return _epochs.get(user_id, 0)
+
+
+def is_token_revoked(user_id: str, token_epoch: int) -> bool:
+    if user_id in _inactive:
+        return True
+
+    return token_epoch < current_epoch(user_id)
+
+
+def set_user_state(user_id: str, epoch: int, is_active: bool) -> None:
+    """
+    Apply a known state locally without waiting for the next refresh.
+    """
+
+    if epoch:
+        _epochs[user_id] = epoch
+    else:
+        _epochs.pop(user_id, None)
+
+    if is_active:
+        _inactive.discard(user_id)
+    else:
+        _inactive.add(user_id)
+
+
+# ---------------------------------------------------------
+# Bulk Refresh
+# ---------------------------------------------------------
+
+async def refresh_token_epochs() -> None:
+    global _epochs, _inactive, _refreshes
+
+    db = get_database()
+
+    cursor = db.users.find(
+        {"$or": [{"token_epoch": {"$gt": 0}}, {"is_active": False}]},
+        {"token_epoch": 1, "is_active": 1},
+    )
+
+    epochs: Dict[str, int] = {}
+    inactive: Set[str] = set()
+
+    async for doc in cursor:
+        user_id = str(doc["_id"])
+        epoch = doc.get("token_epoch", 0)
+
+        if epoch:
+            epochs[user_id] = epoch
+
+        if not doc.get("is_active", True):
+            inactive.add(user_id)
+
+    # Swap both maps at once so lookups never see a half-built state
+    _epochs, _inactive = epochs, inactive
+    _refreshes += 1
+
+
+async def _refresh_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.TOKEN_EPOCH_REFRESH_SECONDS)
+        try:
+            await refresh_token_epochs()
+        except Exception as exc:
+            print(f"⚠️ Token epoch refresh failed: {exc}")
+
+
+async def start_token_epoch_refresher() -> None:
+    global _refresh_task
+
+    await refresh_token_epochs()
+
+    if _refresh_task is None:
+        _refresh_task = asyncio.create_task(_refresh_loop())
+
+
+async def stop_token_epoch_refresher() -> None:
+    global _refresh_task
+
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+        _refresh_task = None
+
+
+# ---------------------------------------------------------
+# Revocation
+# ---------------------------------------------------------
+
+async def bump_token_epoch(user_id: str) -> int:
+    """
+    Revoke every token issued to the user so far.
+    """
+
+    if not ObjectId.is_valid(user_id):
+        raise ValueError("User not found")
+
+    db = get_database()
+
+    doc = await db.users.find_one_and_update(
+        {"_id": ObjectId(user_id)},
+        {"$inc": {"token_epoch": 1}},
+        projection={"token_epoch": 1, "is_active": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+
+    if doc is None:
+        raise ValueError("User not found")
+
+    set_user_state(user_id, doc["token_epoch"], doc.get("is_active", True))
+
+    return doc["token_epoch"]
+
+
+def token_epoch_stats() -> dict:
+    return {
+        "tracked_epochs": len(_epochs),
+        "inactive_users": len(_inactive),
+        "refreshes": _refreshes,
+        "claims_only": settings.AUTH_CLAIMS_ONLY,
+    }
+
+
+register_metrics("token_epochs", token_epoch_stats)
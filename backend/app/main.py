@@ -1,9 +1,34 @@
 # backend/app/main.py
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.api_v1 import api_router
-from app.core.database import connect_to_mongo, close_mongo_connection
+from app.core import database
+from app.core.database import (
+    connect_to_mongo,
+    close_mongo_connection,
+    get_database,
+    ping_database,
+    warm_up_pool,
+)
+from app.core.config import settings
+from app.core.indexes import ensure_indexes
+from app.core.security import start_password_pool, shutdown_password_pool
+from app.ml.online_prices import start_online_prices, stop_online_prices
+from app.ml.price_model import load_price_model
+from app.ml.price_table import price_model_registry
+from app.core.token_epochs import (
+    start_token_epoch_refresher,
+    stop_token_epoch_refresher,
+)
+from app.services.advisory_service import advisory_writer
+from app.services.demand_service import start_demand_signals, stop_demand_signals
+from app.services.reference_data import (
+    start_reference_data,
+    stop_reference_data,
+)
+from app.services.rollup_service import drain_rollups
 
 app = FastAPI()
 
@@ -12,6 +37,29 @@ app = FastAPI()
 async def root():
     return {"message": "Backend is running 🚀"}
 
+# Readiness probe: only route traffic once MongoDB answers and the
+# connection pool is warm
+@app.get("/health/ready")
+async def ready():
+    if not await ping_database():
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "database": "down"},
+        )
+
+    # Startup warm-up failed: retry it until it goes through
+    if database.warm_up_error is not None and not await warm_up_pool():
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "warming",
+                "database": "up",
+                "warm_up_error": database.warm_up_error,
+            },
+        )
+
+    return {"status": "ready", "database": "up"}
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -24,9 +72,39 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup():
     await connect_to_mongo()
+    await ensure_indexes(get_database())
+
+    # Before reference data: the price table is built from the model
+    if settings.PRICE_MODEL_PATH:
+        try:
+            model = load_price_model(settings.PRICE_MODEL_PATH)
+            print(f"✅ Price model {model.version} loaded")
+        except Exception as exc:
+            print(f"⚠️ Price model not loaded, using formula prices: {exc}")
+    else:
+        await price_model_registry.start()
+
+    await start_reference_data()
+    await start_online_prices()
+    await start_demand_signals()
+    start_password_pool()
+    await start_token_epoch_refresher()
+
+    if settings.ADVISORY_WRITE_BEHIND:
+        advisory_writer.start()
 
 @app.on_event("shutdown")
 async def shutdown():
+    # Drain queued advisories and their rollups before the
+    # connection goes away
+    await advisory_writer.stop()
+    await drain_rollups()
+    await stop_token_epoch_refresher()
+    await stop_reference_data()
+    await price_model_registry.stop()
+    await stop_online_prices()
+    await stop_demand_signals()
+    shutdown_password_pool()
     await close_mongo_connection()
 
 app.include_router(api_router, prefix="/api/v1")
\ No newline at end of file
@@ -0,0 +1,226 @@
+# app/ml/model_registry.py
+
+"""
+Versioned model artifacts on local disk with hot swap.
+
+One directory per model holds <name>_model_<version>.joblib files and an
+ACTIVE file naming the version to serve:
+
+    models/price/price_model_20261018120000.joblib
+    models/price/ACTIVE
+
+Artifacts are loaded with joblib mmap_mode="r", so their numpy arrays
+are backed by the page cache and shared by every uvicorn worker on
+the host instead of copied into each one. A background task polls
+ACTIVE; a newly promoted version is loaded, warmed and prepared in a
+worker thread and then swapped in with a single assignment, so
+requests never wait on a reload.
+
+    python -m app.ml.model_registry price --list
+    python -m app.ml.model_registry price --promote 20261018120000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import joblib
+
+from app.core.config import settings
+
+
+ACTIVE_FILE = "ACTIVE"
+
+
+class ModelRegistry:
+    """
+    loader turns a loaded artifact into the served model. prepare
+    builds anything derived from it (off the event loop) and on_swap
+    installs model and prepared state together.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        directory: str,
+        loader: Optional[Callable[[Any], Any]] = None,
+        prepare: Optional[Callable[[Any], Any]] = None,
+        on_swap: Optional[Callable[[Any, Any], None]] = None,
+    ):
+        self.name = name
+        self.directory = directory
+        self.prefix = f"{name}_model_"
+        self._loader = loader
+        self._prepare = prepare
+        self._on_swap = on_swap
+
+        self.model = None
+        self.version: Optional[str] = None
+        self.loaded_at: Optional[datetime] = None
+
+        self._task: Optional[asyncio.Task] = None
+        self._swaps = 0
+        self._failures = 0
+        self._last_error: Optional[str] = None
+        self._load_ms = 0.0
+
+    # ---------------------------------------------------------
+    # Versions On Disk
+    # ---------------------------------------------------------
+
+    def path(self, version: str) -> str:
+        return os.path.join(self.directory, f"{self.prefix}{version}.joblib")
+
+    def versions(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+
+        return sorted(
+            name[len(self.prefix):-len(".joblib")]
+            for name in os.listdir(self.directory)
+            if name.startswith(self.prefix) and name.endswith(".joblib")
+        )
+
+    def active_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.directory, ACTIVE_FILE)) as fh:
+                return fh.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def promote(self, version: str) -> None:
+        """
+        Point ACTIVE at version. Every worker picks it up on its next
+        poll; the rename keeps readers from seeing a partial write.
+        """
+
+        if not os.path.exists(self.path(version)):
+            raise ValueError(f"Unknown {self.name} model version: {version}")
+
+        active = os.path.join(self.directory, ACTIVE_FILE)
+        with open(active + ".tmp", "w") as fh:
+            fh.write(version + "\n")
+        os.replace(active + ".tmp", active)
+
+    # ---------------------------------------------------------
+    # Loading & Swap
+    # ---------------------------------------------------------
+
+    def _load(self, version: str):
+        """
+        Runs in a worker thread: memory-map, wrap and prepare.
+        """
+
+        started = time.perf_counter()
+
+        model = self._loader(joblib.load(self.path(version), mmap_mode="r"))
+        prepared = self._prepare(model) if self._prepare else None
+
+        return model, prepared, (time.perf_counter() - started) * 1000
+
+    async def reload(self) -> bool:
+        """
+        Swap to the ACTIVE version if it differs from the loaded one.
+        A failed load keeps serving the current model.
+        """
+
+        version = self.active_version()
+        if version is None or version == self.version:
+            return False
+
+        try:
+            model, prepared, load_ms = await asyncio.to_thread(self._load, version)
+        except Exception as exc:
+            self._failures += 1
+            self._last_error = f"{version}: {exc}"
+            print(f"⚠️ {self.name} model {version} not loaded: {exc}")
+            return False
+
+        if self._on_swap:
+            self._on_swap(model, prepared)
+
+        self.model = model
+        self.version = version
+        self.loaded_at = datetime.utcnow()
+        self._load_ms = load_ms
+        self._swaps += 1
+
+        print(f"✅ {self.name} model {version} active")
+        return True
+
+    async def _watch_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.MODEL_REGISTRY_POLL_SECONDS)
+            await self.reload()
+
+    async def start(self) -> None:
+        """
+        Warm the active version, then watch for promotions.
+        """
+
+        await self.reload()
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "version": self.version,
+            "active_version": self.active_version(),
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            "load_ms": round(self._load_ms, 2),
+            "swaps": self._swaps,
+            "failures": self._failures,
+            "last_error": self._last_error,
+        }
+
+        if hasattr(self.model, "latency"):
+            stats["inference"] = self.model.latency()
+
+        return stats
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+
+MODEL_DIRS = {
+    "price": settings.PRICE_MODEL_DIR,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage versioned model artifacts")
+    parser.add_argument("model", choices=sorted(MODEL_DIRS))
+    parser.add_argument("--list", action="store_true", help="list versions on disk")
+    parser.add_argument("--promote", metavar="VERSION", help="make VERSION active")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.model, MODEL_DIRS[args.model])
+
+    if args.promote:
+        try:
+            registry.promote(args.promote)
+        except ValueError as exc:
+            print(f"❌ {exc}")
+            sys.exit(1)
+        print(f"✅ {args.model} model {args.promote} promoted")
+    elif args.list:
+        active = registry.active_version()
+        for version in registry.versions():
+            print(f"{'*' if version == active else ' '} {version}")
+    else:
+        parser.error("nothing to do, pass --list or --promote")
@@ -0,0 +1,464 @@
+# app/ml/online_prices.py
+
+"""
+Online price corrections learned from the live bid stream.
+
+Every bid updates, per (district, residue type), an exponentially
+weighted mean of log(bid price / table price) with a time half-life,
+so the table keeps its month and demand shape while its level follows
+the market. The update is O(1): a few float operations per bid; the
+price table's adjustment array is brought up to date once per sync,
+in steps of at least ADJUSTMENT_STEP. The correction is shrunk
+towards zero until enough recent bids back it.
+
+A background task tails the bids collection by created_at and folds
+bids in at their creation time, so every worker converges on the same
+corrections whichever worker took the bid. State and the tail
+watermark are checkpointed to disk and loaded at startup; without a
+checkpoint the first sync replays BACKFILL_HALF_LIVES half-lives of
+bids.
+
+Corrections are relative to the table price of the model they were
+measured against. When another price model is swapped in (likely
+trained on those same bids) they would count the market shift twice,
+so the stats are dropped and the next sync replays the bids against
+the new baseline.
+"""
+
+import asyncio
+import json
+import math
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.metrics import register_metrics
+from app.ml.price_model import PriceModel
+from app.ml.price_table import PriceTable, get_price_table
+from app.services.listing_lookup import listing_keys
+from app.services.reference_data import ReferenceSnapshot, on_snapshot_change
+
+
+# Demand level bids are compared against (bids carry no demand score)
+REFERENCE_DEMAND = 0.5
+
+# Older bids weigh under 1/32 of a fresh one, not worth replaying
+BACKFILL_HALF_LIVES = 5
+
+# Served adjustments only move once the learned one is this far
+# (relative) from them; every move invalidates cached advisories
+ADJUSTMENT_STEP = 0.005
+
+EPOCH = datetime(1970, 1, 1)
+
+Key = Tuple[str, str]
+
+
+class OnlinePriceStats:
+    """
+    [mean log-ratio, weight, last update (epoch s)] per key.
+    """
+
+    def __init__(self, half_life_seconds: float, prior_weight: float, max_ratio: float):
+        self.half_life = half_life_seconds
+        self.prior_weight = prior_weight
+        self.max_log_ratio = math.log(max_ratio)
+
+        self.state: Dict[Key, List[float]] = {}
+        self.updates = 0
+        self.dirty = False
+
+    def _decay(self, since: float, now: float) -> float:
+        return 0.5 ** (max(now - since, 0.0) / self.half_life)
+
+    def update(self, key: Key, log_ratio: float, now: float) -> float:
+        """
+        Fold one observation in and return the new correction.
+        """
+
+        log_ratio = min(max(log_ratio, -self.max_log_ratio), self.max_log_ratio)
+
+        entry = self.state.get(key)
+        if entry is None:
+            entry = self.state[key] = [0.0, 0.0, now]
+
+        mean, weight, last = entry
+
+        # Older observations fade with the half-life; the newest
+        # counts 1 / weight of the running mean
+        weight = weight * self._decay(last, now) + 1.0
+        mean += (log_ratio - mean) / weight
+
+        entry[:] = (mean, weight, max(last, now))
+        self.updates += 1
+        self.dirty = True
+
+        return self._shrunk(mean, weight)
+
+    def _shrunk(self, mean: float, weight: float) -> float:
+        return mean * weight / (weight + self.prior_weight)
+
+    def correction(self, key: Key, now: float) -> float:
+        """
+        Log-space correction; its weight decays while no bids arrive.
+        """
+
+        entry = self.state.get(key)
+        if entry is None:
+            return 0.0
+
+        mean, weight, last = entry
+        return self._shrunk(mean, weight * self._decay(last, now))
+
+    # ---------------------------------------------------------
+    # Checkpoint Format
+    # ---------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "saved_at": time.time(),
+            "entries": [
+                [district, residue_type, *entry]
+                for (district, residue_type), entry in self.state.items()
+            ],
+        }
+
+    def load_dict(self, data: Dict[str, Any]) -> None:
+        self.state = {
+            (district, residue_type): [mean, weight, last]
+            for district, residue_type, mean, weight, last in data.get("entries", [])
+        }
+
+
+online_prices = OnlinePriceStats(
+    half_life_seconds=settings.ONLINE_PRICE_HALF_LIFE_HOURS * 3600,
+    prior_weight=settings.ONLINE_PRICE_PRIOR_WEIGHT,
+    max_ratio=settings.ONLINE_PRICE_MAX_RATIO,
+)
+
+_watermark: Optional[datetime] = None
+
+# Price model the stats' log-ratios were measured against
+_basis: Optional[PriceModel] = get_price_table().model
+
+# Bumped whenever a served adjustment moves; part of cache keys
+_generation = 0
+_rebases = 0
+
+_task: Optional[asyncio.Task] = None
+_syncs = 0
+_sync_failures = 0
+_checkpoints = 0
+_checkpoint_failures = 0
+_last_checkpoint: Optional[datetime] = None
+
+
+def correction_generation() -> int:
+    return _generation
+
+
+# ---------------------------------------------------------
+# 1️⃣ Bid Stream
+# ---------------------------------------------------------
+
+def record_bid(
+    district: Optional[str],
+    residue_type: Optional[str],
+    price_per_ton: float,
+    created_at: datetime,
+) -> bool:
+    """
+    O(1) update from one bid, at its creation time. Returns whether
+    it was used.
+    """
+
+    if not district or not residue_type:
+        return False
+
+    if price_per_ton is None or price_per_ton <= 0:
+        return False
+
+    table = get_price_table()
+
+    d = table.district_index.get(district, 0)
+    t = table.type_index.get(residue_type, table.unknown_type)
+
+    # Unadjusted table price: the correction is relative to it
+    baseline = table.prices[d, t, created_at.month - 1, table.demand_codes(REFERENCE_DEMAND)]
+
+    online_prices.update(
+        (district, residue_type),
+        math.log(price_per_ton / baseline),
+        (created_at - EPOCH).total_seconds(),
+    )
+
+    return True
+
+
+def apply_corrections(table: PriceTable) -> bool:
+    """
+    Bring a table's adjustment array up to the current stats,
+    including decay for pairs that went quiet. An adjustment is only
+    rewritten when it is off by more than ADJUSTMENT_STEP, so served
+    prices stay put while bids merely nudge the mean. Returns whether
+    any adjustment was rewritten.
+    """
+
+    if not settings.ONLINE_PRICE_ENABLED:
+        return False
+
+    now = time.time()
+    changed = False
+
+    for (district, residue_type) in list(online_prices.state):
+        d = table.district_index.get(district, 0)
+        t = table.type_index.get(residue_type, table.unknown_type)
+
+        # Unknown rows are shared by every unknown name; stats are
+        # kept and applied once the pair gets its own row
+        if d and t != table.unknown_type:
+            value = math.exp(online_prices.correction((district, residue_type), now))
+            if abs(value / table.adjustment[d, t] - 1) > ADJUSTMENT_STEP:
+                table.adjustment[d, t] = value
+                changed = True
+
+    return changed
+
+
+def _model_version(model: Optional[PriceModel]) -> Optional[str]:
+    return model.version if model is not None else None
+
+
+def _rebase(model: Optional[PriceModel]) -> None:
+    """
+    Drop stats measured against another model; the next sync
+    backfills against the current one.
+    """
+
+    global _basis, _watermark, _rebases
+
+    online_prices.state = {}
+    online_prices.dirty = True
+    _watermark = None
+    _basis = model
+    _rebases += 1
+
+
+def _apply_to_current(snapshot: ReferenceSnapshot) -> None:
+    global _generation
+
+    table = get_price_table()
+
+    # A new table starts without adjustments, so nothing to undo
+    if table.model is not _basis:
+        _rebase(table.model)
+
+    if apply_corrections(table):
+        _generation += 1
+
+
+# Runs after the price table listener, so a rebuilt table starts warm
+on_snapshot_change(_apply_to_current)
+
+
+async def sync_online_prices(db=None, now: Optional[datetime] = None) -> int:
+    """
+    Fold in every bid created since the last sync, oldest first.
+    Returns the number of bids used.
+    """
+
+    global _watermark, _generation
+
+    db = db if db is not None else get_database()
+    now = now or datetime.utcnow()
+    basis = _basis
+
+    # Late inserts within the lag are still picked up next time
+    upper = now - timedelta(seconds=settings.DEMAND_SYNC_LAG_SECONDS)
+    lower = _watermark or upper - timedelta(
+        hours=settings.ONLINE_PRICE_HALF_LIFE_HOURS * BACKFILL_HALF_LIVES,
+    )
+
+    cursor = db.bids.find(
+        {"created_at": {"$gt": lower, "$lte": upper}},
+        {"listing_id": 1, "price_per_ton": 1, "created_at": 1},
+    ).sort("created_at", 1).batch_size(settings.EXPORT_BATCH_SIZE)
+
+    used = 0
+    chunk: List[Dict[str, Any]] = []
+
+    async def fold(docs: List[Dict[str, Any]]) -> int:
+        keys = await listing_keys(db, [str(doc.get("listing_id")) for doc in docs])
+
+        return sum(
+            record_bid(
+                *(keys[str(doc.get("listing_id"))] or (None, None)),
+                doc.get("price_per_ton"),
+                doc["created_at"],
+            )
+            for doc in docs
+        )
+
+    async for doc in cursor:
+        chunk.append(doc)
+        if len(chunk) >= settings.EXPORT_BATCH_SIZE:
+            used += await fold(chunk)
+            chunk = []
+
+    if chunk:
+        used += await fold(chunk)
+
+    # Model swapped mid-sync: part of this run was folded against the
+    # old baseline, so start over from a full backfill
+    if _basis is not basis:
+        _rebase(_basis)
+        return 0
+
+    _watermark = upper
+    if used and apply_corrections(get_price_table()):
+        _generation += 1
+
+    return used
+
+
+# ---------------------------------------------------------
+# 2️⃣ Checkpoints
+# ---------------------------------------------------------
+
+def _write_checkpoint(path: str, data: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    # Workers share the path; each writes its own temp file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(data, fh)
+    os.replace(tmp, path)
+
+
+async def checkpoint() -> None:
+    global _checkpoints, _checkpoint_failures, _last_checkpoint
+
+    if not online_prices.dirty or _watermark is None:
+        return
+
+    # Serialised on the loop, written off it
+    data = online_prices.to_dict()
+    data["watermark"] = _watermark.isoformat()
+    data["model_version"] = _model_version(_basis)
+    online_prices.dirty = False
+
+    try:
+        await asyncio.to_thread(_write_checkpoint, settings.ONLINE_PRICE_CHECKPOINT_PATH, data)
+        _checkpoints += 1
+        _last_checkpoint = datetime.utcnow()
+    except Exception as exc:
+        online_prices.dirty = True
+        _checkpoint_failures += 1
+        print(f"⚠️ Online price checkpoint failed: {exc}")
+
+
+def load_checkpoint() -> bool:
+    global _watermark, _generation
+
+    try:
+        with open(settings.ONLINE_PRICE_CHECKPOINT_PATH) as fh:
+            data = json.load(fh)
+        if data.get("model_version") != _model_version(_basis):
+            raise ValueError("measured against another price model")
+        online_prices.load_dict(data)
+        _watermark = datetime.fromisoformat(data["watermark"])
+    except FileNotFoundError:
+        return False
+    except (ValueError, TypeError, KeyError) as exc:
+        online_prices.state = {}
+        _watermark = None
+        print(f"⚠️ Online price checkpoint ignored, backfilling: {exc}")
+        return False
+
+    apply_corrections(get_price_table())
+    _generation += 1
+    return True
+
+
+async def _sync_loop() -> None:
+    global _syncs, _sync_failures, _generation
+
+    last_checkpoint = time.monotonic()
+
+    while True:
+        try:
+            await sync_online_prices()
+            _syncs += 1
+        except Exception as exc:
+            _sync_failures += 1
+            print(f"⚠️ Online price sync failed: {exc}")
+
+        if time.monotonic() - last_checkpoint >= settings.ONLINE_PRICE_CHECKPOINT_SECONDS:
+            if apply_corrections(get_price_table()):
+                _generation += 1
+            await checkpoint()
+            last_checkpoint = time.monotonic()
+
+        await asyncio.sleep(settings.ONLINE_PRICE_SYNC_SECONDS)
+
+
+async def start_online_prices() -> None:
+    """
+    Restore stats, then tail bids in the background (the first sync
+    catches up on everything since the saved watermark).
+    """
+
+    global _task
+
+    if not settings.ONLINE_PRICE_ENABLED:
+        return
+
+    if load_checkpoint():
+        print(f"✅ Online price stats restored ({len(online_prices.state)} pairs)")
+
+    if _task is None:
+        _task = asyncio.create_task(_sync_loop())
+
+
+async def stop_online_prices() -> None:
+    global _task
+
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+
+    await checkpoint()
+
+
+def online_price_stats() -> Dict[str, Any]:
+    now = time.time()
+
+    return {
+        "pairs": len(online_prices.state),
+        "updates": online_prices.updates,
+        "generation": _generation,
+        "model_version": _model_version(_basis),
+        "rebases": _rebases,
+        "syncs": _syncs,
+        "sync_failures": _sync_failures,
+        "watermark": _watermark.isoformat() if _watermark else None,
+        "checkpoints": _checkpoints,
+        "checkpoint_failures": _checkpoint_failures,
+        "last_checkpoint": _last_checkpoint.isoformat() if _last_checkpoint else None,
+        "corrections": {
+            f"{district}/{residue_type}": round(
+                math.exp(online_prices.correction((district, residue_type), now)), 4
+            )
+            for district, residue_type in list(online_prices.state)[:50]
+        },
+    }
+
+
+register_metrics("online_prices", online_price_stats)
@@ -1,31 +1,19 @@
 # app/ml/price_model.py
 
-from typing import Optional
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 from datetime import datetime
-import math
 
+import joblib
+import numpy as np
+import pandas as pd
 
-# ---------------------------------------------------------
-# Base Price Map (Fallback)
-# ---------------------------------------------------------
-
-BASE_PRICE_MAP = {
-    "biochar": 5500,
-    "pellets": 4200,
-    "compost": 2800,
-    "direct_incorporation": 1500,
-}
 
+# Price for residue types missing from the base price table
+DEFAULT_BASE_PRICE = 3000
 
-# ---------------------------------------------------------
-# District Adjustment Multiplier
-# ---------------------------------------------------------
-
-DISTRICT_MULTIPLIER = {
-    "Pune": 1.1,
-    "Nagpur": 0.95,
-    "Nashik": 1.05,
-}
+# Harvest-heavy months (oversupply)
+HARVEST_MONTHS = (3, 4, 10, 11)
 
 
 # ---------------------------------------------------------
@@ -45,21 +33,150 @@ def demand_adjustment(demand_score: float) -> float:
 # Seasonal Adjustment
 # ---------------------------------------------------------
 
-def seasonal_adjustment() -> float:
+def seasonal_adjustment(month: Optional[int] = None) -> float:
     """
-    Simple seasonal multiplier based on month.
+    Simple seasonal multiplier based on month (default: current).
     Harvest months may reduce price slightly due to oversupply.
     """
 
-    month = datetime.utcnow().month
+    month = month or datetime.utcnow().month
 
-    # Harvest-heavy months example
-    if month in [3, 4, 10, 11]:
+    if month in HARVEST_MONTHS:
         return 0.9
 
     return 1.0
 
 
+# ---------------------------------------------------------
+# Learned Model
+# ---------------------------------------------------------
+# Trained offline by app.ml.train_price_model on bids and orders.
+# When one is loaded the price table is filled from it; residue
+# types it never saw keep the formula above.
+
+CATEGORICAL_FEATURES = ["district", "residue_type"]
+NUMERIC_FEATURES = ["month_sin", "month_cos", "harvest", "demand_score"]
+
+
+def price_features(
+    districts: Sequence[Optional[str]],
+    residue_types: Sequence[str],
+    months: Union[int, np.ndarray],
+    demand_scores: Union[float, np.ndarray],
+) -> pd.DataFrame:
+    """
+    Model input frame, shared by training and serving so both see
+    the same encoding. Unknown districts are passed as "".
+    """
+
+    months = np.broadcast_to(np.asarray(months, dtype=int), (len(residue_types),))
+    angle = 2 * np.pi * (months - 1) / 12
+
+    return pd.DataFrame({
+        "district": [d or "" for d in districts],
+        "residue_type": list(residue_types),
+        "month_sin": np.sin(angle),
+        "month_cos": np.cos(angle),
+        "harvest": np.isin(months, HARVEST_MONTHS).astype(float),
+        "demand_score": np.clip(
+            np.broadcast_to(np.asarray(demand_scores, dtype=float), months.shape),
+            0.0,
+            1.0,
+        ),
+    })
+
+
+class PriceModel:
+    """
+    A trained price pipeline plus the metadata written with it.
+    """
+
+    def __init__(self, artifact: Dict[str, Any]):
+        self.pipeline = artifact["pipeline"]
+        self.version = artifact["version"]
+        self.kind = artifact.get("kind")
+        self.metrics = artifact.get("metrics", {})
+        self.districts = frozenset(artifact.get("districts", ()))
+        self.residue_types = frozenset(artifact.get("residue_types", ()))
+
+        self._calls = 0
+        self._rows = 0
+        self._total_ms = 0.0
+        self._last_ms = 0.0
+
+    @classmethod
+    def load(cls, path: str) -> "PriceModel":
+        # Memory-mapped: arrays stay in the shared page cache
+        return cls(joblib.load(path, mmap_mode="r"))
+
+    def predict(
+        self,
+        districts: Sequence[Optional[str]],
+        residue_types: Sequence[str],
+        months: Union[int, np.ndarray],
+        demand_scores: Union[float, np.ndarray],
+    ) -> np.ndarray:
+        """
+        Price per ton for many (district, type) rows in one call.
+        """
+
+        started = time.perf_counter()
+
+        frame = price_features(districts, residue_types, months, demand_scores)
+        prices = np.maximum(self.pipeline.predict(frame), 0.0)
+
+        self._last_ms = (time.perf_counter() - started) * 1000
+        self._total_ms += self._last_ms
+        self._calls += 1
+        self._rows += len(frame)
+
+        return prices
+
+    def latency(self) -> Dict[str, Any]:
+        return {
+            "calls": self._calls,
+            "rows": self._rows,
+            "last_ms": round(self._last_ms, 2),
+            "avg_ms": round(self._total_ms / self._calls, 2) if self._calls else 0.0,
+            "us_per_row": round(self._total_ms * 1000 / self._rows, 3) if self._rows else 0.0,
+        }
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "kind": self.kind,
+            "metrics": self.metrics,
+            "residue_types": sorted(self.residue_types),
+            "inference": self.latency(),
+        }
+
+
+_model: Optional[PriceModel] = None
+
+
+def get_price_model() -> Optional[PriceModel]:
+    return _model
+
+
+def set_price_model(model: Optional[PriceModel]) -> None:
+    """
+    Price tables built from now on use model.
+    """
+
+    global _model
+    _model = model
+
+
+def load_price_model(path: str) -> PriceModel:
+    """
+    Load a pinned artifact (PRICE_MODEL_PATH), bypassing the registry.
+    """
+
+    model = PriceModel.load(path)
+    set_price_model(model)
+    return model
+
+
 # ---------------------------------------------------------
 # Final Price Prediction
 # ---------------------------------------------------------
@@ -68,33 +185,52 @@ def predict_price(
     residue_type: str,
     district: Optional[str] = None,
     demand_score: float = 0.5,
+    month: Optional[int] = None,
 ) -> float:
     """
-    Predict price per ton using:
+    Predict price per ton using the learned model when one is
+    loaded, otherwise:
     - Base price
     - District multiplier
     - Demand score
     - Seasonal adjustment
+
+    Served from the precomputed price table (demand is quantised
+    to PRICE_TABLE_DEMAND_LEVELS steps).
     """
 
-    base_price = BASE_PRICE_MAP.get(residue_type, 3000)
+    # Imported here: the table itself is built from the factors above
+    from app.ml.price_table import get_price_table
+
+    price = get_price_table().lookup(residue_type, district, month, demand_score)
+
+    return round(price, 2)
+
+
+def predict_prices(
+    pairs: Sequence[Tuple[Optional[str], str]],
+    demand_score: Union[float, np.ndarray] = 0.5,
+    month: Optional[int] = None,
+) -> List[float]:
+    """
+    Batch predict_price() over (district, residue_type) pairs:
+    one vectorized table gather instead of a lookup per pair.
+    demand_score may be a scalar or one value per pair.
+    """
 
-    # District factor
-    district_factor = 1.0
-    if district and district in DISTRICT_MULTIPLIER:
-        district_factor = DISTRICT_MULTIPLIER[district]
+    from app.ml.price_table import get_price_table
 
-    # Demand factor
-    demand_factor = demand_adjustment(demand_score)
+    if not pairs:
+        return []
 
-    # Seasonal factor
-    season_factor = seasonal_adjustment()
+    table = get_price_table()
+    districts, residue_types = zip(*pairs)
 
-    predicted_price = (
-        base_price
-        * district_factor
-        * demand_factor
-        * season_factor
+    prices = table.gather(
+        table.district_codes(districts),
+        table.type_codes(residue_types),
+        month or datetime.utcnow().month,
+        demand_score,
     )
 
-    return round(predicted_price, 2)
\ No newline at end of file
+    return np.round(prices, 2).tolist()
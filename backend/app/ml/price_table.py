@@ -0,0 +1,289 @@
+# app/ml/price_table.py
+
+"""
+Precomputed price grid over district × residue type × month × demand.
+
+Built from the reference snapshot at startup and on every reference
+change, so price lookups are array indexing instead of dict lookups
+and date math. Index 0 on the district axis is "unknown district"
+(multiplier 1.0); the last row on the type axis is "unknown type"
+(DEFAULT_BASE_PRICE).
+
+With a learned price model loaded, the rows of residue types it was
+trained on are predicted in one batch at build time; every other
+row keeps the formula. adjustment[district, type] is a live
+multiplier on top, maintained from the bid stream by
+app.ml.online_prices.
+"""
+
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import register_metrics
+from app.ml.model_registry import ModelRegistry
+from app.ml.price_model import (
+    DEFAULT_BASE_PRICE,
+    PriceModel,
+    demand_adjustment,
+    get_price_model,
+    seasonal_adjustment,
+    set_price_model,
+)
+from app.services.reference_data import (
+    ReferenceSnapshot,
+    get_snapshot,
+    on_snapshot_change,
+    refresh_derived,
+)
+
+
+# Demand levels the learned model is evaluated at; the table's finer
+# levels are linearly interpolated between them
+MODEL_DEMAND_KNOTS = 11
+
+
+class PriceTable:
+    """
+    prices[district, type, month - 1, demand_level] in ₹ per ton,
+    served times adjustment[district, type].
+    """
+
+    def __init__(
+        self,
+        snapshot: ReferenceSnapshot,
+        demand_levels: int,
+        model: Optional[PriceModel] = None,
+    ):
+        started = time.perf_counter()
+
+        self.snapshot = snapshot
+        self.version = snapshot.version
+        self.demand_levels = demand_levels
+        self.model = model
+
+        # Integer-coded axes
+        districts = sorted(
+            set(snapshot.district_multipliers)
+            | set(snapshot.district_demand)
+            | (model.districts if model else set())
+        )
+        residue_types = list(dict.fromkeys(
+            [
+                *snapshot.alternative_types,
+                *snapshot.base_prices,
+                *sorted(model.residue_types if model else ()),
+            ]
+        ))
+
+        self.district_index: Dict[str, int] = {
+            name: i + 1 for i, name in enumerate(districts)
+        }
+        self.type_index: Dict[str, int] = {
+            name: i for i, name in enumerate(residue_types)
+        }
+        self.unknown_type = len(residue_types)
+
+        # Alternatives without a market price fall back to their income
+        base_price = np.array(
+            [
+                snapshot.base_prices.get(
+                    name,
+                    snapshot.alternatives.get(name, {}).get(
+                        "income_per_ton", DEFAULT_BASE_PRICE
+                    ),
+                )
+                for name in residue_types
+            ] + [DEFAULT_BASE_PRICE],
+            dtype=float,
+        )
+        district_factor = np.array(
+            [1.0] + [snapshot.district_multipliers.get(d, 1.0) for d in districts],
+            dtype=float,
+        )
+        season_factor = np.array(
+            [seasonal_adjustment(month) for month in range(1, 13)],
+            dtype=float,
+        )
+        demand_factor = demand_adjustment(np.linspace(0.0, 1.0, demand_levels))
+
+        self.prices = (
+            district_factor[:, None, None, None]
+            * base_price[None, :, None, None]
+            * season_factor[None, None, :, None]
+            * demand_factor[None, None, None, :]
+        )
+
+        self.model_types = []
+        if model is not None:
+            self._fill_from_model(model, [None, *districts], residue_types)
+
+        self.adjustment = np.ones(self.prices.shape[:2])
+
+        self.build_ms = (time.perf_counter() - started) * 1000
+
+    def _fill_from_model(
+        self,
+        model: PriceModel,
+        districts: Sequence[Optional[str]],
+        residue_types: Sequence[str],
+    ) -> None:
+        known = [i for i, name in enumerate(residue_types) if name in model.residue_types]
+        if not known:
+            return
+
+        knots = np.linspace(0.0, 1.0, MODEL_DEMAND_KNOTS)
+        shape = (len(districts), len(known), 12, MODEL_DEMAND_KNOTS)
+        d, t, m, k = (axis.ravel() for axis in np.indices(shape))
+
+        try:
+            predicted = model.predict(
+                [districts[i] for i in d],
+                [residue_types[known[i]] for i in t],
+                m + 1,
+                knots[k],
+            ).reshape(shape)
+        except Exception as exc:
+            print(f"⚠️ Price model {model.version} failed, using formula prices: {exc}")
+            return
+
+        # Evenly spaced knots: interpolate between the two around each level
+        position = np.linspace(0.0, MODEL_DEMAND_KNOTS - 1, self.demand_levels)
+        lower = np.minimum(position.astype(np.intp), MODEL_DEMAND_KNOTS - 2)
+        weight = position - lower
+
+        self.prices[:, known] = (
+            predicted[..., lower] * (1 - weight) + predicted[..., lower + 1] * weight
+        )
+        self.model_types = [residue_types[i] for i in known]
+
+    # ---------------------------------------------------------
+    # Axis Codes
+    # ---------------------------------------------------------
+
+    def district_codes(self, districts: Sequence[Optional[str]]) -> np.ndarray:
+        index = self.district_index
+        return np.fromiter((index.get(d, 0) for d in districts), dtype=np.intp)
+
+    def type_codes(self, residue_types: Sequence[str]) -> np.ndarray:
+        index, unknown = self.type_index, self.unknown_type
+        return np.fromiter((index.get(t, unknown) for t in residue_types), dtype=np.intp)
+
+    def demand_codes(self, demand_score: Union[float, np.ndarray]) -> np.ndarray:
+        demand = np.clip(np.asarray(demand_score, dtype=float), 0.0, 1.0)
+        return np.rint(demand * (self.demand_levels - 1)).astype(np.intp)
+
+    # ---------------------------------------------------------
+    # Lookups
+    # ---------------------------------------------------------
+
+    def lookup(
+        self,
+        residue_type: str,
+        district: Optional[str] = None,
+        month: Optional[int] = None,
+        demand_score: float = 0.5,
+    ) -> float:
+        month = month or datetime.utcnow().month
+        d = self.district_index.get(district, 0)
+        t = self.type_index.get(residue_type, self.unknown_type)
+
+        return float(
+            self.prices[d, t, month - 1, self.demand_codes(demand_score)]
+            * self.adjustment[d, t]
+        )
+
+    def gather(
+        self,
+        district_codes: np.ndarray,
+        type_codes: np.ndarray,
+        month: Union[int, np.ndarray],
+        demand_score: Union[float, np.ndarray],
+    ) -> np.ndarray:
+        """
+        Vectorized lookup; inputs broadcast against each other,
+        e.g. districts (N, 1) with types (M,) gives (N, M).
+        """
+
+        return self.prices[
+            district_codes,
+            type_codes,
+            np.asarray(month) - 1,
+            self.demand_codes(demand_score),
+        ] * self.adjustment[district_codes, type_codes]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "model_version": self.model.version if self.model else None,
+            "model_types": self.model_types,
+            "shape": list(self.prices.shape),
+            "bytes": self.prices.nbytes,
+            "build_ms": round(self.build_ms, 2),
+        }
+
+
+# ---------------------------------------------------------
+# Current Table
+# ---------------------------------------------------------
+
+_table = PriceTable(get_snapshot(), settings.PRICE_TABLE_DEMAND_LEVELS)
+
+
+def _rebuild_table(snapshot: ReferenceSnapshot) -> None:
+    global _table
+    model = get_price_model()
+
+    # Already built off the event loop by a model swap
+    if _table.snapshot is snapshot and _table.model is model:
+        return
+
+    _table = PriceTable(snapshot, settings.PRICE_TABLE_DEMAND_LEVELS, model)
+
+
+on_snapshot_change(_rebuild_table)
+
+
+def get_price_table(snapshot: Optional[ReferenceSnapshot] = None) -> PriceTable:
+    table = _table
+
+    if snapshot is None or table.snapshot is snapshot:
+        return table
+
+    return PriceTable(snapshot, settings.PRICE_TABLE_DEMAND_LEVELS, get_price_model())
+
+
+register_metrics("price_table", lambda: _table.stats())
+
+
+# ---------------------------------------------------------
+# Price Model Registry
+# ---------------------------------------------------------
+
+def _prepare_table(model: PriceModel) -> PriceTable:
+    # Worker thread: the batch predict happens here, not per request
+    return PriceTable(get_snapshot(), settings.PRICE_TABLE_DEMAND_LEVELS, model)
+
+
+def _swap_model(model: PriceModel, table: PriceTable) -> None:
+    global _table
+
+    set_price_model(model)
+    _table = table
+
+    # Engines and cached advisories priced with the previous model
+    refresh_derived()
+
+
+price_model_registry = ModelRegistry(
+    "price",
+    settings.PRICE_MODEL_DIR,
+    loader=PriceModel,
+    prepare=_prepare_table,
+    on_swap=_swap_model,
+)
+
+register_metrics("price_model", price_model_registry.stats)
@@ -0,0 +1,503 @@
+# app/ml/train_price_model.py
+
+"""
+Offline training for the learned residue price model.
+
+    python -m app.ml.train_price_model [--model gbm|linear] [--days 365] [--force]
+
+Bids and orders are streamed from MongoDB in chunks of
+PRICE_MODEL_TRAIN_CHUNK_SIZE, joined with their listing's district and
+residue type, and turned into price_model.price_features(). The
+demand_score feature is what serving looks up: demand_service scores
+over the DEMAND_WINDOW_DAYS before each row's day, shrunk towards the
+district_demand table, so the model is trained on the quantity its
+price table is later indexed by. The newest
+rows are held out to compare the model with the current formula; the
+artifact is only written when it beats the formula, unless --force,
+as a new version in the price model registry; --promote makes it the
+active one.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from bson import ObjectId
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.linear_model import Ridge
+from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from app.core.config import settings
+from app.ml.model_registry import ModelRegistry
+from app.ml.price_model import CATEGORICAL_FEATURES, NUMERIC_FEATURES, price_features
+from app.ml.price_table import PriceTable
+from app.services.demand_service import (
+    ACCEPTED,
+    BIDS,
+    LISTINGS,
+    SIGNALS,
+    compute_scores,
+    shrink,
+)
+from app.services.financial_service import DEFAULT_DEMAND_SCORE
+
+
+# Realised order prices count more than bids
+ORDER_WEIGHT = 2.0
+
+# Below this many usable rows a holdout comparison means nothing
+MIN_TRAINING_ROWS = 50
+
+ListingContext = Dict[str, Optional[Tuple[str, str]]]
+
+HISTORY_COLUMNS = [
+    "district", "residue_type", "price_per_ton", "quantity_tons", "created_at", "source",
+]
+
+
+# ---------------------------------------------------------
+# 1️⃣ Streaming From MongoDB
+# ---------------------------------------------------------
+
+async def _resolve_listings(db, listing_ids, listings: ListingContext) -> None:
+    """
+    Add (district, residue_type) of listings not seen yet, one
+    query per chunk.
+    """
+
+    missing = {i for i in listing_ids if i not in listings}
+    if not missing:
+        return
+
+    ids = [ObjectId(i) for i in missing if ObjectId.is_valid(i)]
+
+    async for doc in db.listings.find(
+        {"_id": {"$in": ids}},
+        {"district": 1, "residue_type": 1},
+    ):
+        listings[str(doc["_id"])] = (doc.get("district"), doc.get("residue_type"))
+
+    for listing_id in missing:
+        listings.setdefault(listing_id, None)
+
+
+async def _chunk_frame(
+    db,
+    docs: List[Dict[str, Any]],
+    source: str,
+    listings: ListingContext,
+) -> pd.DataFrame:
+    listing_ids = [str(doc.get("listing_id")) for doc in docs]
+    await _resolve_listings(db, listing_ids, listings)
+
+    rows = [
+        (
+            *listings[listing_id],
+            doc.get("price_per_ton"),
+            doc.get("quantity_tons"),
+            doc.get("created_at"),
+        )
+        for listing_id, doc in zip(listing_ids, docs)
+        if listings[listing_id]
+    ]
+
+    frame = pd.DataFrame(rows, columns=HISTORY_COLUMNS[:-1])
+    frame["source"] = source
+
+    return frame
+
+
+async def stream_prices(
+    db,
+    collection: str,
+    query: Dict[str, Any],
+    listings: ListingContext,
+    chunk_size: int,
+) -> AsyncIterator[pd.DataFrame]:
+    """
+    One DataFrame per chunk_size documents, so memory stays bounded
+    by the chunk, not the collection.
+    """
+
+    cursor = db[collection].find(
+        query,
+        {"listing_id": 1, "price_per_ton": 1, "quantity_tons": 1, "created_at": 1},
+    ).batch_size(chunk_size)
+
+    docs = []
+    async for doc in cursor:
+        docs.append(doc)
+        if len(docs) >= chunk_size:
+            yield await _chunk_frame(db, docs, collection, listings)
+            docs = []
+
+    if docs:
+        yield await _chunk_frame(db, docs, collection, listings)
+
+
+async def load_price_history(db, since: datetime, chunk_size: int) -> pd.DataFrame:
+    listings: ListingContext = {}
+    chunks = []
+
+    sources = (
+        ("bids", {"created_at": {"$gte": since}}),
+        ("orders", {"created_at": {"$gte": since}, "status": {"$ne": "cancelled"}}),
+    )
+
+    for collection, query in sources:
+        async for chunk in stream_prices(db, collection, query, listings, chunk_size):
+            chunks.append(chunk)
+
+    if not chunks:
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+
+    frame = pd.concat(chunks, ignore_index=True)
+    frame["price_per_ton"] = pd.to_numeric(frame["price_per_ton"], errors="coerce")
+    frame["quantity_tons"] = pd.to_numeric(frame["quantity_tons"], errors="coerce")
+    frame["created_at"] = pd.to_datetime(frame["created_at"], errors="coerce")
+
+    frame = frame.dropna(subset=["residue_type", "price_per_ton", "created_at"])
+    frame = frame[frame["price_per_ton"] > 0]
+
+    return frame.sort_values("created_at", kind="stable").reset_index(drop=True)
+
+
+async def load_listing_activity(db, since: datetime, chunk_size: int) -> pd.DataFrame:
+    """
+    district, residue_type, created_at of listings, for the listing
+    counts behind the demand feature.
+    """
+
+    cursor = db.listings.find(
+        {"created_at": {"$gte": since}},
+        {"district": 1, "residue_type": 1, "created_at": 1},
+    ).batch_size(chunk_size)
+
+    rows = [
+        (doc.get("district"), doc.get("residue_type"), doc.get("created_at"))
+        async for doc in cursor
+    ]
+
+    frame = pd.DataFrame(rows, columns=["district", "residue_type", "created_at"])
+    frame["created_at"] = pd.to_datetime(frame["created_at"], errors="coerce")
+
+    return frame.dropna()
+
+
+# ---------------------------------------------------------
+# 2️⃣ Features
+# ---------------------------------------------------------
+
+def add_demand_score(
+    frame: pd.DataFrame,
+    listings: pd.DataFrame,
+    snapshot,
+    window_days: int = settings.DEMAND_WINDOW_DAYS,
+) -> pd.DataFrame:
+    """
+    demand_score per row as demand_service would have served it the
+    day before: compute_scores() over listings, bids and accepted tons
+    of the preceding window_days, shrunk towards district_demand.
+    Only activity before the row's day is used, so held-out rows
+    never leak into training features.
+    """
+
+    events = pd.concat([
+        listings.assign(signal=LISTINGS, amount=1.0),
+        frame[frame["source"] == "bids"].assign(signal=BIDS, amount=1.0),
+        frame[frame["source"] == "orders"].assign(
+            signal=ACCEPTED, amount=frame["quantity_tons"].fillna(0.0),
+        ),
+    ], ignore_index=True)
+    events = events.dropna(subset=["district", "residue_type"])
+
+    keys = sorted(set(zip(events["district"], events["residue_type"])))
+    key_index = {key: i for i, key in enumerate(keys)}
+
+    first = int(frame["created_at"].min().toordinal()) - window_days
+    last = int(frame["created_at"].max().toordinal())
+
+    # counts[1 + day, pair, signal]; cumulative[d] then sums days < d
+    event_days = np.array([d.toordinal() for d in events["created_at"]], dtype=int) - first
+    pairs = np.array(
+        [key_index[key] for key in zip(events["district"], events["residue_type"])],
+        dtype=int,
+    )
+    inside = (event_days >= 0) & (event_days <= last - first)
+
+    counts = np.zeros((last - first + 2, len(keys), len(SIGNALS)))
+    np.add.at(
+        counts,
+        (event_days[inside] + 1, pairs[inside], events["signal"].to_numpy(dtype=int)[inside]),
+        events["amount"].to_numpy(dtype=float)[inside],
+    )
+    cumulative = np.cumsum(counts, axis=0)
+
+    row_days = np.array([d.toordinal() for d in frame["created_at"]], dtype=int) - first
+    scores = np.empty(len(frame))
+
+    for day in np.unique(row_days):
+        # The window_days before the row's day
+        totals = cumulative[day] - cumulative[max(day - window_days, 0)]
+        live = compute_scores(totals, keys)
+
+        for row in np.flatnonzero(row_days == day):
+            district = frame["district"].iat[row]
+            residue_type = frame["residue_type"].iat[row]
+            prior = snapshot.district_demand.get(district, {}).get(
+                residue_type, DEFAULT_DEMAND_SCORE,
+            )
+            scores[row] = shrink(live.get((district, residue_type)), prior)
+
+    frame = frame.copy()
+    frame["demand_score"] = scores
+
+    return frame
+
+
+def feature_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    return price_features(
+        frame["district"].tolist(),
+        frame["residue_type"].tolist(),
+        frame["created_at"].dt.month.to_numpy(),
+        frame["demand_score"].to_numpy(),
+    )
+
+
+def sample_weights(frame: pd.DataFrame) -> np.ndarray:
+    return np.where(frame["source"] == "orders", ORDER_WEIGHT, 1.0)
+
+
+# ---------------------------------------------------------
+# 3️⃣ Training & Evaluation
+# ---------------------------------------------------------
+
+def build_pipeline(kind: str) -> Pipeline:
+    categories = OneHotEncoder(handle_unknown="ignore", sparse_output=False)
+
+    if kind == "linear":
+        features = ColumnTransformer([
+            ("categories", categories, CATEGORICAL_FEATURES),
+            ("numeric", StandardScaler(), NUMERIC_FEATURES),
+        ])
+        regressor = Ridge(alpha=1.0)
+    elif kind == "gbm":
+        features = ColumnTransformer(
+            [("categories", categories, CATEGORICAL_FEATURES)],
+            remainder="passthrough",
+        )
+        regressor = HistGradientBoostingRegressor(
+            max_iter=300,
+            learning_rate=0.05,
+            random_state=0,
+        )
+    else:
+        raise ValueError(f"Unknown model kind: {kind}")
+
+    return Pipeline([("features", features), ("model", regressor)])
+
+
+def _scores(actual: np.ndarray, predicted: np.ndarray) -> Dict[str, float]:
+    return {
+        "mae": round(float(mean_absolute_error(actual, predicted)), 2),
+        "mape": round(float(mean_absolute_percentage_error(actual, predicted)), 4),
+    }
+
+
+def baseline_prices(frame: pd.DataFrame, snapshot) -> np.ndarray:
+    """
+    What predict_price() answers today: the formula price table.
+    """
+
+    table = PriceTable(snapshot, settings.PRICE_TABLE_DEMAND_LEVELS)
+
+    return table.gather(
+        table.district_codes(frame["district"].tolist()),
+        table.type_codes(frame["residue_type"].tolist()),
+        frame["created_at"].dt.month.to_numpy(),
+        frame["demand_score"].to_numpy(),
+    )
+
+
+def train_and_evaluate(
+    frame: pd.DataFrame,
+    listings: pd.DataFrame,
+    kind: str,
+    test_fraction: float,
+    snapshot,
+) -> Tuple[Pipeline, Dict[str, Any]]:
+    """
+    Fit on the older rows, score the newest test_fraction against
+    the formula, then refit on everything for the artifact.
+    """
+
+    frame = add_demand_score(frame, listings, snapshot)
+    cut = int(len(frame) * (1 - test_fraction))
+    train, test = frame.iloc[:cut], frame.iloc[cut:]
+
+    pipeline = build_pipeline(kind)
+    pipeline.fit(
+        feature_frame(train),
+        train["price_per_ton"],
+        model__sample_weight=sample_weights(train),
+    )
+
+    actual = test["price_per_ton"].to_numpy()
+    model_scores = _scores(actual, pipeline.predict(feature_frame(test)))
+    baseline_scores = _scores(actual, baseline_prices(test, snapshot))
+
+    pipeline.fit(
+        feature_frame(frame),
+        frame["price_per_ton"],
+        model__sample_weight=sample_weights(frame),
+    )
+
+    return pipeline, {
+        "rows": len(frame),
+        "train_rows": len(train),
+        "test_rows": len(test),
+        "model": model_scores,
+        "baseline": baseline_scores,
+        "beats_baseline": model_scores["mae"] < baseline_scores["mae"],
+    }
+
+
+# ---------------------------------------------------------
+# 4️⃣ Artifact
+# ---------------------------------------------------------
+
+def save_artifact(
+    pipeline: Pipeline,
+    kind: str,
+    metrics: Dict[str, Any],
+    frame: pd.DataFrame,
+    registry: ModelRegistry,
+) -> str:
+    """
+    Write a new registry version plus a JSON sidecar and return the
+    version. Written uncompressed so its arrays can be memory-mapped
+    when loaded.
+    """
+
+    stamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    os.makedirs(registry.directory, exist_ok=True)
+
+    artifact = {
+        "pipeline": pipeline,
+        "version": None,
+        "kind": kind,
+        "trained_at": datetime.utcnow().isoformat(),
+        "districts": sorted(frame["district"].dropna().unique().tolist()),
+        "residue_types": sorted(frame["residue_type"].unique().tolist()),
+        "metrics": metrics,
+        # demand_score input is demand_service's served score
+        "demand_feature": "demand_service",
+    }
+
+    tmp = os.path.join(registry.directory, f".{stamp}.{os.getpid()}.tmp")
+
+    # Readers never see a half-written file, and a hard link never
+    # replaces an artifact trained in the same second: the version
+    # gets a -N suffix instead
+    for attempt in range(100):
+        version = stamp if attempt == 0 else f"{stamp}-{attempt}"
+        if os.path.exists(registry.path(version)):
+            continue
+
+        artifact["version"] = version
+        joblib.dump(artifact, tmp)
+        try:
+            os.link(tmp, registry.path(version))
+            break
+        except FileExistsError:
+            continue
+        finally:
+            os.unlink(tmp)
+    else:
+        raise FileExistsError(f"No free {registry.name} model version for {stamp}")
+
+    path = registry.path(version)
+
+    meta = {key: value for key, value in artifact.items() if key != "pipeline"}
+    with open(path[:-len(".joblib")] + ".json", "w") as fh:
+        json.dump(meta, fh, indent=2)
+
+    return version
+
+
+# ---------------------------------------------------------
+# 5️⃣ CLI
+# ---------------------------------------------------------
+
+async def _main(args: argparse.Namespace) -> int:
+    from app.core.database import (
+        close_mongo_connection,
+        connect_to_mongo,
+        get_analytics_database,
+    )
+    from app.services.reference_data import load_snapshot
+
+    await connect_to_mongo()
+    try:
+        snapshot = await load_snapshot()
+        since = datetime.utcnow() - timedelta(days=args.days)
+
+        frame = await load_price_history(
+            get_analytics_database(),
+            since,
+            settings.PRICE_MODEL_TRAIN_CHUNK_SIZE,
+        )
+        # Listings from one demand window earlier feed the first rows
+        listings = await load_listing_activity(
+            get_analytics_database(),
+            since - timedelta(days=settings.DEMAND_WINDOW_DAYS),
+            settings.PRICE_MODEL_TRAIN_CHUNK_SIZE,
+        )
+    finally:
+        await close_mongo_connection()
+
+    if len(frame) < MIN_TRAINING_ROWS:
+        print(f"❌ Only {len(frame)} usable bids/orders, need {MIN_TRAINING_ROWS}")
+        return 1
+
+    pipeline, metrics = train_and_evaluate(
+        frame, listings, args.model, args.test_fraction, snapshot,
+    )
+    print(json.dumps(metrics, indent=2))
+
+    if not metrics["beats_baseline"] and not args.force:
+        print("❌ Model does not beat the formula baseline, nothing written (use --force)")
+        return 1
+
+    registry = ModelRegistry("price", args.output_dir)
+    version = save_artifact(pipeline, args.model, metrics, frame, registry)
+    print(f"✅ Wrote {registry.path(version)}")
+
+    if args.promote:
+        registry.promote(version)
+        print(f"✅ Promoted {version}, workers swap on their next poll")
+
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the residue price model")
+    parser.add_argument("--model", choices=["gbm", "linear"], default="gbm")
+    parser.add_argument("--days", type=int, default=365, help="history window")
+    parser.add_argument("--test-fraction", type=float, default=0.2, help="newest rows held out")
+    parser.add_argument("--output-dir", default=settings.PRICE_MODEL_DIR)
+    parser.add_argument("--force", action="store_true", help="write even if the baseline wins")
+    parser.add_argument("--promote", action="store_true", help="make the new version active")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(_main(args)))
@@ -1,7 +1,7 @@
 # app/models/advisory_model.py
 
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 
 class AdvisoryModel:
@@ -41,7 +41,7 @@ class AdvisoryModel:
         type: str,
         setup_cost: float,
         expected_income: float,
-        break_even_months: int,
+        break_even_months: Optional[int],
         viability_score: float,
         co2_saved_tons: float,
     ) -> Dict[str, Any]:
@@ -0,0 +1,89 @@
+# app/repositories/base.py
+
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.core.database import get_database
+
+
+class Repository:
+    """
+    Thin access layer over one Motor collection.
+    Every read applies an explicit projection, so documents never
+    carry more fields over the wire than the caller asked for.
+    """
+
+    def __init__(
+        self,
+        collection: str,
+        fields: Sequence[str],
+        public_fields: Optional[Sequence[str]] = None,
+        get_db: Callable = get_database,
+    ):
+        self.collection_name = collection
+        # Every field a caller may project
+        self.fields = tuple(fields)
+        # Fields returned by default and selectable through ?fields=
+        self.public_fields = tuple(public_fields or fields)
+        self._get_db = get_db
+
+    @property
+    def collection(self):
+        return self._get_db()[self.collection_name]
+
+    # ---------------------------------------------------------
+    # Projection Helpers
+    # ---------------------------------------------------------
+
+    def projection(self, fields: Optional[Sequence[str]] = None) -> Dict[str, int]:
+        selected = self.public_fields if fields is None else fields
+
+        unknown = set(selected) - set(self.fields)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+        # _id is always returned; it becomes the public "id"
+        return {"_id": 1, **{field: 1 for field in selected}}
+
+    def parse_fields(self, raw: Optional[str]) -> Optional[List[str]]:
+        """
+        Parse a sparse-fieldset query value such as "district,price_per_ton".
+        """
+
+        if not raw:
+            return None
+
+        fields = [f.strip() for f in raw.split(",") if f.strip() and f.strip() != "id"]
+
+        unknown = set(fields) - set(self.public_fields)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+        return fields
+
+    # ---------------------------------------------------------
+    # Reads
+    # ---------------------------------------------------------
+
+    async def find_one(
+        self,
+        query: Dict[str, Any],
+        fields: Optional[Sequence[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one(query, self.projection(fields))
+
+    def find(
+        self,
+        query: Dict[str, Any],
+        fields: Optional[Sequence[str]] = None,
+        sort: Optional[List[tuple]] = None,
+        limit: int = 0,
+    ):
+        cursor = self.collection.find(query, self.projection(fields))
+
+        if sort:
+            cursor = cursor.sort(sort)
+
+        if limit:
+            cursor = cursor.limit(limit)
+
+        return cursor
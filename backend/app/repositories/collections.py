@@ -0,0 +1,72 @@
+# app/repositories/collections.py
+
+from app.repositories.base import Repository
+
+
+# ---------------------------------------------------------
+# Users (password_hash is never part of the default projection)
+# ---------------------------------------------------------
+
+users_repo = Repository(
+    "users",
+    fields=[
+        "name", "phone", "role", "is_active",
+        "token_epoch", "created_at", "password_hash",
+    ],
+    public_fields=[
+        "name", "phone", "role", "is_active",
+        "token_epoch", "created_at",
+    ],
+)
+
+
+# ---------------------------------------------------------
+# Reference Data
+# ---------------------------------------------------------
+
+crops_repo = Repository(
+    "crops",
+    fields=["name", "residue_ratio", "created_at"],
+)
+
+
+# ---------------------------------------------------------
+# Marketplace
+# ---------------------------------------------------------
+
+listings_repo = Repository(
+    "listings",
+    fields=[
+        "farmer_id", "crop_type", "residue_type", "quantity_tons",
+        "price_per_ton", "district", "status", "created_at",
+    ],
+)
+
+orders_repo = Repository(
+    "orders",
+    fields=[
+        "buyer_id", "farmer_id", "listing_id", "quantity_tons",
+        "price_per_ton", "total_amount", "status", "created_at",
+    ],
+)
+
+alerts_repo = Repository(
+    "alerts",
+    fields=[
+        "buyer_id", "listing_id", "residue_type", "district",
+        "message", "status", "created_at",
+    ],
+)
+
+
+# ---------------------------------------------------------
+# Advisories
+# ---------------------------------------------------------
+
+advisories_repo = Repository(
+    "advisories",
+    fields=[
+        "farmer_id", "field_size_acres", "crop_type", "location_district",
+        "state", "residue_estimate_tons", "recommendations", "created_at",
+    ],
+)
@@ -1,7 +1,7 @@
 # app/schemas/advisory_schema.py
 
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 
 
 # ---------------------------------------------------------
@@ -14,6 +14,11 @@ class AdvisoryRequestSchema(BaseModel):
     location_district: str
     state: str
 
+    # Monte Carlo risk (single /analyze only)
+    simulate: bool = False
+    samples: Optional[int] = Field(None, ge=100)
+    seed: Optional[int] = Field(None, ge=0)
+
 
 # ---------------------------------------------------------
 # 2️⃣ Recommendation Schema
@@ -23,7 +28,7 @@ class RecommendationSchema(BaseModel):
     type: str
     setup_cost: float
     expected_income: float
-    break_even_months: int
+    break_even_months: Optional[int]  # None: not within the horizon
     viability_score: float
     co2_saved_tons: float
 
@@ -48,4 +53,31 @@ class AdvisoryHistorySchema(BaseModel):
     location_district: str
     state: str
     residue_estimate_tons: float
-    recommendations: List[RecommendationSchema]
\ No newline at end of file
+    recommendations: List[RecommendationSchema]
+
+
+# ---------------------------------------------------------
+# 5️⃣ Sensitivity Sweep Schema
+# ---------------------------------------------------------
+
+class SweepRangeSchema(BaseModel):
+    min: float = Field(..., ge=0)
+    max: float = Field(..., ge=0)
+    steps: int = Field(..., ge=1)
+
+
+class SensitivityRequestSchema(BaseModel):
+    field_size_acres: float = Field(..., gt=0)
+    crop_type: str
+    location_district: str
+    state: str
+    month: Optional[int] = Field(None, ge=1, le=12)
+
+    # Alternative the price / setup cost multipliers apply to (all if omitted)
+    target: Optional[str] = None
+
+    # Omitted parameters stay at their baseline
+    price_multiplier: Optional[SweepRangeSchema] = None
+    residue_ratio: Optional[SweepRangeSchema] = None
+    setup_cost_multiplier: Optional[SweepRangeSchema] = None
+    demand_score: Optional[SweepRangeSchema] = None
@@ -0,0 +1,69 @@
+# app/schemas/reference_schema.py
+
+from typing import Annotated, Any, Dict
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+
+NonNegative = Annotated[float, Field(ge=0)]
+Positive = Annotated[float, Field(gt=0)]
+Share = Annotated[float, Field(ge=0, le=1)]
+
+
+# ---------------------------------------------------------
+# 1️⃣ Table Rows
+# ---------------------------------------------------------
+
+class AlternativeCostSchema(BaseModel):
+    setup_cost_per_ton: NonNegative
+    income_per_ton: NonNegative
+    co2_saving_per_ton: NonNegative
+
+
+class CarbonSchema(BaseModel):
+    credit_price_per_ton: NonNegative
+
+
+class RiskSchema(BaseModel):
+    price_volatility: NonNegative
+    yield_volatility: NonNegative
+    cost_volatility: NonNegative
+
+
+class CashflowSchema(BaseModel):
+    horizon_months: int = Field(..., ge=1, le=600)
+    annual_discount_rate: float = Field(..., gt=-1)
+    capex_share: Share
+    processing_months: int = Field(..., ge=0)
+    sale_start_month: int = Field(..., ge=0)
+    sale_months: int = Field(..., ge=1)
+    carbon_credit_month: int = Field(..., ge=0)
+
+
+# ---------------------------------------------------------
+# 2️⃣ Whole Tables
+# ---------------------------------------------------------
+# A PUT replaces the whole table, so every field is required.
+
+REFERENCE_TABLE_SCHEMAS: Dict[str, TypeAdapter] = {
+    "alternatives": TypeAdapter(
+        Annotated[Dict[str, AlternativeCostSchema], Field(min_length=1)]
+    ),
+    "weights": TypeAdapter(Dict[str, NonNegative]),
+    "weight_profiles": TypeAdapter(Dict[str, Dict[str, NonNegative]]),
+    "district_demand": TypeAdapter(Dict[str, Dict[str, Share]]),
+    "base_prices": TypeAdapter(Dict[str, Positive]),
+    "district_multipliers": TypeAdapter(Dict[str, Positive]),
+    "carbon": TypeAdapter(CarbonSchema),
+    "risk": TypeAdapter(RiskSchema),
+    "cashflow": TypeAdapter(CashflowSchema),
+}
+
+
+def validate_reference_table(name: str, data: Any) -> Dict[str, Any]:
+    """
+    Parsed table as plain JSON data; raises pydantic ValidationError.
+    """
+
+    adapter = REFERENCE_TABLE_SCHEMAS[name]
+    return adapter.dump_python(adapter.validate_python(data), mode="json")
@@ -1,7 +1,7 @@
 # app/schemas/user_schema.py
 
 from pydantic import BaseModel, Field
-from typing import Literal
+from typing import Literal, Optional
 
 
 # ---------------------------------------------------------
@@ -63,4 +63,13 @@ class TokenResponseSchema(BaseModel):
     token_type: str
     role: str
     user_id: str
-    name: str
\ No newline at end of file
+    name: str
+
+
+# ---------------------------------------------------------
+# 5️⃣ Access Update Schema (Admin Use)
+# ---------------------------------------------------------
+
+class UserAccessUpdateSchema(BaseModel):
+    role: Optional[Literal["farmer", "buyer", "admin"]] = None
+    is_active: Optional[bool] = None
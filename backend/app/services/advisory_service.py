@@ -0,0 +1,373 @@
+# app/services/advisory_service.py
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pymongo.errors import BulkWriteError
+
+from app.core.cache import AsyncLRUCache
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.metrics import register_metrics
+from app.ml.online_prices import correction_generation
+from app.models.advisory_model import AdvisoryModel
+from app.schemas.advisory_schema import AdvisoryRequestSchema
+from app.services.residue_service import calculate_residue, get_residue_ratios
+from app.services.financial_service import (
+    DEFAULT_DEMAND_SCORE,
+    calculate_financials,
+    calculate_financials_matrix,
+    financials_to_lists,
+)
+from app.services.demand_service import demand_generation, demand_matrix
+from app.services.ranking_service import (
+    district_demand_matrix,
+    rank_alternatives,
+    rank_matrix,
+    resolve_weights,
+)
+from app.services.reference_data import (
+    get_snapshot,
+    on_snapshot_change,
+    resolve_crop_ratios,
+)
+from app.services.rollup_service import record_advisories, schedule_rollups
+from app.services.write_behind import WriteBehindQueue
+
+
+# ---------------------------------------------------------
+# Write-behind Queue
+# ---------------------------------------------------------
+
+advisory_writer = WriteBehindQueue(
+    collection="advisories",
+    max_size=settings.ADVISORY_QUEUE_MAX_SIZE,
+    batch_size=settings.ADVISORY_FLUSH_BATCH_SIZE,
+    flush_interval_seconds=settings.ADVISORY_FLUSH_INTERVAL_MS / 1000,
+    on_flush=record_advisories,
+    max_retries=settings.ADVISORY_FLUSH_MAX_RETRIES,
+    retry_backoff_seconds=settings.ADVISORY_FLUSH_RETRY_BACKOFF_MS / 1000,
+)
+
+register_metrics("advisory_writer", advisory_writer.stats)
+
+
+# ---------------------------------------------------------
+# 1️⃣ Persist Advisory
+# ---------------------------------------------------------
+
+async def persist_advisory(advisory_doc: Dict[str, Any]) -> None:
+    """
+    Store an advisory document.
+    With ADVISORY_WRITE_BEHIND enabled the document is queued and
+    flushed in batches; the caller only waits when the queue is full.
+    Otherwise it is inserted and its rollup updated in the background.
+    """
+
+    if settings.ADVISORY_WRITE_BEHIND:
+        await advisory_writer.put(advisory_doc)
+        return
+
+    db = get_database()
+    await db.advisories.insert_one(advisory_doc)
+    schedule_rollups([advisory_doc])
+
+
+async def persist_advisories(advisory_docs: List[Dict[str, Any]]) -> Dict[int, str]:
+    """
+    Store many advisories with one unordered bulk insert.
+    Returns the error message per position of documents that were
+    rejected; the others are stored and rolled up.
+    """
+
+    if not advisory_docs:
+        return {}
+
+    db = get_database()
+    failed: Dict[int, str] = {}
+
+    try:
+        await db.advisories.insert_many(advisory_docs, ordered=False)
+    except BulkWriteError as exc:
+        failed = {
+            err["index"]: err.get("errmsg", "write failed")
+            for err in exc.details.get("writeErrors", [])
+        }
+
+    schedule_rollups([doc for i, doc in enumerate(advisory_docs) if i not in failed])
+
+    return failed
+
+
+# ---------------------------------------------------------
+# 2️⃣ Batch Advisory
+# ---------------------------------------------------------
+
+async def analyze_advisory_batch(
+    items: Sequence[AdvisoryRequestSchema],
+    farmer_id: str,
+    weight_profile: Optional[str] = None,
+    top_n: Optional[int] = None,
+    pareto_only: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Analyze many fields at once.
+    Crops are resolved with one query, financials and rankings are
+    computed as (fields × alternatives) arrays, and all advisories
+    are persisted with one bulk write. Returns one result per item,
+    in input order, carrying either recommendations or an error.
+    """
+
+    # One snapshot for the whole batch keeps columns consistent
+    snapshot = get_snapshot()
+    alternative_types = snapshot.alternative_types
+    weights = resolve_weights(weight_profile, snapshot)
+
+    ratios = await get_residue_ratios(item.crop_type for item in items)
+
+    valid = [i for i, item in enumerate(items) if item.crop_type in ratios]
+    results: List[Dict[str, Any]] = [
+        {"index": i, "error": "Crop not supported"}
+        for i in range(len(items))
+    ]
+
+    if not valid:
+        return results
+
+    valid_items = [items[i] for i in valid]
+    districts = [item.location_district for item in valid_items]
+
+    residue_tons = np.round(
+        np.array([item.field_size_acres for item in valid_items])
+        * np.array([ratios[item.crop_type] for item in valid_items]),
+        2,
+    )
+
+    fin = calculate_financials_matrix(
+        residue_tons,
+        districts,
+        demand_score=demand_matrix(
+            districts, alternative_types, DEFAULT_DEMAND_SCORE, snapshot,
+        ),
+        snapshot=snapshot,
+    )
+
+    final_score, order, keep = rank_matrix(
+        {
+            "profit": fin["profit"],
+            "break_even": fin["break_even_months"],
+            "co2": fin["co2_saved_tons"],
+            "npv": fin["npv"],
+            "irr": fin["irr"],
+            "demand": district_demand_matrix(districts, alternative_types, snapshot),
+        },
+        weights,
+        top_n,
+        pareto_only,
+    )
+
+    # Plain Python values once, instead of per-element numpy scalars
+    columns = financials_to_lists(fin)
+    scores = final_score.tolist()
+    tons = residue_tons.tolist()
+
+    advisory_docs = []
+
+    for row, (index, item) in enumerate(zip(valid, valid_items)):
+        recommendations = []
+
+        for col, kept in zip(order[row].tolist(), keep[row].tolist()):
+            if not kept:
+                continue
+
+            rec = AdvisoryModel.recommendation(
+                type=alternative_types[col],
+                setup_cost=columns["setup_cost"][row][col],
+                expected_income=columns["expected_income"][row][col],
+                break_even_months=columns["break_even_months"][row][col],
+                viability_score=0,  # ranking computes final_score
+                co2_saved_tons=columns["co2_saved_tons"][row][col],
+            )
+            rec.update({
+                "profit": columns["profit"][row][col],
+                "total_income": columns["total_income"][row][col],
+                "carbon_credit_income": columns["carbon_credit_income"][row][col],
+                "npv": columns["npv"][row][col],
+                "irr": columns["irr"][row][col],
+                "final_score": scores[row][col],
+            })
+            recommendations.append(rec)
+
+        advisory_docs.append(AdvisoryModel.create(
+            farmer_id=farmer_id,
+            field_size_acres=item.field_size_acres,
+            crop_type=item.crop_type,
+            location_district=item.location_district,
+            state=item.state,
+            residue_estimate_tons=tons[row],
+            recommendations=recommendations,
+        ))
+
+        results[index] = {
+            "index": index,
+            "residue_estimate_tons": tons[row],
+            "recommendations": recommendations,
+        }
+
+    failed = await persist_advisories(advisory_docs)
+
+    # advisory_docs[row] belongs to results[valid[row]]
+    for row in failed:
+        results[valid[row]] = {"index": valid[row], "error": "Advisory could not be saved"}
+
+    return results
+
+
+# ---------------------------------------------------------
+# 3️⃣ Single Advisory (memoized)
+# ---------------------------------------------------------
+# The IRR solver is most of an advisory's cost, and IRR is solved on
+# one ton's cash flows, so it holds for every field size. The memo
+# keeps it with the crop's residue ratio per (crop, district, state,
+# month, reference version, live generations); money fields and
+# ranking are recomputed per request through the engine, so memoized
+# and direct results are identical.
+
+advisory_memo = AsyncLRUCache(
+    "advisory_memo",
+    max_entries=settings.ADVISORY_MEMO_MAX_ENTRIES,
+    ttl_seconds=settings.ADVISORY_MEMO_TTL_SECONDS,
+    max_bytes=settings.ADVISORY_MEMO_MAX_BYTES,
+    weigh=lambda entry: len(json.dumps(entry)),
+)
+
+register_metrics("advisory_memo", advisory_memo.stats)
+
+# Entries of older reference versions can never hit again
+on_snapshot_change(lambda snapshot: advisory_memo.clear())
+
+
+def unit_irr(district: str) -> List[float]:
+    """
+    Per-ton IRR per alternative, in snapshot order (NaN if undefined).
+    """
+
+    financials = calculate_financials(
+        residue_tons=1.0,
+        district=district,
+        demand_score=demand_matrix(
+            [district], get_snapshot().alternative_types, DEFAULT_DEMAND_SCORE,
+        ),
+    )
+
+    return [
+        np.nan if data["irr"] is None else data["irr"]
+        for data in financials.values()
+    ]
+
+
+def build_recommendations(
+    residue_tons: float,
+    district: str,
+    weight_profile: Optional[str] = None,
+    pareto_only: bool = False,
+    irr: Optional[Sequence[float]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Financials for every alternative, ranked best first. irr is a
+    memoized unit_irr() row for the same district and prices.
+    """
+
+    financials = calculate_financials(
+        residue_tons=residue_tons,
+        district=district,
+        demand_score=demand_matrix(
+            [district], get_snapshot().alternative_types, DEFAULT_DEMAND_SCORE,
+        ),
+        unit_irr=irr,
+    )
+
+    recommendations = []
+
+    for alt, data in financials.items():
+        rec = AdvisoryModel.recommendation(
+            type=alt,
+            setup_cost=data["setup_cost"],
+            expected_income=data["expected_income"],
+            break_even_months=data["break_even_months"],
+            viability_score=0,  # ranking will compute final_score
+            co2_saved_tons=data["co2_saved_tons"],
+        )
+        rec.update({
+            "profit": data["profit"],
+            "total_income": data["total_income"],
+            "carbon_credit_income": data["carbon_credit_income"],
+            "npv": data["npv"],
+            "irr": data["irr"],
+        })
+        recommendations.append(rec)
+
+    return rank_alternatives(
+        recommendations=recommendations,
+        district=district,
+        weight_profile=weight_profile,
+        pareto_only=pareto_only,
+    )
+
+
+async def analyze_field(
+    payload: AdvisoryRequestSchema,
+    weight_profile: Optional[str] = None,
+    pareto_only: bool = False,
+) -> Tuple[float, List[Dict[str, Any]]]:
+    """
+    Residue estimate and ranked recommendations for one field.
+    Raises ValueError for unsupported crops or unknown profiles.
+    """
+
+    # Validate before touching the memo, bad input is never cached
+    resolve_weights(weight_profile)
+
+    if not settings.ADVISORY_MEMO_ENABLED:
+        residue_tons = await calculate_residue(
+            payload.field_size_acres, payload.crop_type,
+        )
+        return residue_tons, build_recommendations(
+            residue_tons, payload.location_district, weight_profile, pareto_only,
+        )
+
+    snapshot = get_snapshot()
+    key = (
+        payload.crop_type,
+        payload.location_district,
+        payload.state,
+        datetime.utcnow().month,
+        snapshot.version,
+        # Live corrections and demand move results between snapshots
+        correction_generation(),
+        demand_generation(),
+    )
+
+    async def load() -> Dict[str, Any]:
+        ratios = await resolve_crop_ratios([payload.crop_type])
+        if payload.crop_type not in ratios:
+            raise ValueError("Crop not supported")
+
+        return {
+            "residue_ratio": ratios[payload.crop_type],
+            "irr": unit_irr(payload.location_district),
+        }
+
+    entry = await advisory_memo.get_or_load(key, load)
+
+    residue_tons = round(payload.field_size_acres * entry["residue_ratio"], 2)
+
+    return residue_tons, build_recommendations(
+        residue_tons,
+        payload.location_district,
+        weight_profile,
+        pareto_only,
+        irr=entry["irr"],
+    )
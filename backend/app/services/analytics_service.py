@@ -1,24 +1,119 @@
 # app/services/analytics_service.py
 
+import asyncio
+import functools
+import inspect
 from datetime import datetime
-from collections import defaultdict
-from typing import List, Dict
+from typing import Any, List, Dict, Optional
 
-from app.core.database import get_database
+from app.core.cache import AsyncLRUCache
+from app.core.config import settings
+from app.core.database import get_analytics_database
+from app.core.metrics import register_metrics
+from app.services import rollup_service
+
+
+# ---------------------------------------------------------
+# Response Cache
+# ---------------------------------------------------------
+
+analytics_cache = AsyncLRUCache(
+    "analytics",
+    max_entries=settings.ANALYTICS_CACHE_SIZE,
+    ttl_seconds=settings.ANALYTICS_CACHE_TTL_SECONDS,
+    stale_seconds=settings.ANALYTICS_CACHE_STALE_SECONDS,
+)
+
+register_metrics("analytics_cache", analytics_cache.stats)
+
+
+def cached_panel(panel: str):
+    """
+    Cache a panel per (panel, bound arguments) with stale-while-revalidate.
+    """
+
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (panel, *bound.arguments.items())
+
+            return await analytics_cache.get_or_load(key, lambda: fn(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate_analytics(panel: Optional[str] = None) -> int:
+    """
+    Drop cached results for one panel, or for every panel.
+    """
+
+    if panel is None:
+        return analytics_cache.invalidate_where(lambda key: True)
+
+    return analytics_cache.invalidate_where(lambda key: key[0] == panel)
+
+
+# ---------------------------------------------------------
+# Shared Filters
+# ---------------------------------------------------------
+
+def advisory_match(
+    district: Optional[str] = None,
+    state: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    $match stage body for the optional analytics filters.
+    """
+
+    match: Dict[str, Any] = {}
+
+    if district:
+        match["location_district"] = district
+
+    if state:
+        match["state"] = state
+
+    if start or end:
+        match["created_at"] = {}
+        if start:
+            match["created_at"]["$gte"] = start
+        if end:
+            match["created_at"]["$lt"] = end
+
+    return match
 
 
 # ---------------------------------------------------------
 # 1️⃣ Overview Metrics
 # ---------------------------------------------------------
 
+@cached_panel("overview")
 async def get_overview_metrics() -> Dict[str, int]:
-    db = get_database()
-
-    total_users = await db.users.count_documents({})
-    total_farmers = await db.users.count_documents({"role": "farmer"})
-    total_buyers = await db.users.count_documents({"role": "buyer"})
-    total_advisories = await db.advisories.count_documents({})
-    total_listings = await db.listings.count_documents({})
+    db = get_analytics_database()
+
+    # Unfiltered totals come from collection metadata; only the
+    # per-role counts need an (indexed) exact count
+    (
+        total_users,
+        total_farmers,
+        total_buyers,
+        total_advisories,
+        total_listings,
+    ) = await asyncio.gather(
+        db.users.estimated_document_count(),
+        db.users.count_documents({"role": "farmer"}),
+        db.users.count_documents({"role": "buyer"}),
+        db.advisories.estimated_document_count(),
+        db.listings.estimated_document_count(),
+    )
 
     return {
         "total_users": total_users,
@@ -33,21 +128,41 @@ async def get_overview_metrics() -> Dict[str, int]:
 # 2️⃣ Monthly Advisory Trends
 # ---------------------------------------------------------
 
-async def get_monthly_advisory_trends(year: int) -> List[Dict]:
-    db = get_database()
-
-    start = datetime(year, 1, 1)
-    end = datetime(year + 1, 1, 1)
+@cached_panel("monthly")
+async def get_monthly_advisory_trends(
+    year: int,
+    district: Optional[str] = None,
+    state: Optional[str] = None,
+) -> List[Dict]:
+    if settings.ANALYTICS_USE_ROLLUPS:
+        monthly_data = await rollup_service.rollup_monthly(year, district, state)
+        return [
+            {"month": m, "advisories": monthly_data.get(m, 0)}
+            for m in range(1, 13)
+        ]
+
+    db = get_analytics_database()
+
+    match = advisory_match(
+        district,
+        state,
+        start=datetime(year, 1, 1),
+        end=datetime(year + 1, 1, 1),
+    )
 
-    cursor = db.advisories.find({
-        "created_at": {"$gte": start, "$lt": end}
-    })
-
-    monthly_data = defaultdict(int)
+    pipeline = [
+        {"$match": match},
+        {
+            "$group": {
+                "_id": {"$month": "$created_at"},
+                "count": {"$sum": 1}
+            }
+        }
+    ]
 
-    async for doc in cursor:
-        month = doc["created_at"].month
-        monthly_data[month] += 1
+    monthly_data = {}
+    async for doc in db.advisories.aggregate(pipeline):
+        monthly_data[doc["_id"]] = doc["count"]
 
     return [
         {"month": m, "advisories": monthly_data.get(m, 0)}
@@ -59,10 +174,22 @@ async def get_monthly_advisory_trends(year: int) -> List[Dict]:
 # 3️⃣ Advisory Count by District
 # ---------------------------------------------------------
 
-async def get_advisory_by_district() -> List[Dict]:
-    db = get_database()
+@cached_panel("by_district")
+async def get_advisory_by_district(
+    state: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[Dict]:
+    if settings.ANALYTICS_USE_ROLLUPS:
+        return await rollup_service.rollup_by_district(state, start, end)
+
+    db = get_analytics_database()
+
+    match = advisory_match(state=state, start=start, end=end)
 
     pipeline = [
+        # Sorting on the indexed field lets $group stream off the index
+        {"$sort": {"location_district": 1}},
         {
             "$group": {
                 "_id": "$location_district",
@@ -71,6 +198,9 @@ async def get_advisory_by_district() -> List[Dict]:
         }
     ]
 
+    if match:
+        pipeline.insert(0, {"$match": match})
+
     results = []
     async for doc in db.advisories.aggregate(pipeline):
         results.append({
@@ -85,16 +215,33 @@ async def get_advisory_by_district() -> List[Dict]:
 # 4️⃣ CO₂ Savings Aggregation
 # ---------------------------------------------------------
 
-async def get_total_co2_saved() -> Dict[str, float]:
-    db = get_database()
+@cached_panel("co2")
+async def get_total_co2_saved(
+    district: Optional[str] = None,
+    state: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Dict[str, float]:
+    if settings.ANALYTICS_USE_ROLLUPS:
+        total = await rollup_service.rollup_total_co2(district, state, start, end)
+        return {"total_co2_saved_tons": round(total, 2)}
 
-    cursor = db.advisories.find({})
+    db = get_analytics_database()
 
-    total_co2_saved = 0.0
+    pipeline = [
+        {"$match": advisory_match(district, state, start, end)},
+        {
+            "$group": {
+                "_id": None,
+                # Inner $sum adds up the embedded recommendations array
+                "total": {"$sum": {"$sum": "$recommendations.co2_saved_tons"}}
+            }
+        }
+    ]
 
-    async for doc in cursor:
-        for rec in doc.get("recommendations", []):
-            total_co2_saved += rec.get("co2_saved_tons", 0.0)
+    total_co2_saved = 0.0
+    async for doc in db.advisories.aggregate(pipeline):
+        total_co2_saved = doc["total"]
 
     return {
         "total_co2_saved_tons": round(total_co2_saved, 2)
@@ -105,20 +252,66 @@ async def get_total_co2_saved() -> Dict[str, float]:
 # 5️⃣ Alternative Mix Distribution
 # ---------------------------------------------------------
 
-async def get_alternative_mix_distribution() -> List[Dict]:
-    db = get_database()
+@cached_panel("alternative_mix")
+async def get_alternative_mix_distribution(
+    district: Optional[str] = None,
+    state: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[Dict]:
+    if settings.ANALYTICS_USE_ROLLUPS:
+        return await rollup_service.rollup_mix(district, state, start, end)
 
-    mix = defaultdict(int)
+    db = get_analytics_database()
 
-    cursor = db.advisories.find({})
-
-    async for doc in cursor:
-        for rec in doc.get("recommendations", []):
-            alt_type = rec.get("type")
-            if alt_type:
-                mix[alt_type] += 1
+    pipeline = [
+        {"$match": advisory_match(district, state, start, end)},
+        {"$project": {"_id": 0, "recommendations.type": 1}},
+        {"$unwind": "$recommendations"},
+        {"$match": {"recommendations.type": {"$ne": None}}},
+        {
+            "$group": {
+                "_id": "$recommendations.type",
+                "count": {"$sum": 1}
+            }
+        },
+        {"$sort": {"_id": 1}}
+    ]
 
     return [
-        {"type": key, "count": value}
-        for key, value in mix.items()
-    ]
\ No newline at end of file
+        {"type": doc["_id"], "count": doc["count"]}
+        async for doc in db.advisories.aggregate(pipeline)
+    ]
+
+
+# ---------------------------------------------------------
+# 6️⃣ Dashboard Summary
+# ---------------------------------------------------------
+
+async def get_analytics_summary(
+    year: int,
+    district: Optional[str] = None,
+    state: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Every dashboard panel in one round trip, loaded concurrently
+    through the same per-panel cache.
+    """
+
+    overview, monthly, by_district, co2, mix = await asyncio.gather(
+        get_overview_metrics(),
+        get_monthly_advisory_trends(year, district, state),
+        get_advisory_by_district(state, start, end),
+        get_total_co2_saved(district, state, start, end),
+        get_alternative_mix_distribution(district, state, start, end),
+    )
+
+    return {
+        "overview": overview,
+        "monthly": monthly,
+        "by_district": by_district,
+        "co2": co2,
+        "alternative_mix": mix,
+    }
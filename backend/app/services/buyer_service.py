@@ -6,6 +6,9 @@ from bson import ObjectId
 
 from app.core.database import get_database
 from app.models.listing_model import ListingModel
+from app.repositories.collections import listings_repo, orders_repo, alerts_repo
+from app.utils.pagination import clamp_page_size, fetch_page
+from app.utils.response import cursor_paginated_response
 
 
 # ---------------------------------------------------------
@@ -31,9 +34,10 @@ async def get_dashboard_summary(buyer_id: str) -> dict:
 async def fetch_listings(
     residue_type: Optional[str] = None,
     district: Optional[str] = None,
-) -> List[dict]:
-
-    db = get_database()
+    fields: Optional[List[str]] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> dict:
 
     query = {"status": "active"}
 
@@ -43,15 +47,13 @@ async def fetch_listings(
     if district:
         query["district"] = district
 
-    cursor = db.listings.find(query)
-
-    listings = []
-    async for doc in cursor:
-        doc["id"] = str(doc["_id"])
-        doc.pop("_id", None)
-        listings.append(doc)
+    listings, next_cursor = await fetch_page(
+        listings_repo, query, cursor, limit, fields,
+    )
 
-    return listings
+    return cursor_paginated_response(
+        listings, next_cursor, clamp_page_size(limit),
+    )
 
 
 # ---------------------------------------------------------
@@ -68,8 +70,9 @@ async def submit_bid(
     db = get_database()
 
     # Check listing exists
-    listing = await db.listings.find_one(
-        {"_id": ObjectId(listing_id)}
+    listing = await listings_repo.find_one(
+        {"_id": ObjectId(listing_id)},
+        fields=["district", "residue_type"],
     )
 
     if not listing:
@@ -82,6 +85,7 @@ async def submit_bid(
         quantity_tons=quantity_tons,
     )
 
+    # app.ml.online_prices picks the bid up from the collection
     result = await db.bids.insert_one(bid_data)
 
     return {
@@ -97,24 +101,23 @@ async def submit_bid(
 async def get_orders(
     buyer_id: str,
     status: Optional[str] = None,
-) -> List[dict]:
-
-    db = get_database()
+    fields: Optional[List[str]] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> dict:
 
     query = {"buyer_id": buyer_id}
 
     if status:
         query["status"] = status
 
-    cursor = db.orders.find(query)
-
-    orders = []
-    async for doc in cursor:
-        doc["id"] = str(doc["_id"])
-        doc.pop("_id", None)
-        orders.append(doc)
+    orders, next_cursor = await fetch_page(
+        orders_repo, query, cursor, limit, fields,
+    )
 
-    return orders
+    return cursor_paginated_response(
+        orders, next_cursor, clamp_page_size(limit),
+    )
 
 
 # ---------------------------------------------------------
@@ -147,16 +150,17 @@ async def create_connection(
 # 6️⃣ Get Alerts
 # ---------------------------------------------------------
 
-async def get_alerts(buyer_id: str) -> List[dict]:
-
-    db = get_database()
-
-    cursor = db.alerts.find({"buyer_id": buyer_id})
+async def get_alerts(
+    buyer_id: str,
+    fields: Optional[List[str]] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> dict:
 
-    alerts = []
-    async for doc in cursor:
-        doc["id"] = str(doc["_id"])
-        doc.pop("_id", None)
-        alerts.append(doc)
+    alerts, next_cursor = await fetch_page(
+        alerts_repo, {"buyer_id": buyer_id}, cursor, limit, fields,
+    )
 
-    return alerts
\ No newline at end of file
+    return cursor_paginated_response(
+        alerts, next_cursor, clamp_page_size(limit),
+    )
@@ -0,0 +1,223 @@
+# app/services/cashflow_service.py
+
+"""
+Month-by-month cash flows for fields × alternatives.
+
+Month 0 carries the capex share of the setup cost; the remaining
+opex is spread over the processing months, sale income over the sale
+window and carbon-credit income lands in the credit month. Over one
+horizon the undiscounted flows add up to the deterministic profit.
+"""
+
+from typing import Dict, Mapping
+
+import numpy as np
+
+
+# Monthly IRR search bracket and safeguarded Newton settings
+IRR_LOW = -0.99
+IRR_HIGH = 10.0
+IRR_MAX_ITERATIONS = 50
+IRR_TOLERANCE = 1e-10
+
+
+def _window(horizon: int, start: int, length: int) -> np.ndarray:
+    """
+    Evenly spread 1.0 over [start, start + length) within the horizon.
+    """
+
+    start = min(max(start, 0), horizon - 1)
+    stop = min(start + max(length, 1), horizon)
+
+    profile = np.zeros(horizon)
+    profile[start:stop] = 1.0 / (stop - start)
+    return profile
+
+
+class CashFlowModel:
+    """
+    Timing profiles from the "cashflow" reference table.
+    """
+
+    def __init__(self, params: Mapping[str, float]):
+        self.horizon = int(params["horizon_months"]) + 1  # month 0 included
+        self.capex_share = float(params["capex_share"])
+        self.monthly_rate = (1 + float(params["annual_discount_rate"])) ** (1 / 12) - 1
+
+        self.capex_profile = _window(self.horizon, 0, 1)
+        self.opex_profile = _window(self.horizon, 1, int(params["processing_months"]))
+        self.sale_profile = _window(
+            self.horizon,
+            int(params["sale_start_month"]),
+            int(params["sale_months"]),
+        )
+        self.carbon_profile = _window(self.horizon, int(params["carbon_credit_month"]), 1)
+
+        self.months = np.arange(self.horizon)
+        self.discount = (1 + self.monthly_rate) ** -self.months
+
+        # Running share of sale income, carbon income and setup cost
+        # paid out by each month: (3, horizon)
+        self.cumulative_profiles = np.cumsum(
+            [
+                self.sale_profile,
+                self.carbon_profile,
+                -(
+                    self.capex_share * self.capex_profile
+                    + (1 - self.capex_share) * self.opex_profile
+                ),
+            ],
+            axis=1,
+        )
+
+    # ---------------------------------------------------------
+    # Series
+    # ---------------------------------------------------------
+
+    def series(
+        self,
+        setup_cost: np.ndarray,
+        sale_income: np.ndarray,
+        carbon_income: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Cash flows with a trailing month axis: (..., horizon + 1).
+        """
+
+        setup_cost = setup_cost[..., None]
+
+        return (
+            sale_income[..., None] * self.sale_profile
+            + carbon_income[..., None] * self.carbon_profile
+            - setup_cost * self.capex_share * self.capex_profile
+            - setup_cost * (1 - self.capex_share) * self.opex_profile
+        )
+
+    def cumulative(
+        self,
+        setup_cost: np.ndarray,
+        sale_income: np.ndarray,
+        carbon_income: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Running total of series() along the month axis. Flows are
+        linear in the three amounts, so this is one small matrix
+        product rather than a series and a cumsum.
+        """
+
+        amounts = np.stack(
+            np.broadcast_arrays(sale_income, carbon_income, setup_cost),
+            axis=-1,
+        )
+
+        return amounts @ self.cumulative_profiles
+
+    # ---------------------------------------------------------
+    # Metrics
+    # ---------------------------------------------------------
+
+    def npv(self, cash: np.ndarray) -> np.ndarray:
+        return cash @ self.discount
+
+    @staticmethod
+    def _first_non_negative(cumulative: np.ndarray) -> np.ndarray:
+        reached = cumulative >= 0
+
+        return np.where(
+            reached.any(axis=-1),
+            reached.argmax(axis=-1),
+            np.nan,
+        )
+
+    def break_even_month(self, cash: np.ndarray) -> np.ndarray:
+        """
+        First month with non-negative cumulative cash flow, NaN
+        when it is not reached within the horizon.
+        """
+
+        return self._first_non_negative(np.cumsum(cash, axis=-1))
+
+    def break_even(
+        self,
+        setup_cost: np.ndarray,
+        sale_income: np.ndarray,
+        carbon_income: np.ndarray,
+    ) -> np.ndarray:
+        """
+        break_even_month() straight from the amounts. Deterministic
+        financials and the risk simulation both use it, so their
+        break-even months agree.
+        """
+
+        return self._first_non_negative(
+            self.cumulative(setup_cost, sale_income, carbon_income)
+        )
+
+    def irr(self, cash: np.ndarray) -> np.ndarray:
+        """
+        Annualised IRR for every series at once. Newton steps are
+        kept inside a shrinking sign-change bracket and fall back to
+        bisection, so each series converges even from a poor guess.
+        NaN where NPV does not change sign inside the bracket.
+        """
+
+        # Month-major copy so Horner steps read contiguous slices
+        flows = np.moveaxis(cash, -1, 0).copy()
+
+        def npv_and_slope(rate: np.ndarray):
+            # Horner in x = 1 / (1 + rate), value and derivative together
+            x = 1 / (1 + rate)
+            value = flows[-1].copy()
+            slope = np.zeros_like(value)
+            for month_flow in flows[-2::-1]:
+                slope = slope * x + value
+                value = value * x + month_flow
+            # d/d(rate) = d/dx * dx/d(rate)
+            return value, slope * -(x ** 2)
+
+        shape = cash.shape[:-1]
+        low = np.full(shape, IRR_LOW)
+        high = np.full(shape, IRR_HIGH)
+
+        npv_low, _ = npv_and_slope(low)
+        npv_high, _ = npv_and_slope(high)
+        valid = np.sign(npv_low) != np.sign(npv_high)
+
+        rate = np.full(shape, self.monthly_rate)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for _ in range(IRR_MAX_ITERATIONS):
+                value, slope = npv_and_slope(rate)
+
+                same_side = np.sign(value) == np.sign(npv_low)
+                low = np.where(same_side, rate, low)
+                high = np.where(same_side, high, rate)
+
+                step = rate - value / slope
+                inside = np.isfinite(step) & (step >= low) & (step <= high)
+                next_rate = np.where(inside, step, (low + high) / 2)
+
+                converged = np.abs(next_rate - rate)[valid].max(initial=0.0) < IRR_TOLERANCE
+                rate = next_rate
+                if converged:
+                    break
+
+        return np.where(valid, (1 + rate) ** 12 - 1, np.nan)
+
+    def evaluate(
+        self,
+        setup_cost: np.ndarray,
+        sale_income: np.ndarray,
+        carbon_income: np.ndarray,
+    ) -> Dict[str, np.ndarray]:
+        """
+        NPV and break-even month. IRR is left to the caller: it does
+        not depend on scale, so FinancialEngine solves it per ton.
+        """
+
+        cash = self.series(setup_cost, sale_income, carbon_income)
+
+        return {
+            "npv": np.round(self.npv(cash), 2),
+            "break_even_months": self.break_even(setup_cost, sale_income, carbon_income),
+        }
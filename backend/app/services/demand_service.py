@@ -0,0 +1,476 @@
+# app/services/demand_service.py
+
+"""
+Live demand signals per district × residue type.
+
+New listings, bids and accepted (ordered) tons are counted in daily
+ring buffers covering the last DEMAND_WINDOW_DAYS. A background task
+tails the three collections by created_at, so every worker converges
+on the same counts, then recomputes all scores in one vectorized pass;
+advisory pricing and ranking only read a dict. Scores are shrunk
+towards the district_demand reference table while evidence is thin.
+
+Counters and the tail watermark are saved to disk after each sync, so
+a restart resumes where it stopped; without a state file the first
+sync backfills the whole window.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.metrics import register_metrics
+from app.ml.price_table import get_price_table
+from app.services.financial_service import DEFAULT_DEMAND_SCORE
+from app.services.listing_lookup import listing_keys, remember
+from app.services.reference_data import ReferenceSnapshot, get_snapshot
+
+
+SIGNALS = ("listings", "bids", "accepted_tons")
+LISTINGS, BIDS, ACCEPTED = range(len(SIGNALS))
+
+# Share of the score from accepted volume; the rest is bid pressure
+UPTAKE_WEIGHT = 0.3
+
+Key = Tuple[str, str]
+
+
+# ---------------------------------------------------------
+# 1️⃣ Ring Buffers
+# ---------------------------------------------------------
+
+class DemandCounters:
+    """
+    counts[pair, signal, day % window] for every district × type seen.
+    A pair's buckets are zeroed lazily as its newest day moves on.
+    """
+
+    def __init__(self, window_days: int, capacity: int = 64):
+        self.window = window_days
+        self.index: Dict[Key, int] = {}
+        self.keys: List[Key] = []
+
+        self.counts = np.zeros((capacity, len(SIGNALS), window_days), dtype=np.float32)
+        self.last_day = np.zeros(capacity, dtype=np.int64)
+
+    def _row(self, key: Key, day: int) -> int:
+        row = self.index.get(key)
+        if row is not None:
+            return row
+
+        row = len(self.keys)
+        if row == len(self.counts):
+            self.counts = np.concatenate([self.counts, np.zeros_like(self.counts)])
+            self.last_day = np.concatenate([self.last_day, np.zeros_like(self.last_day)])
+
+        self.index[key] = row
+        self.keys.append(key)
+        self.last_day[row] = day
+        return row
+
+    def add(self, key: Key, signal: int, amount: float, day: int) -> None:
+        row = self._row(key, day)
+        last = int(self.last_day[row])
+
+        if day > last:
+            stale = np.arange(last + 1, last + 1 + min(day - last, self.window))
+            self.counts[row, :, stale % self.window] = 0
+            self.last_day[row] = last = day
+
+        # Older than the window: already expired
+        if last - day < self.window:
+            self.counts[row, signal, day % self.window] += amount
+
+    def totals(self, today: int) -> np.ndarray:
+        """
+        (pairs, signals) sums over the window ending today.
+        """
+
+        n = len(self.keys)
+        last = self.last_day[:n, None]
+
+        # Day each bucket currently holds, per pair
+        bucket_day = last - (last - np.arange(self.window)) % self.window
+        live = (today - bucket_day) < self.window
+
+        return (self.counts[:n] * live[:, None, :]).sum(axis=2, dtype=np.float64)
+
+    # ---------------------------------------------------------
+    # Persistence
+    # ---------------------------------------------------------
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        n = len(self.keys)
+
+        return {
+            "districts": np.array([key[0] for key in self.keys], dtype=str),
+            "residue_types": np.array([key[1] for key in self.keys], dtype=str),
+            "counts": self.counts[:n].copy(),
+            "last_day": self.last_day[:n].copy(),
+        }
+
+    def load_arrays(self, data) -> None:
+        counts = data["counts"]
+        if counts.shape[1:] != (len(SIGNALS), self.window):
+            raise ValueError("window or signals changed")
+
+        self.keys = list(zip(data["districts"].tolist(), data["residue_types"].tolist()))
+        self.index = {key: row for row, key in enumerate(self.keys)}
+
+        capacity = max(64, len(self.keys))
+        self.counts = np.zeros((capacity, len(SIGNALS), self.window), dtype=np.float32)
+        self.last_day = np.zeros(capacity, dtype=np.int64)
+        self.counts[:len(self.keys)] = counts
+        self.last_day[:len(self.keys)] = data["last_day"]
+
+
+counters = DemandCounters(settings.DEMAND_WINDOW_DAYS)
+
+# (district, residue_type) → (live score, evidence); swapped whole
+_scores: Dict[Key, Tuple[float, float]] = {}
+
+_watermark: Optional[datetime] = None
+
+# Bumped when a pair's price-table demand level changes; part of
+# cache keys
+_generation = 0
+
+_task: Optional[asyncio.Task] = None
+_syncs = 0
+_sync_failures = 0
+_events = 0
+_last_sync_ms = 0.0
+
+
+# ---------------------------------------------------------
+# 2️⃣ Scores & Lookups
+# ---------------------------------------------------------
+
+def _price_levels(
+    scores: Dict[Key, Tuple[float, float]],
+    keys: Sequence[Key],
+) -> np.ndarray:
+    """
+    Price-table demand level each pair is priced at under scores.
+    """
+
+    snapshot = get_snapshot()
+
+    return get_price_table(snapshot).demand_codes([
+        shrink(
+            scores.get(key),
+            snapshot.district_demand.get(key[0], {}).get(key[1], DEFAULT_DEMAND_SCORE),
+        )
+        for key in keys
+    ])
+
+
+def _set_scores(scores: Dict[Key, Tuple[float, float]]) -> None:
+    """
+    Publish new scores. Most syncs only nudge them; ranking reads
+    them live, but cached advisories and sweeps only go stale when
+    a price moves, i.e. when some pair lands on another demand level.
+    """
+
+    global _scores, _generation
+
+    keys = list(scores.keys() | _scores.keys())
+    moved = (_price_levels(scores, keys) != _price_levels(_scores, keys)).any()
+
+    _scores = scores
+    if moved:
+        _generation += 1
+
+
+def demand_generation() -> int:
+    return _generation
+
+
+def compute_scores(totals: np.ndarray, keys: Sequence[Key]) -> Dict[Key, Tuple[float, float]]:
+    """
+    Bid pressure (bids per listing, saturating) blended with accepted
+    tons relative to the busiest district for the same residue type.
+    """
+
+    if not len(keys):
+        return {}
+
+    listings, bids, accepted = totals.T
+
+    pressure = 1 - np.exp(-(bids / (listings + 1)) / settings.DEMAND_BIDS_PER_LISTING)
+
+    _, type_ids = np.unique([key[1] for key in keys], return_inverse=True)
+    busiest = np.zeros(type_ids.max() + 1)
+    np.maximum.at(busiest, type_ids, accepted)
+    uptake = np.divide(
+        accepted,
+        busiest[type_ids],
+        out=np.zeros_like(accepted),
+        where=busiest[type_ids] > 0,
+    )
+
+    score = (1 - UPTAKE_WEIGHT) * pressure + UPTAKE_WEIGHT * uptake
+    evidence = listings + bids
+
+    return {
+        key: (s, e)
+        for key, s, e in zip(keys, score.tolist(), evidence.tolist())
+        if e > 0
+    }
+
+
+def demand_score(
+    district: Optional[str],
+    residue_type: str,
+    default: float = 0.5,
+    snapshot: Optional[ReferenceSnapshot] = None,
+) -> float:
+    """
+    0–1 demand for one pair: live signals weighted by their evidence
+    against the district_demand table (or default).
+    """
+
+    prior = (snapshot or get_snapshot()).district_demand.get(district, {}).get(
+        residue_type, default,
+    )
+
+    return shrink(_scores.get((district, residue_type)), prior)
+
+
+def shrink(live: Optional[Tuple[float, float]], prior: float) -> float:
+    """
+    Live (score, evidence) weighted against the prior; the prior
+    alone when there is no live signal. The price model trainer
+    applies it too, so it trains on the score served here.
+    """
+
+    if live is None:
+        return prior
+
+    score, evidence = live
+    weight = settings.DEMAND_PRIOR_WEIGHT
+
+    return round((score * evidence + prior * weight) / (evidence + weight), 4)
+
+
+def demand_matrix(
+    districts: Sequence[Optional[str]],
+    residue_types: Sequence[str],
+    default: float = 0.5,
+    snapshot: Optional[ReferenceSnapshot] = None,
+) -> np.ndarray:
+    """
+    (N, M) demand_score() for fields × alternatives, one lookup per
+    distinct district.
+    """
+
+    snapshot = snapshot or get_snapshot()
+
+    rows = {
+        district: [demand_score(district, t, default, snapshot) for t in residue_types]
+        for district in set(districts)
+    }
+
+    return np.array([rows[d] for d in districts], dtype=float).reshape(
+        len(districts), len(residue_types)
+    )
+
+
+# ---------------------------------------------------------
+# 3️⃣ Tailing MongoDB
+# ---------------------------------------------------------
+
+async def _chunks(db, collection: str, query, fields) -> AsyncIterator[List[Dict[str, Any]]]:
+    cursor = db[collection].find(query, fields).batch_size(settings.EXPORT_BATCH_SIZE)
+
+    chunk = []
+    async for doc in cursor:
+        chunk.append(doc)
+        if len(chunk) >= settings.EXPORT_BATCH_SIZE:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+async def sync_demand(db=None, now: Optional[datetime] = None) -> int:
+    """
+    Count everything created since the last sync and refresh scores.
+    Returns the number of events counted.
+    """
+
+    global _watermark, _events
+
+    db = db if db is not None else get_database()
+    now = now or datetime.utcnow()
+
+    # Late inserts within the lag are still picked up next time
+    upper = now - timedelta(seconds=settings.DEMAND_SYNC_LAG_SECONDS)
+    lower = upper - timedelta(days=counters.window)
+    if _watermark is not None:
+        lower = max(lower, _watermark)
+
+    created = {"created_at": {"$gt": lower, "$lte": upper}}
+    events = 0
+
+    listing_fields = {"district": 1, "residue_type": 1, "created_at": 1}
+
+    async for chunk in _chunks(db, "listings", created, listing_fields):
+        for doc in chunk:
+            if doc.get("district") and doc.get("residue_type"):
+                key = (doc["district"], doc["residue_type"])
+                remember(str(doc["_id"]), key)
+                counters.add(key, LISTINGS, 1.0, doc["created_at"].toordinal())
+                events += 1
+
+    sources = (
+        ("bids", created, BIDS),
+        ("orders", {**created, "status": {"$ne": "cancelled"}}, ACCEPTED),
+    )
+
+    for collection, query, signal in sources:
+        fields = {"listing_id": 1, "quantity_tons": 1, "created_at": 1}
+
+        async for chunk in _chunks(db, collection, query, fields):
+            keys = await listing_keys(db, [str(doc.get("listing_id")) for doc in chunk])
+
+            for doc in chunk:
+                key = keys[str(doc.get("listing_id"))]
+                if key is None:
+                    continue
+
+                amount = 1.0 if signal == BIDS else float(doc.get("quantity_tons") or 0)
+                counters.add(key, signal, amount, doc["created_at"].toordinal())
+                events += 1
+
+    _watermark = upper
+    _events += events
+    _set_scores(compute_scores(counters.totals(now.toordinal()), counters.keys))
+
+    return events
+
+
+# ---------------------------------------------------------
+# 4️⃣ Persistence & Lifecycle
+# ---------------------------------------------------------
+
+def _save(path: str, arrays: Dict[str, np.ndarray]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    # Workers share the path; each writes its own temp file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        np.savez(fh, **arrays)
+    os.replace(tmp, path)
+
+
+async def save_state() -> None:
+    if _watermark is None:
+        return
+
+    arrays = counters.arrays()
+    arrays["watermark"] = np.array(_watermark.isoformat())
+
+    await asyncio.to_thread(_save, settings.DEMAND_STATE_PATH, arrays)
+
+
+def load_state() -> bool:
+    global counters, _watermark
+
+    restored = DemandCounters(counters.window)
+
+    try:
+        with np.load(settings.DEMAND_STATE_PATH, allow_pickle=False) as data:
+            restored.load_arrays(data)
+            watermark = datetime.fromisoformat(str(data["watermark"]))
+    except FileNotFoundError:
+        return False
+    except Exception as exc:
+        # Truncated or corrupt archives (zipfile.BadZipFile) included:
+        # nothing is applied and the first sync backfills instead
+        print(f"⚠️ Demand state ignored, backfilling: {exc!r}")
+        return False
+
+    counters = restored
+    _watermark = watermark
+
+    _set_scores(compute_scores(counters.totals(datetime.utcnow().toordinal()), counters.keys))
+    return True
+
+
+async def _sync_once() -> None:
+    global _syncs, _sync_failures, _last_sync_ms
+
+    started = time.perf_counter()
+
+    try:
+        if await sync_demand():
+            await save_state()
+        _syncs += 1
+    except Exception as exc:
+        _sync_failures += 1
+        print(f"⚠️ Demand sync failed: {exc}")
+
+    _last_sync_ms = (time.perf_counter() - started) * 1000
+
+
+async def _sync_loop() -> None:
+    while True:
+        await _sync_once()
+        await asyncio.sleep(settings.DEMAND_SYNC_SECONDS)
+
+
+async def start_demand_signals() -> None:
+    """
+    Restore counters, then sync in the background (the first sync
+    catches up on everything since the saved watermark).
+    """
+
+    global _task
+
+    if not settings.DEMAND_SIGNALS_ENABLED:
+        return
+
+    if load_state():
+        print(f"✅ Demand counters restored ({len(counters.keys)} pairs)")
+
+    if _task is None:
+        _task = asyncio.create_task(_sync_loop())
+
+
+async def stop_demand_signals() -> None:
+    global _task
+
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+
+    await save_state()
+
+
+def demand_stats() -> Dict[str, Any]:
+    return {
+        "pairs": len(counters.keys),
+        "scored_pairs": len(_scores),
+        "generation": _generation,
+        "events": _events,
+        "syncs": _syncs,
+        "sync_failures": _sync_failures,
+        "last_sync_ms": round(_last_sync_ms, 2),
+        "watermark": _watermark.isoformat() if _watermark else None,
+        "bytes": counters.counts.nbytes + counters.last_day.nbytes,
+    }
+
+
+register_metrics("demand_signals", demand_stats)
@@ -0,0 +1,187 @@
+# app/services/export_service.py
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.database import get_analytics_database
+from app.repositories.base import Repository
+from app.repositories.collections import (
+    listings_repo,
+    orders_repo,
+    advisories_repo,
+)
+
+
+# Exports read through the analytics handle (secondary preferred)
+EXPORT_REPOS: Dict[str, Repository] = {
+    repo.collection_name: Repository(
+        repo.collection_name,
+        repo.fields,
+        repo.public_fields,
+        get_db=get_analytics_database,
+    )
+    for repo in (listings_repo, orders_repo, advisories_repo)
+}
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _to_row(doc: Dict[str, Any]) -> Dict[str, Any]:
+    doc["id"] = str(doc.pop("_id"))
+    return doc
+
+
+# ---------------------------------------------------------
+# 1️⃣ Encoders
+# ---------------------------------------------------------
+# Rows are buffered per Mongo batch, so each chunk written to the
+# socket is one batch worth of lines rather than one tiny write per row.
+# A chunk also goes out once it reaches EXPORT_CHUNK_BYTES, and the
+# first row is sent on its own so clients see data straight away.
+
+async def _ndjson_chunks(cursor) -> AsyncIterator[bytes]:
+    buffer = []
+    size = 0
+    first = True
+
+    async for doc in cursor:
+        line = json.dumps(_to_row(doc), default=_json_default) + "\n"
+        buffer.append(line)
+        size += len(line)
+
+        if (
+            first
+            or len(buffer) >= settings.EXPORT_BATCH_SIZE
+            or size >= settings.EXPORT_CHUNK_BYTES
+        ):
+            yield "".join(buffer).encode()
+            buffer = []
+            size = 0
+            first = False
+
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+async def _csv_chunks(cursor, columns) -> AsyncIterator[bytes]:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(columns)
+
+    # Send the header before the first batch arrives
+    yield out.getvalue().encode()
+    out.seek(0)
+    out.truncate()
+    rows = 0
+    first = True
+
+    async for doc in cursor:
+        row = _to_row(doc)
+        writer.writerow([
+            # Nested values (e.g. recommendations) become JSON cells
+            json.dumps(value, default=_json_default)
+            if isinstance(value, (list, dict))
+            else _json_default(value) if isinstance(value, datetime)
+            else value
+            for value in (row.get(column) for column in columns)
+        ])
+        rows += 1
+
+        if (
+            first
+            or rows >= settings.EXPORT_BATCH_SIZE
+            or out.tell() >= settings.EXPORT_CHUNK_BYTES
+        ):
+            yield out.getvalue().encode()
+            out.seek(0)
+            out.truncate()
+            rows = 0
+            first = False
+
+    if out.tell():
+        yield out.getvalue().encode()
+
+
+async def _gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+
+    # Chunks are batch-sized, so a sync flush per chunk costs little
+    # and keeps zlib from holding the early, small ones back
+    async for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    yield compressor.flush()
+
+
+# ---------------------------------------------------------
+# 2️⃣ Export Stream
+# ---------------------------------------------------------
+
+def export_stream(
+    collection: str,
+    query: Dict[str, Any],
+    fmt: str = "ndjson",
+    compress: bool = False,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Stream a collection as NDJSON or CSV with constant memory.
+    The Motor cursor fetches EXPORT_BATCH_SIZE documents per round
+    trip and the first chunk is sent as soon as one batch arrives.
+    """
+
+    if collection not in EXPORT_REPOS:
+        raise ValueError(f"Export not available for {collection}")
+
+    if fmt not in MEDIA_TYPES:
+        raise ValueError("format must be ndjson or csv")
+
+    repo = EXPORT_REPOS[collection]
+
+    if since or until:
+        created_at = {}
+        if since:
+            created_at["$gte"] = since
+        if until:
+            created_at["$lt"] = until
+        query = {**query, "created_at": created_at}
+
+    cursor = repo.find(query).batch_size(settings.EXPORT_BATCH_SIZE)
+
+    if fmt == "csv":
+        chunks = _csv_chunks(cursor, ["id", *repo.public_fields])
+    else:
+        chunks = _ndjson_chunks(cursor)
+
+    return _gzip(chunks) if compress else chunks
+
+
+def export_media_type(fmt: str, compress: bool) -> str:
+    # Compressed exports are plain .gz downloads, not Content-Encoding,
+    # so clients keep the compressed file as-is
+    return "application/gzip" if compress else MEDIA_TYPES[fmt]
+
+
+def export_headers(collection: str, fmt: str, compress: bool) -> Dict[str, str]:
+    filename = f"{collection}.{fmt}" + (".gz" if compress else "")
+
+    return {"Content-Disposition": f'attachment; filename="{filename}"'}
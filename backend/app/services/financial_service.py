@@ -1,61 +1,269 @@
 # app/services/financial_service.py
 
-from typing import Dict
-
-
-# Basic cost assumptions (can move to DB later)
-ALTERNATIVE_DATA = {
-    "biochar": {
-        "setup_cost_per_ton": 3000,
-        "income_per_ton": 5500,
-        "co2_saving_per_ton": 0.3,
-    },
-    "pellets": {
-        "setup_cost_per_ton": 2000,
-        "income_per_ton": 4200,
-        "co2_saving_per_ton": 0.2,
-    },
-    "compost": {
-        "setup_cost_per_ton": 1500,
-        "income_per_ton": 2800,
-        "co2_saving_per_ton": 0.1,
-    },
-    "direct_incorporation": {
-        "setup_cost_per_ton": 800,
-        "income_per_ton": 1500,
-        "co2_saving_per_ton": 0.05,
-    },
-}
-
-
-def calculate_financials(residue_tons: float) -> Dict[str, Dict]:
+from datetime import datetime
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from app.ml.price_table import get_price_table
+from app.services.cashflow_service import CashFlowModel
+from app.services.reference_data import (
+    ReferenceSnapshot,
+    get_snapshot,
+    on_snapshot_change,
+    on_snapshot_validate,
+)
+
+
+# Price demand for pairs neither live signals nor district_demand know
+DEFAULT_DEMAND_SCORE = 0.7
+
+DemandInput = Union[float, np.ndarray]
+
+
+def _per_field(value: DemandInput) -> np.ndarray:
     """
-    Calculate financial metrics for each alternative.
+    Scalars broadcast as-is; a (N,) vector becomes an (N, 1) column.
     """
 
-    results = {}
+    value = np.asarray(value, dtype=float)
+    return value[:, None] if value.ndim == 1 else value
+
+
+# ---------------------------------------------------------
+# 1️⃣ Financial Engine
+# ---------------------------------------------------------
+
+class FinancialEngine:
+    """
+    Alternative parameters of one reference snapshot held as arrays.
+
+    compute() prices N fields × M alternatives in one vectorized
+    pass; columns follow snapshot.alternative_types. Sale prices
+    are gathered from the precomputed price table.
+    """
+
+    def __init__(self, snapshot: ReferenceSnapshot):
+        self.snapshot = snapshot
+        self.version = snapshot.version
+        self.alternative_types = snapshot.alternative_types
+
+        alternatives = snapshot.alternatives.values()
 
-    for alt, data in ALTERNATIVE_DATA.items():
+        self.setup_per_ton = np.array(
+            [data["setup_cost_per_ton"] for data in alternatives], dtype=float,
+        )
+        self.co2_per_ton = np.array(
+            [data["co2_saving_per_ton"] for data in alternatives], dtype=float,
+        )
 
-        setup_cost = residue_tons * data["setup_cost_per_ton"]
-        expected_income = residue_tons * data["income_per_ton"]
-        profit = expected_income - setup_cost
+        self.carbon_credit_price = float(
+            snapshot.carbon.get("credit_price_per_ton", 0)
+        )
 
-        # Simple break-even formula
-        break_even_months = 3 if profit > 0 else 12
+        self.price_table = get_price_table(snapshot)
+        self.type_codes = self.price_table.type_codes(self.alternative_types)
 
-        # Simple viability scoring
-        viability_score = max(min((profit / 10000) * 10, 100), 10)
+        self.cashflow = CashFlowModel(snapshot.cashflow)
 
-        results[alt] = {
-            "setup_cost": round(setup_cost, 2),
-            "expected_income": round(expected_income, 2),
-            "profit": round(profit, 2),
-            "break_even_months": break_even_months,
-            "viability_score": round(viability_score, 2),
-            "co2_saved_tons": round(
-                residue_tons * data["co2_saving_per_ton"], 2
-            ),
+    def compute(
+        self,
+        residue_tons: np.ndarray,
+        districts: Optional[Sequence[str]] = None,
+        demand_score: DemandInput = DEFAULT_DEMAND_SCORE,
+        month: Optional[int] = None,
+        price_multiplier: DemandInput = 1.0,
+        cost_multiplier: DemandInput = 1.0,
+        unit_irr: Optional[np.ndarray] = None,
+        solve_irr: bool = True,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Every returned array has shape (N, M).
+        demand_score and the what-if price/cost multipliers may be a
+        scalar, one value per field (N,) or per field and alternative
+        (N, M). month defaults to the current month.
+
+        IRR is solved on one ton's cash flows, so it holds for every
+        field size; callers that already have it for the same prices
+        (see unit_irr()) pass it in and skip the solver. With
+        solve_irr=False IRR is left NaN, for callers that ignore it.
+        """
+
+        tons = np.asarray(residue_tons, dtype=float).reshape(-1, 1)
+
+        demand, price_multiplier, cost_multiplier = (
+            _per_field(demand_score),
+            _per_field(price_multiplier),
+            _per_field(cost_multiplier),
+        )
+
+        if districts is None:
+            district_codes = np.zeros(len(tons), dtype=np.intp)
+        else:
+            district_codes = self.price_table.district_codes(districts)
+
+        # Sale price per ton for every field × alternative
+        price_per_ton = self.price_table.gather(
+            district_codes[:, None],
+            self.type_codes,
+            month or datetime.utcnow().month,
+            demand,
+        ) * price_multiplier
+
+        setup_cost = np.round(tons * self.setup_per_ton * cost_multiplier, 2)
+        expected_income = np.round(tons * price_per_ton, 2)
+        co2_saved_tons = np.round(tons * self.co2_per_ton, 2)
+        carbon_credit_income = np.round(co2_saved_tons * self.carbon_credit_price, 2)
+
+        total_income = np.round(expected_income + carbon_credit_income, 2)
+        profit = np.round(total_income - setup_cost, 2)
+
+        # NPV and break-even month from the monthly cash flows
+        cashflow = self.cashflow.evaluate(
+            setup_cost,
+            expected_income,
+            carbon_credit_income,
+        )
+
+        if unit_irr is None:
+            unit_irr = (
+                self.unit_irr(price_per_ton, cost_multiplier)
+                if solve_irr
+                else np.full(price_per_ton.shape, np.nan)
+            )
+
+        # A field without residue has no cash flows to return on
+        irr = np.where(tons > 0, unit_irr, np.nan)
+
+        return {
+            "setup_cost": setup_cost,
+            "expected_income": expected_income,
+            "carbon_credit_income": carbon_credit_income,
+            "total_income": total_income,
+            "profit": profit,
+            "npv": cashflow["npv"],
+            "irr": irr,
+            "break_even_months": cashflow["break_even_months"],
+            # Simple viability scoring
+            "viability_score": np.round(np.clip(profit / 1000, 10, 100), 2),
+            "co2_saved_tons": co2_saved_tons,
         }
 
-    return results
\ No newline at end of file
+
+    def unit_irr(
+        self,
+        price_per_ton: np.ndarray,
+        cost_multiplier: DemandInput = 1.0,
+    ) -> np.ndarray:
+        """
+        Annualised IRR of one ton's cash flows, unrounded money.
+        """
+
+        setup, sale, carbon = np.broadcast_arrays(
+            self.setup_per_ton * cost_multiplier,
+            price_per_ton,
+            self.co2_per_ton * self.carbon_credit_price,
+        )
+
+        return np.round(self.cashflow.irr(self.cashflow.series(setup, sale, carbon)), 4)
+
+
+# Rebuilt once per reference snapshot, not per request
+_engine = FinancialEngine(get_snapshot())
+
+
+def _rebuild_engine(snapshot: ReferenceSnapshot) -> None:
+    global _engine
+    _engine = FinancialEngine(snapshot)
+
+
+on_snapshot_change(_rebuild_engine)
+
+# Builds engine, price table and cash-flow model without installing
+on_snapshot_validate(FinancialEngine)
+
+
+def get_financial_engine(snapshot: Optional[ReferenceSnapshot] = None) -> FinancialEngine:
+    engine = _engine
+
+    if snapshot is None or engine.snapshot is snapshot:
+        return engine
+
+    return FinancialEngine(snapshot)
+
+
+# ---------------------------------------------------------
+# 2️⃣ Batch (Array) Financials
+# ---------------------------------------------------------
+
+def calculate_financials_matrix(
+    residue_tons: np.ndarray,
+    districts: Optional[Sequence[str]] = None,
+    demand_score: DemandInput = DEFAULT_DEMAND_SCORE,
+    snapshot: Optional[ReferenceSnapshot] = None,
+    month: Optional[int] = None,
+    price_multiplier: DemandInput = 1.0,
+    cost_multiplier: DemandInput = 1.0,
+) -> Dict[str, np.ndarray]:
+    return get_financial_engine(snapshot).compute(
+        residue_tons,
+        districts,
+        demand_score,
+        month,
+        price_multiplier,
+        cost_multiplier,
+    )
+
+
+def financials_to_lists(fin: Dict[str, np.ndarray]) -> Dict[str, list]:
+    """
+    Nested Python lists per metric; undefined IRR and a break-even
+    not reached within the horizon become None.
+    """
+
+    columns = {key: values.tolist() for key, values in fin.items()}
+
+    columns["irr"] = [
+        [None if np.isnan(value) else value for value in row]
+        for row in columns["irr"]
+    ]
+    columns["break_even_months"] = [
+        [None if np.isnan(value) else int(value) for value in row]
+        for row in columns["break_even_months"]
+    ]
+
+    return columns
+
+
+# ---------------------------------------------------------
+# 3️⃣ Single Field Financials
+# ---------------------------------------------------------
+
+def calculate_financials(
+    residue_tons: float,
+    district: Optional[str] = None,
+    demand_score: DemandInput = DEFAULT_DEMAND_SCORE,
+    unit_irr: Optional[Sequence[float]] = None,
+) -> Dict[str, Dict]:
+    """
+    Calculate financial metrics for each alternative.
+    demand_score may also be a (1, M) row, one per alternative;
+    unit_irr, one per alternative, skips the IRR solver.
+    """
+
+    engine = get_financial_engine()
+
+    fin = engine.compute(
+        np.array([residue_tons]),
+        [district],
+        demand_score,
+        unit_irr=None if unit_irr is None else np.array([unit_irr], dtype=float),
+    )
+
+    # Plain Python values, one dict per alternative
+    row = {key: values[0] for key, values in financials_to_lists(fin).items()}
+
+    return {
+        alt: {key: values[col] for key, values in row.items()}
+        for col, alt in enumerate(engine.alternative_types)
+    }
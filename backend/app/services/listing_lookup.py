@@ -0,0 +1,59 @@
+# app/services/listing_lookup.py
+
+"""
+Listing id -> (district, residue_type), cached per process.
+
+Bids and orders reference listings by id only; tails that bucket them
+by district and residue type resolve ids here in one query per batch.
+Listings never change district or residue type, so entries are not
+invalidated; the cache is simply dropped when it grows too large.
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+from bson import ObjectId
+
+
+LISTING_CACHE_SIZE = 100000
+
+Key = Tuple[str, str]
+
+_keys: Dict[str, Optional[Key]] = {}
+
+
+def remember(listing_id: str, key: Optional[Key]) -> None:
+    """
+    Cache a key already at hand, e.g. from a tailed listing insert.
+    """
+
+    if len(_keys) >= LISTING_CACHE_SIZE:
+        _keys.clear()
+
+    _keys[listing_id] = key
+
+
+async def listing_keys(db, listing_ids: Sequence[str]) -> Dict[str, Optional[Key]]:
+    """
+    (district, residue_type) per listing id; None for listings that
+    are gone or incomplete.
+    """
+
+    missing = {i for i in listing_ids if i not in _keys}
+
+    if missing:
+        if len(_keys) + len(missing) > LISTING_CACHE_SIZE:
+            _keys.clear()
+
+        ids = [ObjectId(i) for i in missing if ObjectId.is_valid(i)]
+
+        async for doc in db.listings.find(
+            {"_id": {"$in": ids}},
+            {"district": 1, "residue_type": 1},
+        ):
+            if doc.get("district") and doc.get("residue_type"):
+                _keys[str(doc["_id"])] = (doc["district"], doc["residue_type"])
+
+        for listing_id in missing:
+            _keys.setdefault(listing_id, None)
+
+    return {listing_id: _keys.get(listing_id) for listing_id in listing_ids}
@@ -1,28 +1,37 @@
 # app/services/ranking_service.py
 
-from typing import List, Dict
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
 
+import numpy as np
+
+from app.services.demand_service import demand_matrix
+from app.services.reference_data import (
+    ReferenceSnapshot,
+    get_snapshot,
+    on_snapshot_validate,
+)
 
-# ---------------------------------------------------------
-# Configurable Weights
-# ---------------------------------------------------------
 
-WEIGHTS = {
-    "profit": 0.4,
-    "break_even": 0.2,
-    "co2": 0.2,
-    "demand": 0.2,
+# Objectives a weight profile may use: +1 higher is better, -1 lower is better
+OBJECTIVES: Dict[str, int] = {
+    "profit": 1,
+    "break_even": -1,
+    "co2": 1,
+    "demand": 1,
+    "npv": 1,
+    "irr": 1,
 }
 
+# Already on a 0–1 scale, used as-is instead of min-max normalised
+RAW_OBJECTIVES = {"demand"}
 
-# Example district demand map (can move to DB later)
-DISTRICT_DEMAND = {
-    "Pune": {
-        "biochar": 0.9,
-        "pellets": 0.7,
-        "compost": 0.5,
-        "direct_incorporation": 0.4,
-    }
+# Recommendation field holding each objective
+OBJECTIVE_FIELDS = {
+    "profit": "profit",
+    "break_even": "break_even_months",
+    "co2": "co2_saved_tons",
+    "npv": "npv",
+    "irr": "irr",
 }
 
 
@@ -36,56 +45,292 @@ def normalize(value: float, min_val: float, max_val: float) -> float:
     return (value - min_val) / (max_val - min_val)
 
 
+def _normalize_rows(values: np.ndarray) -> np.ndarray:
+    min_vals = values.min(axis=1, keepdims=True)
+    span = values.max(axis=1, keepdims=True) - min_vals
+
+    # Matches normalize(): a flat row scores 1.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(span == 0, 1.0, (values - min_vals) / span)
+
+
+def _oriented(values: np.ndarray, direction: int) -> np.ndarray:
+    """
+    Higher-is-better view of one objective; missing values (NaN,
+    e.g. undefined IRR or a break-even never reached) rank below
+    the worst value of their row, never tied with it.
+    """
+
+    values = np.asarray(values, dtype=float) * direction
+
+    missing = np.isnan(values)
+    if missing.any():
+        worst = np.where(missing, np.inf, values).min(axis=1, keepdims=True)
+        best = np.where(missing, -np.inf, values).max(axis=1, keepdims=True)
+        below = worst - np.maximum(best - worst, 1.0)
+        values = np.where(missing, np.where(np.isinf(worst), 0.0, below), values)
+
+    return values
+
+
 # ---------------------------------------------------------
-# Rank Alternatives
+# 1️⃣ Weight Profiles
+# ---------------------------------------------------------
+
+def resolve_weights(
+    profile: Optional[str] = None,
+    snapshot: Optional[ReferenceSnapshot] = None,
+) -> Mapping[str, float]:
+    """
+    Weights of a named profile from reference data.
+    No profile (or "default") means the "weights" table.
+    """
+
+    snapshot = snapshot or get_snapshot()
+
+    if profile in (None, "default"):
+        weights = snapshot.weights
+    elif profile in snapshot.weight_profiles:
+        weights = snapshot.weight_profiles[profile]
+    else:
+        raise ValueError(f"Unknown weight profile: {profile}")
+
+    unknown = set(weights) - set(OBJECTIVES)
+    if unknown:
+        raise ValueError(f"Unknown ranking objectives: {', '.join(sorted(unknown))}")
+
+    return weights
+
+
+def _check_weights(snapshot: ReferenceSnapshot) -> None:
+    for profile in ("default", *snapshot.weight_profiles):
+        resolve_weights(profile, snapshot)
+
+
+on_snapshot_validate(_check_weights)
+
+
+# ---------------------------------------------------------
+# 2️⃣ Array Ranking Engine
+# ---------------------------------------------------------
+
+def score_matrix(
+    metrics: Mapping[str, np.ndarray],
+    weights: Mapping[str, float],
+) -> np.ndarray:
+    """
+    Weighted score (N, M) over row-normalised objectives, 0–100.
+    """
+
+    total = None
+
+    for name, weight in weights.items():
+        if not weight:
+            continue
+
+        values = _oriented(metrics[name], OBJECTIVES[name])
+
+        if name in RAW_OBJECTIVES:
+            term = values
+        elif OBJECTIVES[name] < 0:
+            # Keep the historical 1 - norm(x) form for lower-is-better
+            term = 1 - _normalize_rows(-values)
+        else:
+            term = _normalize_rows(values)
+
+        total = weight * term if total is None else total + weight * term
+
+    shape = np.broadcast_shapes(*(np.shape(v) for v in metrics.values()))
+    if total is None:
+        total = np.zeros(shape)
+
+    return np.round(np.broadcast_to(total, shape) * 100, 2)
+
+
+def pareto_front(
+    metrics: Mapping[str, np.ndarray],
+    objectives: Sequence[str],
+) -> np.ndarray:
+    """
+    (N, M) mask of alternatives no other alternative in the same row
+    beats on every objective (and strictly on at least one).
+    """
+
+    shape = np.broadcast_shapes(*(np.shape(metrics[name]) for name in objectives))
+    n_rows, n_cols = shape
+
+    # Accumulate per objective instead of materialising (N, M, M, K):
+    # at_least[:, i, j] / better[:, i, j] compare j against candidate i
+    at_least = np.ones((n_rows, n_cols, n_cols), dtype=bool)
+    better = np.zeros((n_rows, n_cols, n_cols), dtype=bool)
+
+    for name in objectives:
+        values = np.broadcast_to(_oriented(metrics[name], OBJECTIVES[name]), shape)
+        candidate = values[:, :, None]
+        other = values[:, None, :]
+
+        at_least &= other >= candidate
+        better |= other > candidate
+
+    dominated = (at_least & better).any(axis=2)
+
+    return ~dominated
+
+
+def top_k(scores: np.ndarray, k: Optional[int] = None) -> np.ndarray:
+    """
+    Column indices of the k best scores per row, best first.
+    Uses a partial partition so cost grows with M, not M log M; ties
+    keep catalog order like a stable sort.
+    """
+
+    n_cols = scores.shape[1]
+    k = n_cols if k is None else min(k, n_cols)
+
+    if k >= n_cols:
+        return np.argsort(-scores, axis=1, kind="stable")
+
+    # k-th best score per row; everything above it is in, and ties
+    # at the boundary are filled in column order
+    kth = -np.partition(-scores, k - 1, axis=1)[:, k - 1:k]
+    above = scores > kth
+    ties = scores == kth
+    room = k - above.sum(axis=1, keepdims=True)
+    selected = above | (ties & (np.cumsum(ties, axis=1) <= room))
+
+    # Exactly k selected per row, so nonzero() reshapes cleanly
+    candidates = np.nonzero(selected)[1].reshape(len(scores), k)
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+
+    # Sort the k candidates by score desc, then column index
+    order = np.lexsort((candidates, -candidate_scores), axis=1)
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def rank_matrix(
+    metrics: Mapping[str, np.ndarray],
+    weights: Mapping[str, float],
+    top_n: Optional[int] = None,
+    pareto_only: bool = False,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Rank N fields × M alternatives.
+
+    Returns scores (N, M), order (N, k) best first, and a keep mask
+    (N, k) that is False for padding slots when pareto_only leaves a
+    row with fewer than k alternatives.
+    """
+
+    scores = score_matrix(metrics, weights)
+    ranked = scores
+
+    if pareto_only:
+        objectives = [name for name, weight in weights.items() if weight]
+        front = pareto_front(metrics, objectives)
+        ranked = np.where(front, scores, -np.inf)
+
+    order = top_k(ranked, top_n)
+    keep = np.isfinite(np.take_along_axis(ranked, order, axis=1))
+
+    return scores, order, keep
+
+
+# ---------------------------------------------------------
+# 3️⃣ Rank Alternatives (single field)
 # ---------------------------------------------------------
 
 def rank_alternatives(
     recommendations: List[Dict],
     district: str,
+    weight_profile: Optional[str] = None,
+    top_n: Optional[int] = None,
+    pareto_only: bool = False,
 ) -> List[Dict]:
+    """
+    Score recommendations, set final_score and return the top
+    entries best first.
+    """
 
     if not recommendations:
         return recommendations
 
-    profits = [r["expected_income"] - r["setup_cost"] for r in recommendations]
-    co2_vals = [r["co2_saved_tons"] for r in recommendations]
-    break_evens = [r["break_even_months"] for r in recommendations]
+    snapshot = get_snapshot()
+    weights = resolve_weights(weight_profile, snapshot)
+
+    metrics = {
+        name: np.array([[
+            np.nan if r.get(field) is None else r[field]
+            for r in recommendations
+        ]], dtype=float)
+        for name, field in OBJECTIVE_FIELDS.items()
+        if name in weights
+    }
 
-    min_profit, max_profit = min(profits), max(profits)
-    min_co2, max_co2 = min(co2_vals), max(co2_vals)
-    min_be, max_be = min(break_evens), max(break_evens)
+    # Financials report profit including carbon credits when available
+    if "profit" in metrics:
+        metrics["profit"] = np.array([[
+            r.get("profit", r["expected_income"] - r["setup_cost"])
+            for r in recommendations
+        ]], dtype=float)
 
-    for r in recommendations:
-        profit = r["expected_income"] - r["setup_cost"]
-        be = r["break_even_months"]
-        co2 = r["co2_saved_tons"]
+    # Live district demand, neutral 0.5 where nothing is known
+    metrics["demand"] = demand_matrix(
+        [district], [r["type"] for r in recommendations], 0.5, snapshot,
+    )
+
+    scores, order, keep = rank_matrix(metrics, weights, top_n, pareto_only)
+
+    for r, score in zip(recommendations, scores[0].tolist()):
+        r["final_score"] = score
+
+    return [
+        recommendations[col]
+        for col, kept in zip(order[0].tolist(), keep[0].tolist())
+        if kept
+    ]
+
+
+# ---------------------------------------------------------
+# 4️⃣ Batch (Array) Ranking
+# ---------------------------------------------------------
 
-        # Normalize metrics
-        norm_profit = normalize(profit, min_profit, max_profit)
-        norm_co2 = normalize(co2, min_co2, max_co2)
+def district_demand_matrix(
+    districts: Sequence[str],
+    alternative_types: Sequence[str],
+    snapshot: Optional[ReferenceSnapshot] = None,
+) -> np.ndarray:
+    """
+    (N, M) ranking demand from live signals and the district_demand
+    table, neutral 0.5 where neither knows the pair.
+    """
 
-        # Faster break-even = better score
-        norm_be = 1 - normalize(be, min_be, max_be)
+    return demand_matrix(districts, alternative_types, 0.5, snapshot)
 
-        # District demand weighting
-        demand_score = 0.5  # default neutral
-        if district in DISTRICT_DEMAND:
-            demand_score = DISTRICT_DEMAND[district].get(r["type"], 0.5)
 
-        final_score = (
-            WEIGHTS["profit"] * norm_profit
-            + WEIGHTS["break_even"] * norm_be
-            + WEIGHTS["co2"] * norm_co2
-            + WEIGHTS["demand"] * demand_score
-        )
+def rank_alternatives_matrix(
+    profit: np.ndarray,
+    break_even_months: np.ndarray,
+    co2_saved_tons: np.ndarray,
+    demand: np.ndarray,
+    weights: Optional[Mapping[str, float]] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized rank_alternatives over (N, M) metric arrays with the
+    four classic objectives. Returns final scores (N, M) and per-row
+    column order, best first.
+    """
 
-        r["final_score"] = round(final_score * 100, 2)
+    if weights is None:
+        weights = get_snapshot().weights
 
-    # Sort by final_score descending
-    recommendations.sort(
-        key=lambda x: x["final_score"],
-        reverse=True
+    scores, order, _ = rank_matrix(
+        {
+            "profit": profit,
+            "break_even": break_even_months,
+            "co2": co2_saved_tons,
+            "demand": np.broadcast_to(demand, np.shape(profit)),
+        },
+        weights,
     )
 
-    return recommendations
\ No newline at end of file
+    return scores, order
@@ -0,0 +1,421 @@
+# app/services/reference_data.py
+
+import asyncio
+from dataclasses import dataclass, replace
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from app.core.cache import AsyncLRUCache
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.metrics import register_metrics
+from app.repositories.collections import crops_repo
+from app.schemas.reference_schema import validate_reference_table
+
+
+# ---------------------------------------------------------
+# Seed Tables
+# ---------------------------------------------------------
+# Written to the reference_tables collection on first start.
+# After that MongoDB is the source of truth.
+
+DEFAULT_TABLES: Dict[str, Dict[str, Any]] = {
+    # Basic cost assumptions per alternative
+    "alternatives": {
+        "biochar": {
+            "setup_cost_per_ton": 3000,
+            "income_per_ton": 5500,
+            "co2_saving_per_ton": 0.3,
+        },
+        "pellets": {
+            "setup_cost_per_ton": 2000,
+            "income_per_ton": 4200,
+            "co2_saving_per_ton": 0.2,
+        },
+        "compost": {
+            "setup_cost_per_ton": 1500,
+            "income_per_ton": 2800,
+            "co2_saving_per_ton": 0.1,
+        },
+        "direct_incorporation": {
+            "setup_cost_per_ton": 800,
+            "income_per_ton": 1500,
+            "co2_saving_per_ton": 0.05,
+        },
+    },
+    # Ranking weights
+    "weights": {
+        "profit": 0.4,
+        "break_even": 0.2,
+        "co2": 0.2,
+        "demand": 0.2,
+    },
+    # Named ranking profiles, chosen per request (weight_profile)
+    "weight_profiles": {
+        "balanced": {"profit": 0.4, "break_even": 0.2, "co2": 0.2, "demand": 0.2},
+        "profit_first": {"profit": 0.5, "npv": 0.2, "break_even": 0.2, "demand": 0.1},
+        "climate_first": {"co2": 0.5, "profit": 0.2, "break_even": 0.1, "demand": 0.2},
+        "quick_payback": {"break_even": 0.4, "irr": 0.3, "profit": 0.2, "demand": 0.1},
+    },
+    # District demand per alternative (0–1)
+    "district_demand": {
+        "Pune": {
+            "biochar": 0.9,
+            "pellets": 0.7,
+            "compost": 0.5,
+            "direct_incorporation": 0.4,
+        }
+    },
+    # Price model base prices per residue type
+    "base_prices": {
+        "biochar": 5500,
+        "pellets": 4200,
+        "compost": 2800,
+        "direct_incorporation": 1500,
+    },
+    # Price model district multipliers
+    "district_multipliers": {
+        "Pune": 1.1,
+        "Nagpur": 0.95,
+        "Nashik": 1.05,
+    },
+    # Carbon credit market
+    "carbon": {
+        "credit_price_per_ton": 800,
+    },
+    # Monte Carlo risk model (lognormal volatilities)
+    "risk": {
+        "price_volatility": 0.15,
+        "yield_volatility": 0.10,
+        "cost_volatility": 0.08,
+    },
+    # Month-by-month cash-flow model (month 0 = setup)
+    "cashflow": {
+        "horizon_months": 12,
+        "annual_discount_rate": 0.10,
+        "capex_share": 0.6,
+        "processing_months": 3,
+        "sale_start_month": 1,
+        "sale_months": 6,
+        "carbon_credit_month": 9,
+    },
+}
+
+META_ID = "meta"
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+# ---------------------------------------------------------
+# 1️⃣ Immutable Snapshot
+# ---------------------------------------------------------
+
+@dataclass(frozen=True)
+class ReferenceSnapshot:
+    version: int
+    crops: Mapping[str, float]
+    alternatives: Mapping[str, Mapping[str, float]]
+    weights: Mapping[str, float]
+    weight_profiles: Mapping[str, Mapping[str, float]]
+    district_demand: Mapping[str, Mapping[str, float]]
+    base_prices: Mapping[str, float]
+    district_multipliers: Mapping[str, float]
+    carbon: Mapping[str, float]
+    risk: Mapping[str, float]
+    cashflow: Mapping[str, float]
+    loaded_at: datetime
+
+    @property
+    def alternative_types(self) -> Tuple[str, ...]:
+        return tuple(self.alternatives)
+
+
+def build_snapshot(
+    version: int,
+    crops: Dict[str, float],
+    tables: Dict[str, Dict[str, Any]],
+) -> ReferenceSnapshot:
+    merged = {**DEFAULT_TABLES, **tables}
+
+    return ReferenceSnapshot(
+        version=version,
+        crops=_freeze(crops),
+        alternatives=_freeze(merged["alternatives"]),
+        weights=_freeze(merged["weights"]),
+        weight_profiles=_freeze(merged["weight_profiles"]),
+        district_demand=_freeze(merged["district_demand"]),
+        base_prices=_freeze(merged["base_prices"]),
+        district_multipliers=_freeze(merged["district_multipliers"]),
+        carbon=_freeze(merged["carbon"]),
+        risk=_freeze(merged["risk"]),
+        cashflow=_freeze(merged["cashflow"]),
+        loaded_at=datetime.utcnow(),
+    )
+
+
+# Until the first load, hot paths see the seed tables (no crops)
+_snapshot: ReferenceSnapshot = build_snapshot(0, {}, {})
+_listeners: List[Callable[[ReferenceSnapshot], None]] = []
+_validators: List[Callable[[ReferenceSnapshot], Any]] = []
+_poll_task: Optional[asyncio.Task] = None
+_reloads = 0
+
+# Unknown crop names, so repeated typos do not hit the DB
+_unknown_crops = AsyncLRUCache(
+    name="unknown_crops",
+    max_entries=10000,
+    ttl_seconds=settings.REFERENCE_NEGATIVE_CACHE_SECONDS,
+)
+
+
+def get_snapshot() -> ReferenceSnapshot:
+    return _snapshot
+
+
+def on_snapshot_change(listener: Callable[[ReferenceSnapshot], None]) -> None:
+    """
+    Register a callback run after every snapshot swap, e.g. to
+    rebuild structures derived from reference data.
+    """
+
+    _listeners.append(listener)
+
+
+def on_snapshot_validate(validator: Callable[[ReferenceSnapshot], Any]) -> None:
+    """
+    Register a check run on a candidate snapshot before it is stored
+    or swapped in. It builds derived structures without installing
+    them and raises if the snapshot cannot be served.
+    """
+
+    _validators.append(validator)
+
+
+def validate_snapshot(snapshot: ReferenceSnapshot) -> None:
+    """
+    Run every validator; any failure is raised as ValueError.
+    """
+
+    for validator in _validators:
+        try:
+            validator(snapshot)
+        except ValueError:
+            raise
+        except Exception as exc:
+            raise ValueError(f"Reference data rejected: {exc!r}") from exc
+
+
+def refresh_derived() -> None:
+    """
+    Re-run snapshot listeners on the current snapshot, for derived
+    structures that also depend on something else (the price model).
+    """
+
+    for listener in _listeners:
+        listener(_snapshot)
+
+
+# ---------------------------------------------------------
+# 2️⃣ Loading
+# ---------------------------------------------------------
+
+async def _seed_tables(db) -> None:
+    for name, data in DEFAULT_TABLES.items():
+        await db.reference_tables.update_one(
+            {"_id": name},
+            {"$setOnInsert": {"data": data, "updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+
+    await db.reference_tables.update_one(
+        {"_id": META_ID},
+        {"$setOnInsert": {"version": 1, "updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+
+async def _read_version(db) -> int:
+    meta = await db.reference_tables.find_one({"_id": META_ID}, {"version": 1})
+    return meta.get("version", 0) if meta else 0
+
+
+async def load_snapshot() -> ReferenceSnapshot:
+    """
+    Read crops and reference tables and atomically swap the snapshot.
+    The snapshot is only published once it validates and every
+    listener has rebuilt from it; otherwise the current one stays.
+    """
+
+    global _snapshot, _reloads
+
+    db = get_database()
+
+    # Read the version first: a concurrent bump then only causes
+    # one extra reload, never a stale snapshot labelled as current
+    version = await _read_version(db)
+
+    crops = {}
+    async for doc in crops_repo.find({}, fields=["name", "residue_ratio"]):
+        crops[doc["name"]] = doc.get("residue_ratio", 0)
+
+    tables = {}
+    async for doc in db.reference_tables.find({"_id": {"$ne": META_ID}}):
+        if doc["_id"] in DEFAULT_TABLES:
+            tables[doc["_id"]] = validate_reference_table(doc["_id"], doc.get("data", {}))
+
+    snapshot = build_snapshot(version, crops, tables)
+    validate_snapshot(snapshot)
+
+    try:
+        for listener in _listeners:
+            listener(snapshot)
+    except Exception:
+        # Put back what the listeners that did run replaced
+        refresh_derived()
+        raise
+
+    _snapshot = snapshot
+    _unknown_crops.clear()
+    _reloads += 1
+
+    return snapshot
+
+
+async def bump_reference_version() -> ReferenceSnapshot:
+    """
+    Mark reference data as changed and reload locally.
+    Other workers pick the new version up on their next poll.
+    """
+
+    db = get_database()
+
+    await db.reference_tables.update_one(
+        {"_id": META_ID},
+        {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+    return await load_snapshot()
+
+
+async def update_reference_table(name: str, data: Dict[str, Any]) -> ReferenceSnapshot:
+    """
+    Validate and store one whole table. Raises ValueError (pydantic
+    ValidationError included) before anything is written when the
+    table, or the snapshot it would produce, is invalid.
+    """
+
+    if name not in DEFAULT_TABLES:
+        raise LookupError(f"Unknown reference table: {name}")
+
+    data = validate_reference_table(name, data)
+    validate_snapshot(replace(_snapshot, **{name: _freeze(data)}))
+
+    db = get_database()
+
+    await db.reference_tables.update_one(
+        {"_id": name},
+        {"$set": {"data": data, "updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+    return await bump_reference_version()
+
+
+async def _poll_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.REFERENCE_DATA_POLL_SECONDS)
+        try:
+            if await _read_version(get_database()) != _snapshot.version:
+                await load_snapshot()
+        except Exception as exc:
+            print(f"⚠️ Reference data reload failed: {exc}")
+
+
+async def start_reference_data() -> None:
+    global _poll_task
+
+    await _seed_tables(get_database())
+
+    # A bad stored table must not keep workers from booting: keep
+    # the current snapshot and let the poll retry after a fix
+    try:
+        await load_snapshot()
+    except ValueError as exc:
+        print(f"⚠️ Reference data not loaded, keeping current snapshot: {exc}")
+
+    if _poll_task is None:
+        _poll_task = asyncio.create_task(_poll_loop())
+
+
+async def stop_reference_data() -> None:
+    global _poll_task
+
+    if _poll_task is not None:
+        _poll_task.cancel()
+        try:
+            await _poll_task
+        except asyncio.CancelledError:
+            pass
+        _poll_task = None
+
+
+# ---------------------------------------------------------
+# 3️⃣ Crop Lookups
+# ---------------------------------------------------------
+
+async def resolve_crop_ratios(crop_types) -> Dict[str, float]:
+    """
+    Residue ratio per crop name, served from the snapshot.
+    Names missing from the snapshot are checked against the DB once
+    (a crop may have been added since the last reload) and then
+    negatively cached. Unsupported crops are absent from the result.
+    """
+
+    snapshot = _snapshot
+    ratios: Dict[str, float] = {}
+    misses: List[str] = []
+
+    for name in set(crop_types):
+        if name in snapshot.crops:
+            ratios[name] = snapshot.crops[name]
+        elif _unknown_crops.get(name) is None:
+            misses.append(name)
+
+    if not misses:
+        return ratios
+
+    cursor = crops_repo.find(
+        {"name": {"$in": misses}},
+        fields=["name", "residue_ratio"],
+    )
+
+    async for doc in cursor:
+        ratios[doc["name"]] = doc.get("residue_ratio", 0)
+
+    for name in misses:
+        if name not in ratios:
+            _unknown_crops.set(name, True)
+
+    return ratios
+
+
+def reference_data_stats() -> Dict[str, Any]:
+    return {
+        "version": _snapshot.version,
+        "crops": len(_snapshot.crops),
+        "alternatives": len(_snapshot.alternatives),
+        "loaded_at": _snapshot.loaded_at.isoformat(),
+        "reloads": _reloads,
+        "unknown_crops_cached": _unknown_crops.stats()["size"],
+    }
+
+
+register_metrics("reference_data", reference_data_stats)
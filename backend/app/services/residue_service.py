@@ -1,6 +1,8 @@
 # app/services/residue_service.py
 
-from app.core.database import get_database
+from typing import Dict, Iterable
+
+from app.services.reference_data import resolve_crop_ratios
 
 
 async def calculate_residue(field_size_acres: float, crop_type: str) -> float:
@@ -9,15 +11,22 @@ async def calculate_residue(field_size_acres: float, crop_type: str) -> float:
     residue = field_size_acres × residue_ratio
     """
 
-    db = get_database()
-
-    crop = await db.crops.find_one({"name": crop_type})
+    ratios = await resolve_crop_ratios([crop_type])
 
-    if not crop:
+    if crop_type not in ratios:
         raise ValueError("Crop not supported")
 
-    residue_ratio = crop.get("residue_ratio", 0)
+    residue_ratio = ratios[crop_type]
 
     residue_tons = field_size_acres * residue_ratio
 
-    return round(residue_tons, 2)
\ No newline at end of file
+    return round(residue_tons, 2)
+
+
+async def get_residue_ratios(crop_types: Iterable[str]) -> Dict[str, float]:
+    """
+    Resolve residue ratios for many crops at once.
+    Unsupported crops are simply absent from the result.
+    """
+
+    return await resolve_crop_ratios(crop_types)
@@ -0,0 +1,193 @@
+# app/services/risk_service.py
+
+"""
+Monte Carlo risk for advisory recommendations.
+
+Price, residue yield and setup cost are drawn as mean-one lognormal
+multipliers around the deterministic financials, for all samples ×
+alternatives in one vectorized pass. Volatilities live in the "risk"
+reference table; break-even months come from the same monthly
+CashFlowModel as the deterministic figures.
+"""
+
+import asyncio
+import secrets
+import time
+from typing import Any, Dict, Mapping, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import register_metrics
+from app.services.cashflow_service import CashFlowModel
+from app.services.reference_data import ReferenceSnapshot, get_snapshot
+
+
+# Samples per month-axis pass, bounds the (samples, alternatives,
+# months) cash-flow array to a few MB
+BREAK_EVEN_CHUNK = 8192
+
+
+# Measured cost of one (sample × alternative) draw, for tuning
+# RISK_NS_PER_DRAW; never used to size a run
+_ns_per_draw = settings.RISK_NS_PER_DRAW
+_runs = 0
+_capped_runs = 0
+_last_elapsed_ms = 0.0
+
+
+def _lognormal(rng: np.random.Generator, sigma: float, size) -> np.ndarray:
+    # mean = 1, so the deterministic figures stay the expected case
+    return rng.lognormal(mean=-0.5 * sigma ** 2, sigma=sigma, size=size)
+
+
+def _budget_samples(requested: Optional[int], alternatives: int) -> int:
+    """
+    Requested (or default) sample count, capped by the latency budget.
+    Depends on config only, so it is the same for every call.
+    """
+
+    samples = min(requested or settings.RISK_SAMPLES_DEFAULT, settings.RISK_SAMPLES_MAX)
+
+    affordable = int(
+        settings.RISK_LATENCY_BUDGET_MS * 1e6
+        / (settings.RISK_NS_PER_DRAW * max(alternatives, 1))
+    )
+
+    return max(min(samples, affordable), 100)
+
+
+# ---------------------------------------------------------
+# 1️⃣ Simulation
+# ---------------------------------------------------------
+
+def simulate_risk(
+    financials: Mapping[str, Mapping[str, float]],
+    samples: Optional[int] = None,
+    seed: Optional[int] = None,
+    snapshot: Optional[ReferenceSnapshot] = None,
+) -> Dict[str, Any]:
+    """
+    Risk profile per alternative from calculate_financials() output:
+    P10/P50/P90 profit, probability of loss, the share of runs that
+    break even within the cash-flow horizon and their mean break-even
+    month (None if none do). The same seed and sample count reproduce
+    the same result; the effective sample count is returned as
+    "samples".
+    """
+
+    global _ns_per_draw, _runs, _capped_runs, _last_elapsed_ms
+
+    started = time.perf_counter()
+
+    snapshot = snapshot or get_snapshot()
+    params = snapshot.risk
+    cashflow = CashFlowModel(snapshot.cashflow)
+    alternatives = list(financials)
+
+    n = _budget_samples(samples, len(alternatives))
+    capped = n < min(samples or settings.RISK_SAMPLES_DEFAULT, settings.RISK_SAMPLES_MAX)
+    seed = secrets.randbits(32) if seed is None else seed
+
+    rng = np.random.default_rng(seed)
+
+    setup_cost = np.array([financials[a]["setup_cost"] for a in alternatives])
+    sale_income = np.array([financials[a]["expected_income"] for a in alternatives])
+    carbon_income = np.array(
+        [financials[a].get("carbon_credit_income", 0.0) for a in alternatives]
+    )
+
+    # Yield moves every alternative of a field together; price and
+    # cost move independently per alternative
+    yield_draw = _lognormal(rng, params["yield_volatility"], (n, 1))
+    price_draw = _lognormal(rng, params["price_volatility"], (n, len(alternatives)))
+    cost_draw = _lognormal(rng, params["cost_volatility"], (n, len(alternatives)))
+
+    sale = yield_draw * sale_income * price_draw
+    carbon = yield_draw * carbon_income
+    cost = yield_draw * setup_cost * cost_draw
+    profit = sale + carbon - cost
+
+    p10, p50, p90 = np.percentile(profit, [10, 50, 90], axis=0)
+    probability_of_loss = (profit < 0).mean(axis=0)
+
+    # Same monthly cash-flow model as the deterministic break-even
+    break_even = np.concatenate([
+        cashflow.break_even(
+            cost[start:start + BREAK_EVEN_CHUNK],
+            sale[start:start + BREAK_EVEN_CHUNK],
+            carbon[start:start + BREAK_EVEN_CHUNK],
+        )
+        for start in range(0, n, BREAK_EVEN_CHUNK)
+    ])
+
+    reached = ~np.isnan(break_even)
+    probability_of_break_even = reached.mean(axis=0)
+    with np.errstate(invalid="ignore"):
+        expected_break_even = np.where(reached, break_even, 0.0).sum(axis=0) / reached.sum(axis=0)
+
+    results = {
+        alt: {
+            "profit_p10": round(float(p10[col]), 2),
+            "profit_p50": round(float(p50[col]), 2),
+            "profit_p90": round(float(p90[col]), 2),
+            "probability_of_loss": round(float(probability_of_loss[col]), 4),
+            "probability_of_break_even": round(float(probability_of_break_even[col]), 4),
+            "expected_break_even_months": None
+            if np.isnan(expected_break_even[col])
+            else round(float(expected_break_even[col]), 1),
+        }
+        for col, alt in enumerate(alternatives)
+    }
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if alternatives:
+        measured = elapsed_ms * 1e6 / (n * len(alternatives))
+        _ns_per_draw = 0.8 * _ns_per_draw + 0.2 * measured
+
+    _runs += 1
+    _capped_runs += int(capped)
+    _last_elapsed_ms = elapsed_ms
+
+    return {
+        "alternatives": results,
+        "samples": n,
+        "seed": seed,
+        "budget_capped": capped,
+        "elapsed_ms": round(elapsed_ms, 2),
+    }
+
+
+async def simulate_risk_async(
+    financials: Mapping[str, Mapping[str, float]],
+    samples: Optional[int] = None,
+    seed: Optional[int] = None,
+    snapshot: Optional[ReferenceSnapshot] = None,
+) -> Dict[str, Any]:
+    """
+    simulate_risk() on a worker thread; numpy releases the GIL for
+    most of it, so other requests keep being served meanwhile.
+    """
+
+    return await asyncio.to_thread(
+        simulate_risk,
+        financials,
+        samples,
+        seed,
+        snapshot or get_snapshot(),
+    )
+
+
+def risk_stats() -> Dict[str, Any]:
+    return {
+        "runs": _runs,
+        "budget_capped_runs": _capped_runs,
+        "ns_per_draw": settings.RISK_NS_PER_DRAW,
+        "ns_per_draw_measured": round(_ns_per_draw, 2),
+        "last_elapsed_ms": round(_last_elapsed_ms, 2),
+        "budget_ms": settings.RISK_LATENCY_BUDGET_MS,
+    }
+
+
+register_metrics("risk_simulation", risk_stats)
@@ -0,0 +1,287 @@
+# app/services/rollup_service.py
+
+"""
+Incrementally maintained advisory rollups.
+
+One document per day × state × district holds the advisory count,
+total CO₂ saved and the recommendation mix per alternative type.
+Every advisory write $inc-upserts its rollup row, so admin analytics
+read O(rollup rows) instead of scanning advisories.
+
+Rebuild from history (run while advisory traffic is quiet, then
+set ANALYTICS_USE_ROLLUPS=true):
+
+    python -m app.services.rollup_service --backfill
+"""
+
+import argparse
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pymongo import UpdateOne
+
+from app.core.database import get_database, get_analytics_database
+
+
+ROLLUP_COLLECTION = "advisory_rollups"
+
+
+def _day(value: datetime) -> datetime:
+    return datetime(value.year, value.month, value.day)
+
+
+# ---------------------------------------------------------
+# 1️⃣ Incremental Updates
+# ---------------------------------------------------------
+
+def rollup_updates(advisory_docs: List[Dict[str, Any]]) -> List[UpdateOne]:
+    """
+    Fold advisories into one $inc upsert per rollup row.
+    """
+
+    rows: Dict[Tuple, Dict[str, Any]] = defaultdict(
+        lambda: defaultdict(int, co2_saved_tons=0.0)
+    )
+
+    for doc in advisory_docs:
+        key = (
+            _day(doc["created_at"]),
+            doc.get("state"),
+            doc.get("location_district"),
+        )
+        inc = rows[key]
+        inc["advisories"] += 1
+
+        for rec in doc.get("recommendations", []):
+            inc["co2_saved_tons"] += rec.get("co2_saved_tons", 0.0)
+            if rec.get("type"):
+                inc[f"mix.{rec['type']}"] += 1
+
+    return [
+        UpdateOne(
+            {"day": day, "state": state, "district": district},
+            {"$inc": dict(inc)},
+            upsert=True,
+        )
+        for (day, state, district), inc in rows.items()
+    ]
+
+
+async def record_advisories(advisory_docs: List[Dict[str, Any]]) -> None:
+    if not advisory_docs:
+        return
+
+    db = get_database()
+
+    try:
+        await db[ROLLUP_COLLECTION].bulk_write(
+            rollup_updates(advisory_docs),
+            ordered=False,
+        )
+    except Exception as exc:
+        # Rollups are derived data; never fail the advisory itself
+        print(f"⚠️ Rollup update failed: {exc}")
+
+
+# record_advisories() calls running off the request path
+_pending: Set[asyncio.Task] = set()
+
+
+def schedule_rollups(advisory_docs: List[Dict[str, Any]]) -> None:
+    """
+    record_advisories() in the background, so a request does not wait
+    for the rollup round-trip after its advisory is stored.
+    """
+
+    if not advisory_docs:
+        return
+
+    task = asyncio.create_task(record_advisories(advisory_docs))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+async def drain_rollups() -> None:
+    """
+    Wait for scheduled rollup updates, e.g. before shutdown.
+    """
+
+    while _pending:
+        await asyncio.gather(*_pending, return_exceptions=True)
+
+
+# ---------------------------------------------------------
+# 2️⃣ Backfill
+# ---------------------------------------------------------
+
+async def backfill_rollups() -> int:
+    """
+    Rebuild every rollup row from the advisories collection.
+    """
+
+    db = get_database()
+
+    await db[ROLLUP_COLLECTION].delete_many({})
+
+    key = {
+        "day": {"$dateTrunc": {"date": "$created_at", "unit": "day"}},
+        "state": "$state",
+        "district": "$location_district",
+    }
+    merge = {
+        "$merge": {
+            "into": ROLLUP_COLLECTION,
+            "on": ["day", "state", "district"],
+            "whenMatched": "merge",
+            "whenNotMatched": "insert",
+        }
+    }
+    unpack_key = {
+        "_id": 0,
+        "day": "$_id.day",
+        "state": "$_id.state",
+        "district": "$_id.district",
+    }
+
+    # Counts and CO₂ per row
+    await db.advisories.aggregate([
+        {"$group": {
+            "_id": key,
+            "advisories": {"$sum": 1},
+            "co2_saved_tons": {"$sum": {"$sum": "$recommendations.co2_saved_tons"}},
+        }},
+        {"$project": {**unpack_key, "advisories": 1, "co2_saved_tons": 1}},
+        merge,
+    ]).to_list(length=None)
+
+    # Recommendation mix per row
+    await db.advisories.aggregate([
+        {"$unwind": "$recommendations"},
+        {"$match": {"recommendations.type": {"$ne": None}}},
+        {"$group": {
+            "_id": {**key, "type": "$recommendations.type"},
+            "count": {"$sum": 1},
+        }},
+        {"$group": {
+            "_id": {
+                "day": "$_id.day",
+                "state": "$_id.state",
+                "district": "$_id.district",
+            },
+            "mix": {"$push": {"k": "$_id.type", "v": "$count"}},
+        }},
+        {"$project": {**unpack_key, "mix": {"$arrayToObject": "$mix"}}},
+        merge,
+    ]).to_list(length=None)
+
+    return await db[ROLLUP_COLLECTION].count_documents({})
+
+
+# ---------------------------------------------------------
+# 3️⃣ Rollup Reads
+# ---------------------------------------------------------
+
+def rollup_match(
+    district: Optional[str] = None,
+    state: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Rollups are daily, so start and end are both truncated to their
+    day: [start's day, end's day).
+    """
+
+    match: Dict[str, Any] = {}
+
+    if district:
+        match["district"] = district
+
+    if state:
+        match["state"] = state
+
+    if start or end:
+        match["day"] = {}
+        if start:
+            match["day"]["$gte"] = _day(start)
+        if end:
+            match["day"]["$lt"] = _day(end)
+
+    return match
+
+
+async def _aggregate(pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    db = get_analytics_database()
+    return await db[ROLLUP_COLLECTION].aggregate(pipeline).to_list(length=None)
+
+
+async def rollup_monthly(year: int, district=None, state=None) -> Dict[int, int]:
+    match = rollup_match(
+        district, state, datetime(year, 1, 1), datetime(year + 1, 1, 1),
+    )
+
+    docs = await _aggregate([
+        {"$match": match},
+        {"$group": {"_id": {"$month": "$day"}, "count": {"$sum": "$advisories"}}},
+    ])
+
+    return {doc["_id"]: doc["count"] for doc in docs}
+
+
+async def rollup_by_district(state=None, start=None, end=None) -> List[Dict]:
+    docs = await _aggregate([
+        {"$match": rollup_match(state=state, start=start, end=end)},
+        {"$group": {"_id": "$district", "count": {"$sum": "$advisories"}}},
+        {"$sort": {"_id": 1}},
+    ])
+
+    return [{"district": doc["_id"], "advisories": doc["count"]} for doc in docs]
+
+
+async def rollup_total_co2(district=None, state=None, start=None, end=None) -> float:
+    docs = await _aggregate([
+        {"$match": rollup_match(district, state, start, end)},
+        {"$group": {"_id": None, "total": {"$sum": "$co2_saved_tons"}}},
+    ])
+
+    return docs[0]["total"] if docs else 0.0
+
+
+async def rollup_mix(district=None, state=None, start=None, end=None) -> List[Dict]:
+    docs = await _aggregate([
+        {"$match": rollup_match(district, state, start, end)},
+        {"$project": {"_id": 0, "mix": {"$objectToArray": "$mix"}}},
+        {"$unwind": "$mix"},
+        {"$group": {"_id": "$mix.k", "count": {"$sum": "$mix.v"}}},
+        {"$sort": {"_id": 1}},
+    ])
+
+    return [{"type": doc["_id"], "count": doc["count"]} for doc in docs]
+
+
+# ---------------------------------------------------------
+# 4️⃣ CLI
+# ---------------------------------------------------------
+
+async def _main() -> None:
+    from app.core.database import connect_to_mongo, close_mongo_connection
+
+    await connect_to_mongo()
+    try:
+        rows = await backfill_rollups()
+        print(f"✅ Rebuilt {rows} rollup rows")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Advisory analytics rollups")
+    parser.add_argument("--backfill", action="store_true", help="rebuild rollups from advisories")
+    args = parser.parse_args()
+
+    if not args.backfill:
+        parser.error("nothing to do, pass --backfill")
+
+    asyncio.run(_main())
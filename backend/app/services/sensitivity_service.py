@@ -0,0 +1,300 @@
+# app/services/sensitivity_service.py
+
+"""
+What-if sweeps over price, residue ratio, setup cost and demand.
+
+The full parameter grid is flattened into rows and priced and ranked
+in one FinancialEngine / rank_alternatives_matrix pass, on a worker
+thread so a large grid does not hold up the event loop. Nothing is
+persisted; results are cached by a hash of the request together with
+the reference snapshot version and month.
+"""
+
+import asyncio
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.core.cache import AsyncLRUCache
+from app.core.config import settings
+from app.core.metrics import register_metrics
+from app.ml.online_prices import correction_generation
+from app.schemas.advisory_schema import SensitivityRequestSchema
+from app.services.demand_service import demand_generation, demand_matrix
+from app.services.financial_service import DEFAULT_DEMAND_SCORE, get_financial_engine
+from app.services.ranking_service import district_demand_matrix, rank_alternatives_matrix
+from app.services.reference_data import (
+    ReferenceSnapshot,
+    get_snapshot,
+    on_snapshot_change,
+    resolve_crop_ratios,
+)
+
+
+PARAMETERS = ("price_multiplier", "residue_ratio", "setup_cost_multiplier", "demand_score")
+
+# Upper bound on reported flip points; the best_alternative grid has them all
+MAX_FLIPS = 1000
+
+sensitivity_cache = AsyncLRUCache(
+    "sensitivity",
+    max_entries=settings.SENSITIVITY_CACHE_SIZE,
+    ttl_seconds=settings.SENSITIVITY_CACHE_TTL_SECONDS,
+)
+
+register_metrics("sensitivity_cache", sensitivity_cache.stats)
+
+# Also fires on a price model swap, which the cache key does not cover
+on_snapshot_change(lambda snapshot: sensitivity_cache.clear())
+
+
+def request_hash(request: SensitivityRequestSchema) -> str:
+    body = json.dumps(request.model_dump(), sort_keys=True)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+# ---------------------------------------------------------
+# 1️⃣ Grid Evaluation
+# ---------------------------------------------------------
+
+def _evaluate(
+    request: SensitivityRequestSchema,
+    values: Dict[str, np.ndarray],
+    month: int,
+    snapshot: ReferenceSnapshot,
+) -> Dict[str, np.ndarray]:
+    """
+    Financials and ranking for one row per parameter combination.
+    """
+
+    engine = get_financial_engine(snapshot)
+    rows = len(values["residue_ratio"])
+
+    price = values["price_multiplier"]
+    cost = values["setup_cost_multiplier"]
+
+    # Multipliers hit only the target column when one is given
+    if request.target:
+        column = np.array(engine.alternative_types) == request.target
+        price = np.where(column, price[:, None], 1.0)
+        cost = np.where(column, cost[:, None], 1.0)
+
+    fin = engine.compute(
+        np.round(request.field_size_acres * values["residue_ratio"], 2),
+        [request.location_district] * rows,
+        values["demand_score"],
+        month,
+        price_multiplier=price,
+        cost_multiplier=cost,
+        # Neither ranked nor reported here, and most of the cost
+        solve_irr=False,
+    )
+
+    scores, order = rank_alternatives_matrix(
+        profit=fin["profit"],
+        break_even_months=fin["break_even_months"],
+        co2_saved_tons=fin["co2_saved_tons"],
+        demand=district_demand_matrix(
+            [request.location_district],
+            engine.alternative_types,
+            snapshot,
+        ),
+        weights=snapshot.weights,
+    )
+
+    return {"profit": fin["profit"], "scores": scores, "best": order[:, 0]}
+
+
+def _flips(
+    best: np.ndarray,
+    axes: Dict[str, np.ndarray],
+    alternative_types,
+) -> List[Dict[str, Any]]:
+    """
+    Adjacent grid cells, along each swept axis, whose winner differs.
+    """
+
+    names = list(axes)
+    flips = []
+
+    for axis, name in enumerate(names):
+        left = np.take(best, range(best.shape[axis] - 1), axis=axis)
+        right = np.take(best, range(1, best.shape[axis]), axis=axis)
+
+        for cell in np.argwhere(left != right):
+            if len(flips) >= MAX_FLIPS:
+                return flips
+
+            step = cell[axis]
+            flips.append({
+                "parameter": name,
+                "between": [
+                    round(float(axes[name][step]), 4),
+                    round(float(axes[name][step + 1]), 4),
+                ],
+                "from": alternative_types[left[tuple(cell)]],
+                "to": alternative_types[right[tuple(cell)]],
+                "at": {
+                    other: round(float(axes[other][cell[i]]), 4)
+                    for i, other in enumerate(names)
+                    if other != name
+                },
+            })
+
+    return flips
+
+
+def sensitivity_sweep(
+    request: SensitivityRequestSchema,
+    base_ratio: float,
+    month: int,
+    snapshot: ReferenceSnapshot,
+) -> Dict[str, Any]:
+    alternative_types = snapshot.alternative_types
+
+    if request.target and request.target not in alternative_types:
+        raise ValueError(f"Unknown alternative: {request.target}")
+
+    # Demand defaults to the live per-alternative scores /analyze
+    # prices with; a swept demand applies to every alternative
+    live_demand = demand_matrix(
+        [request.location_district], alternative_types, DEFAULT_DEMAND_SCORE, snapshot,
+    )[0]
+
+    baseline = {
+        "price_multiplier": 1.0,
+        "residue_ratio": base_ratio,
+        "setup_cost_multiplier": 1.0,
+        "demand_score": live_demand,
+    }
+
+    axes: Dict[str, np.ndarray] = {}
+    for name in PARAMETERS:
+        sweep = getattr(request, name)
+        if sweep is None:
+            continue
+        if sweep.min > sweep.max:
+            raise ValueError(f"{name}: min must not exceed max")
+        axes[name] = np.linspace(sweep.min, sweep.max, sweep.steps)
+
+    if not axes:
+        raise ValueError("Provide at least one parameter range")
+
+    shape = tuple(len(values) for values in axes.values())
+    cells = int(np.prod(shape))
+
+    if cells > settings.SENSITIVITY_MAX_CELLS:
+        raise ValueError(
+            f"Grid has {cells} cells, at most {settings.SENSITIVITY_MAX_CELLS} allowed"
+        )
+
+    # Full grid, flattened to one row per cell
+    mesh = dict(zip(axes, np.meshgrid(*axes.values(), indexing="ij")))
+    # Unswept demand stays (cells, alternatives); the rest is per cell
+    grid = {
+        name: mesh[name].ravel() if name in mesh
+        else np.repeat(np.asarray(value, dtype=float)[None], cells, axis=0)
+        for name, value in baseline.items()
+    }
+
+    result = _evaluate(request, grid, month, snapshot)
+    best = result["best"].reshape(shape)
+    best_profit = np.take_along_axis(result["profit"], result["best"][:, None], axis=1)
+
+    # Tornado: each swept parameter at its min and max, others at baseline
+    swept = list(axes)
+    tornado_rows = {
+        name: np.array([
+            np.broadcast_to(value, np.shape(baseline[name]))
+            for value in (
+                [baseline[name]]
+                + [axes[p][0] if p == name else baseline[name] for p in swept]
+                + [axes[p][-1] if p == name else baseline[name] for p in swept]
+            )
+        ])
+        for name in PARAMETERS
+    }
+    tornado_eval = _evaluate(request, tornado_rows, month, snapshot)
+
+    focus = alternative_types.index(request.target) if request.target else int(
+        tornado_eval["best"][0]
+    )
+    focus_profit = tornado_eval["profit"][:, focus].tolist()
+    base_profit = focus_profit[0]
+
+    tornado = sorted(
+        (
+            {
+                "parameter": name,
+                "low": round(float(axes[name][0]), 4),
+                "high": round(float(axes[name][-1]), 4),
+                "profit_at_low": focus_profit[1 + i],
+                "profit_at_high": focus_profit[1 + len(swept) + i],
+                "swing": round(abs(
+                    focus_profit[1 + len(swept) + i] - focus_profit[1 + i]
+                ), 2),
+            }
+            for i, name in enumerate(swept)
+        ),
+        key=lambda bar: bar["swing"],
+        reverse=True,
+    )
+
+    profit = result["profit"]
+
+    return {
+        "alternatives": list(alternative_types),
+        "parameters": {name: np.round(values, 4).tolist() for name, values in axes.items()},
+        "baseline": {
+            **baseline,
+            "demand_score": dict(zip(alternative_types, live_demand.tolist())),
+        },
+        "shape": list(shape),
+        "cells": cells,
+        # Grids indexed like "parameters", values index into "alternatives"
+        "best_alternative": best.tolist(),
+        "best_profit": best_profit.reshape(shape).tolist(),
+        "profit_range": {
+            alt: [float(profit[:, col].min()), float(profit[:, col].max())]
+            for col, alt in enumerate(alternative_types)
+        },
+        "flips": _flips(best, axes, alternative_types),
+        "tornado": {
+            "alternative": alternative_types[focus],
+            "baseline_profit": base_profit,
+            "bars": tornado,
+        },
+        "reference_version": snapshot.version,
+        "month": month,
+    }
+
+
+# ---------------------------------------------------------
+# 2️⃣ Cached Entry Point
+# ---------------------------------------------------------
+
+async def run_sensitivity(request: SensitivityRequestSchema) -> Dict[str, Any]:
+    snapshot = get_snapshot()
+    month = request.month or datetime.utcnow().month
+
+    ratios = await resolve_crop_ratios([request.crop_type])
+    if request.crop_type not in ratios:
+        raise ValueError("Crop not supported")
+
+    key = (
+        request_hash(request),
+        snapshot.version,
+        correction_generation(),
+        demand_generation(),
+        month,
+    )
+
+    async def load():
+        return await asyncio.to_thread(
+            sensitivity_sweep, request, ratios[request.crop_type], month, snapshot,
+        )
+
+    return await sensitivity_cache.get_or_load(key, load)
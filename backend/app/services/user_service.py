@@ -0,0 +1,81 @@
+# app/services/user_service.py
+
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.core.database import get_database
+from app.core.dependencies import invalidate_principal
+from app.core.token_epochs import bump_token_epoch, set_user_state
+
+
+# ---------------------------------------------------------
+# 1️⃣ Update Role / Active Flag
+# ---------------------------------------------------------
+
+async def update_user_access(
+    user_id: str,
+    role: Optional[str] = None,
+    is_active: Optional[bool] = None,
+) -> dict:
+    """
+    Change a user's role and/or active flag.
+    Cached principals for the user are invalidated so the
+    change applies to the very next request. A role change or
+    deactivation also bumps the token epoch, since issued tokens
+    still carry the old role claim.
+    """
+
+    if not ObjectId.is_valid(user_id):
+        raise ValueError("User not found")
+
+    db = get_database()
+
+    update: dict = {"$set": {"updated_at": datetime.utcnow()}}
+
+    if role is not None:
+        update["$set"]["role"] = role
+
+    if is_active is not None:
+        update["$set"]["is_active"] = is_active
+
+    if role is not None or is_active is False:
+        update["$inc"] = {"token_epoch": 1}
+
+    doc = await db.users.find_one_and_update(
+        {"_id": ObjectId(user_id)},
+        update,
+        projection={"token_epoch": 1, "is_active": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+
+    if doc is None:
+        raise ValueError("User not found")
+
+    invalidate_principal(user_id)
+    set_user_state(
+        user_id,
+        doc.get("token_epoch", 0),
+        doc.get("is_active", True),
+    )
+
+    return {
+        "message": "User access updated",
+        "user_id": user_id,
+    }
+
+
+# ---------------------------------------------------------
+# 2️⃣ Revoke Issued Tokens
+# ---------------------------------------------------------
+
+async def revoke_user_tokens(user_id: str) -> dict:
+    epoch = await bump_token_epoch(user_id)
+    invalidate_principal(user_id)
+
+    return {
+        "message": "Tokens revoked",
+        "user_id": user_id,
+        "token_epoch": epoch,
+    }
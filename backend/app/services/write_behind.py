@@ -0,0 +1,238 @@
+# app/services/write_behind.py
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo.errors import BulkWriteError
+
+from app.core.database import get_database
+
+
+# Write errors retrying cannot fix
+DUPLICATE_KEY = 11000
+DOCUMENT_VALIDATION_FAILURE = 121
+
+
+class WriteBehindQueue:
+    """
+    Bounded in-process queue that persists documents in batches.
+
+    Documents are flushed with insert_many(ordered=False) once
+    batch_size documents are waiting or flush_interval_seconds has
+    passed since the first one arrived. put() blocks while the queue
+    is full, which applies backpressure to callers. on_flush, when
+    given, receives the documents that were actually written.
+
+    Callers were answered before their documents are written, so a
+    failed flush is retried up to max_retries times with exponential
+    backoff; only documents the server rejects outright (duplicate
+    key, validation) are dropped. The consumer waits out the backoff,
+    so a database outage fills the queue and slows put() down rather
+    than losing documents.
+    """
+
+    def __init__(
+        self,
+        collection: str,
+        max_size: int,
+        batch_size: int,
+        flush_interval_seconds: float,
+        on_flush: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+        max_retries: int = 5,
+        retry_backoff_seconds: float = 0.1,
+    ):
+        self.collection = collection
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.on_flush = on_flush
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._putting = 0
+
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self.retries = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    # ---------------------------------------------------------
+    # Lifecycle
+    # ---------------------------------------------------------
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop accepting work and drain everything still queued,
+        including puts that were already blocked on a full queue.
+        """
+
+        if self._task is None:
+            return
+
+        self._closing = True
+        await self._task
+        self._task = None
+
+    # ---------------------------------------------------------
+    # Producer
+    # ---------------------------------------------------------
+
+    async def put(self, doc: Dict[str, Any]) -> None:
+        if self._queue is None or self._closing:
+            raise RuntimeError(f"Write-behind queue for {self.collection} is not running")
+
+        # Counted until the doc is queued, so the consumer keeps
+        # draining while a blocked put is pending during stop()
+        self._putting += 1
+        try:
+            await self._queue.put(doc)
+        finally:
+            self._putting -= 1
+
+        self.enqueued += 1
+
+    # ---------------------------------------------------------
+    # Consumer
+    # ---------------------------------------------------------
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+
+        while not (self._closing and self._queue.empty() and not self._putting):
+            try:
+                first = await asyncio.wait_for(
+                    self._queue.get(),
+                    timeout=self.flush_interval_seconds,
+                )
+            except asyncio.TimeoutError:
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval_seconds
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+
+        written: List[Dict[str, Any]] = []
+        pending = batch
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+                await asyncio.sleep(self.retry_backoff_seconds * 2 ** (attempt - 1))
+
+            try:
+                await get_database()[self.collection].insert_many(
+                    pending,
+                    ordered=False,
+                )
+                written += pending
+                pending = []
+            except BulkWriteError as exc:
+                errors = {
+                    err["index"]: err.get("code")
+                    for err in exc.details.get("writeErrors", [])
+                }
+                retry = []
+                rejected = 0
+
+                for i, doc in enumerate(pending):
+                    code = errors.get(i)
+
+                    # insert_many set _id on the first attempt, so a
+                    # duplicate on a retry is a write that did land
+                    if i not in errors or (code == DUPLICATE_KEY and attempt):
+                        written.append(doc)
+                    elif code in (DUPLICATE_KEY, DOCUMENT_VALIDATION_FAILURE):
+                        rejected += 1
+                    else:
+                        retry.append(doc)
+
+                if rejected:
+                    self.dropped += rejected
+                    print(f"⚠️ Write-behind {self.collection}: {rejected} documents rejected")
+
+                pending = retry
+            except Exception as exc:
+                print(
+                    f"⚠️ Write-behind {self.collection} flush failed "
+                    f"(attempt {attempt + 1}): {exc}"
+                )
+
+            if not pending:
+                break
+
+        if pending:
+            self.failed += len(pending)
+            print(
+                f"⚠️ Write-behind {self.collection}: {len(pending)} documents "
+                f"lost after {self.max_retries} retries"
+            )
+
+        self.written += len(written)
+
+        if written and self.on_flush is not None:
+            await self.on_flush(written)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        self.flushes += 1
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self._total_flush_ms += elapsed_ms
+
+    # ---------------------------------------------------------
+    # Metrics
+    # ---------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "depth": self._queue.qsize() if self._queue else 0,
+            "max_size": self.max_size,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "retries": self.retries,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2),
+            "avg_flush_ms": round(self._total_flush_ms / self.flushes, 2)
+            if self.flushes else 0.0,
+        }
@@ -0,0 +1,129 @@
+# app/utils/pagination.py
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING
+
+from app.core.config import settings
+from app.repositories.base import Repository
+from app.utils.helpers import serialize_mongo_document
+
+
+# ---------------------------------------------------------
+# 1️⃣ Cursor Tokens
+# ---------------------------------------------------------
+# Tokens are opaque to clients: urlsafe base64 of the last
+# item's sort key, i.e. (created_at, _id) or just _id.
+
+def encode_cursor(doc: Dict[str, Any], sort_field: Optional[str]) -> str:
+    key: Dict[str, Any] = {"id": str(doc["_id"])}
+
+    if sort_field:
+        key["v"] = doc[sort_field].isoformat()
+
+    raw = json.dumps(key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(
+    token: str,
+    sort_field: Optional[str],
+) -> Tuple[Optional[datetime], ObjectId]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded))
+
+        last_id = ObjectId(key["id"])
+        last_value = datetime.fromisoformat(key["v"]) if sort_field else None
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise ValueError("Invalid cursor")
+
+    return last_value, last_id
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    if not limit or limit < 1:
+        return settings.PAGE_SIZE_DEFAULT
+
+    return min(limit, settings.PAGE_SIZE_MAX)
+
+
+# ---------------------------------------------------------
+# 2️⃣ Keyset Queries
+# ---------------------------------------------------------
+
+def keyset_sort(sort_field: Optional[str]) -> List[tuple]:
+    # Newest first by sort_field; plain _id order when there is none
+    if sort_field:
+        return [(sort_field, DESCENDING), ("_id", DESCENDING)]
+
+    return [("_id", ASCENDING)]
+
+
+def keyset_filter(
+    query: Dict[str, Any],
+    cursor: Optional[str],
+    sort_field: Optional[str],
+) -> Dict[str, Any]:
+    if not cursor:
+        return query
+
+    last_value, last_id = decode_cursor(cursor, sort_field)
+
+    if sort_field:
+        after = {"$or": [
+            {sort_field: {"$lt": last_value}},
+            {sort_field: last_value, "_id": {"$lt": last_id}},
+        ]}
+    else:
+        after = {"_id": {"$gt": last_id}}
+
+    return {"$and": [query, after]} if query else after
+
+
+async def fetch_page(
+    repo: Repository,
+    query: Dict[str, Any],
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None,
+    sort_field: Optional[str] = "created_at",
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One keyset page from repo. Memory is bounded by the page size
+    and the sort is served by an index on (filters..., sort_field, _id).
+    Returns serialized items and the cursor for the next page.
+    """
+
+    page_size = clamp_page_size(limit)
+
+    # The sort key must be projected to build the next cursor
+    strip_sort_field = False
+    if fields is not None and sort_field and sort_field not in fields:
+        fields = [*fields, sort_field]
+        strip_sort_field = True
+
+    docs = await repo.find(
+        keyset_filter(query, cursor, sort_field),
+        fields,
+        sort=keyset_sort(sort_field),
+        limit=page_size + 1,
+    ).to_list(length=page_size + 1)
+
+    has_more = len(docs) > page_size
+    docs = docs[:page_size]
+
+    next_cursor = encode_cursor(docs[-1], sort_field) if has_more else None
+
+    items = []
+    for doc in docs:
+        if strip_sort_field:
+            doc.pop(sort_field, None)
+        items.append(serialize_mongo_document(doc))
+
+    return items, next_cursor
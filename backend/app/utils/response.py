@@ -63,7 +63,30 @@ def paginated_response(
 
 
 # ---------------------------------------------------------
-# 4️⃣ Created Response
+# 4️⃣ Cursor (Keyset) Pagination Response
+# ---------------------------------------------------------
+
+def cursor_paginated_response(
+    items: list,
+    next_cursor: Optional[str],
+    page_size: int,
+    message: str = "Success",
+) -> Dict[str, Any]:
+
+    return {
+        "success": True,
+        "message": message,
+        "data": items,
+        "pagination": {
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+        },
+    }
+
+
+# ---------------------------------------------------------
+# 5️⃣ Created Response
 # ---------------------------------------------------------
 
 def created_response(
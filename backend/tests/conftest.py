@@ -0,0 +1,9 @@
+# tests/conftest.py
+
+import os
+import sys
+
+# Settings refuse to load without a signing secret
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,81 @@
+# tests/test_advisory_batch.py
+
+import asyncio
+
+from pymongo.errors import BulkWriteError
+
+from app.schemas.advisory_schema import AdvisoryRequestSchema
+from app.services import advisory_service, rollup_service
+from app.services.advisory_service import analyze_advisory_batch
+from app.services.rollup_service import drain_rollups
+
+
+class FakeDatabase(dict):
+    __getattr__ = dict.__getitem__
+
+
+class FakeAdvisories:
+    """
+    insert_many that rejects the documents at the given positions.
+    """
+
+    def __init__(self, rejected):
+        self.rejected = rejected
+        self.docs = []
+
+    async def insert_many(self, docs, ordered=False):
+        self.docs.extend(doc for i, doc in enumerate(docs) if i not in self.rejected)
+
+        if self.rejected:
+            raise BulkWriteError({"writeErrors": [
+                {"index": i, "code": 121, "errmsg": "Document failed validation"}
+                for i in self.rejected
+            ]})
+
+
+class FakeRollups:
+    def __init__(self):
+        self.updates = []
+
+    async def bulk_write(self, updates, ordered=False):
+        self.updates.extend(updates)
+
+
+def test_rejected_advisories_are_reported_per_item(monkeypatch):
+    advisories = FakeAdvisories(rejected={1})
+    rollups = FakeRollups()
+
+    async def ratios(crop_types):
+        return {name: 1.5 for name in crop_types if name == "wheat"}
+
+    monkeypatch.setattr(advisory_service, "get_residue_ratios", ratios)
+    monkeypatch.setattr(advisory_service, "get_database", lambda: FakeDatabase(advisories=advisories))
+    monkeypatch.setattr(
+        rollup_service, "get_database",
+        lambda: {rollup_service.ROLLUP_COLLECTION: rollups},
+    )
+
+    items = [
+        AdvisoryRequestSchema(
+            field_size_acres=acres,
+            crop_type=crop,
+            location_district="Pune",
+            state="Maharashtra",
+        )
+        for acres, crop in [(2, "wheat"), (3, "rice"), (4, "wheat"), (5, "wheat")]
+    ]
+
+    async def main():
+        results = await analyze_advisory_batch(items, farmer_id="f1")
+        await drain_rollups()
+        return results
+
+    results = asyncio.run(main())
+
+    # Item 1 is unsupported, so docs are items 0, 2, 3 and doc 1 is item 2
+    assert results[1] == {"index": 1, "error": "Crop not supported"}
+    assert results[2] == {"index": 2, "error": "Advisory could not be saved"}
+    assert [result["residue_estimate_tons"] for result in (results[0], results[3])] == [3.0, 7.5]
+
+    assert [doc["field_size_acres"] for doc in advisories.docs] == [2, 5]
+    assert sum(update._doc["$inc"]["advisories"] for update in rollups.updates) == 2
@@ -0,0 +1,90 @@
+# tests/test_advisory_memo.py
+
+import asyncio
+
+import pytest
+
+from app.schemas.advisory_schema import AdvisoryRequestSchema
+from app.services import advisory_service
+from app.services.advisory_service import (
+    advisory_memo,
+    analyze_field,
+    build_recommendations,
+)
+from app.services.reference_data import get_snapshot
+
+
+DISTRICT = "Pune"
+
+
+@pytest.fixture(autouse=True)
+def crop_ratios(monkeypatch):
+    async def resolve(crop_types):
+        return {name: 1.0 for name in crop_types if name == "wheat"}
+
+    monkeypatch.setattr(advisory_service, "resolve_crop_ratios", resolve)
+    advisory_memo.clear()
+    yield
+    advisory_memo.clear()
+
+
+def analyze(acres, **options):
+    payload = AdvisoryRequestSchema(
+        field_size_acres=acres,
+        crop_type="wheat",
+        location_district=DISTRICT,
+        state="Maharashtra",
+    )
+    return asyncio.run(analyze_field(payload, **options))
+
+
+@pytest.mark.parametrize("acres", [0.004, 0.01, 0.5, 1, 7.35, 100, 12345.67])
+@pytest.mark.parametrize("profile", [None, "quick_payback"])
+def test_memo_matches_direct_computation(acres, profile):
+    # Warm the memo at another size first, so this call is a hit
+    analyze(3.0, weight_profile=profile)
+
+    residue_tons, recommendations = analyze(acres, weight_profile=profile)
+
+    assert residue_tons == round(acres, 2)
+    assert recommendations == build_recommendations(residue_tons, DISTRICT, profile)
+    assert advisory_memo.stats()["hits"] >= 1
+
+
+def test_empty_field_has_no_irr():
+    residue_tons, recommendations = analyze(0.004)
+
+    assert residue_tons == 0.0
+    assert all(rec["irr"] is None for rec in recommendations)
+    assert all(rec["break_even_months"] == 0 for rec in recommendations)
+
+
+def test_pareto_only_shares_the_memo_entry():
+    analyze(2.0)
+    _, front = analyze(5.0, pareto_only=True)
+
+    assert front == build_recommendations(5.0, DISTRICT, pareto_only=True)
+    assert advisory_memo.stats()["size"] == 1
+    assert {rec["type"] for rec in front} <= set(get_snapshot().alternative_types)
+
+
+def test_memo_disabled_computes_directly(monkeypatch):
+    monkeypatch.setattr(advisory_service.settings, "ADVISORY_MEMO_ENABLED", False)
+    monkeypatch.setattr(
+        "app.services.residue_service.resolve_crop_ratios",
+        advisory_service.resolve_crop_ratios,
+    )
+
+    residue_tons, recommendations = analyze(7.35)
+
+    assert residue_tons == 7.35
+    assert recommendations == build_recommendations(7.35, DISTRICT)
+    assert advisory_memo.stats()["size"] == 0
+
+    with pytest.raises(ValueError):
+        asyncio.run(analyze_field(AdvisoryRequestSchema(
+            field_size_acres=1,
+            crop_type="rice",
+            location_district=DISTRICT,
+            state="Maharashtra",
+        )))
@@ -0,0 +1,69 @@
+# tests/test_cashflow_service.py
+
+import numpy as np
+import pytest
+
+from app.services.cashflow_service import CashFlowModel
+from app.services.reference_data import DEFAULT_TABLES
+
+
+@pytest.fixture
+def model():
+    return CashFlowModel(DEFAULT_TABLES["cashflow"])
+
+
+def _monthly(annual_irr: np.ndarray) -> np.ndarray:
+    return (1 + annual_irr) ** (1 / 12) - 1
+
+
+def test_series_adds_up_to_profit(model):
+    setup = np.array([[3000.0, 2000.0]])
+    sale = np.array([[5500.0, 1500.0]])
+    carbon = np.array([[240.0, 0.0]])
+
+    cash = model.series(setup, sale, carbon)
+
+    assert cash.shape == (1, 2, model.horizon)
+    np.testing.assert_allclose(cash.sum(axis=-1), sale + carbon - setup)
+
+
+def test_irr_zeroes_npv(model):
+    rng = np.random.default_rng(0)
+    setup = rng.uniform(500, 5000, size=(50, 4))
+    sale = setup * rng.uniform(0.5, 3.0, size=(50, 4))
+    carbon = rng.uniform(0, 300, size=(50, 4))
+
+    cash = model.series(setup, sale, carbon)
+    irr = model.irr(cash)
+
+    valid = ~np.isnan(irr)
+    assert valid.all()
+
+    discount = (1 + _monthly(irr))[..., None] ** -model.months
+    residual = (cash * discount).sum(axis=-1)
+
+    np.testing.assert_allclose(residual, 0.0, atol=1e-6 * setup.max())
+
+
+def test_irr_is_nan_without_sign_change(model):
+    cash = np.array([[100.0] * model.horizon, [-100.0] * model.horizon])
+
+    assert np.isnan(model.irr(cash)).all()
+
+
+def test_break_even_month(model):
+    horizon = model.horizon
+    cash = np.zeros((3, horizon))
+
+    # Recovered in month 3
+    cash[0, 0], cash[0, 3] = -100, 150
+    # Recovered exactly in the last month
+    cash[1, 0], cash[1, -1] = -100, 100
+    # Never recovered
+    cash[2, 0], cash[2, 1] = -100, 50
+
+    months = model.break_even_month(cash)
+
+    assert months[0] == 3
+    assert months[1] == horizon - 1
+    assert np.isnan(months[2])
@@ -0,0 +1,79 @@
+# tests/test_database.py
+
+import asyncio
+import json
+
+import pytest
+from pymongo.errors import ServerSelectionTimeoutError
+
+from app.core import database
+from app.main import ready
+
+
+class FakeAdmin:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.pings = 0
+
+    async def command(self, name):
+        self.pings += 1
+        if self.failures:
+            self.failures -= 1
+            raise ServerSelectionTimeoutError("no primary")
+        return {"ok": 1}
+
+
+class FakeClient:
+    def __init__(self, failures=0):
+        self.admin = FakeAdmin(failures)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeClient()
+    monkeypatch.setattr(database, "client", fake)
+    monkeypatch.setattr(database, "warm_up_error", None)
+    return fake
+
+
+def probe():
+    response = asyncio.run(ready())
+    if isinstance(response, dict):
+        return 200, response
+    return response.status_code, json.loads(response.body)
+
+
+def test_warm_up_failure_is_recorded(client):
+    client.admin.failures = 1
+
+    assert asyncio.run(database.warm_up_pool()) is False
+    assert "no primary" in database.warm_up_error
+
+
+def test_ready_retries_a_failed_warm_up(client, monkeypatch):
+    monkeypatch.setattr(database, "warm_up_error", "ServerSelectionTimeoutError: no primary")
+    # The probe's own ping passes, the warm-up retry fails once
+    async def failing_warm_up():
+        database.warm_up_error = "AutoReconnect: reset"
+        return False
+
+    monkeypatch.setattr("app.main.warm_up_pool", failing_warm_up)
+    status, body = probe()
+
+    assert status == 503
+    assert body == {"status": "warming", "database": "up", "warm_up_error": "AutoReconnect: reset"}
+
+    monkeypatch.setattr("app.main.warm_up_pool", database.warm_up_pool)
+    status, body = probe()
+
+    assert status == 200
+    assert database.warm_up_error is None
+
+
+def test_ready_reports_database_down(client):
+    client.admin.failures = 1
+
+    status, body = probe()
+
+    assert status == 503
+    assert body["database"] == "down"
@@ -0,0 +1,144 @@
+# tests/test_demand_service.py
+
+import numpy as np
+import pytest
+
+from app.services import demand_service
+from app.services.demand_service import (
+    ACCEPTED,
+    BIDS,
+    LISTINGS,
+    DemandCounters,
+    demand_generation,
+    demand_score,
+)
+
+
+KEY = ("Pune", "biochar")
+OTHER = ("Nashik", "pellets")
+
+
+@pytest.fixture
+def scores(monkeypatch):
+    monkeypatch.setattr(demand_service, "_scores", {})
+
+
+# ---------------------------------------------------------
+# Ring Buffers
+# ---------------------------------------------------------
+
+def test_totals_cover_the_window():
+    counters = DemandCounters(window_days=3)
+
+    counters.add(KEY, BIDS, 1.0, day=8)
+    counters.add(KEY, BIDS, 2.0, day=9)
+    counters.add(KEY, BIDS, 4.0, day=10)
+    counters.add(KEY, LISTINGS, 1.0, day=10)
+
+    assert counters.totals(10)[0].tolist() == [1.0, 7.0, 0.0]
+
+    # Days age out of the window without any new event
+    assert counters.totals(11)[0].tolist() == [1.0, 6.0, 0.0]
+    assert counters.totals(12)[0].tolist() == [1.0, 4.0, 0.0]
+    assert counters.totals(13)[0].tolist() == [0.0, 0.0, 0.0]
+
+
+def test_event_older_than_window_is_dropped():
+    counters = DemandCounters(window_days=3)
+
+    counters.add(KEY, BIDS, 1.0, day=10)
+    counters.add(KEY, BIDS, 5.0, day=7)
+
+    # A late event still inside the window counts
+    counters.add(KEY, BIDS, 2.0, day=8)
+
+    assert counters.totals(10)[0, BIDS] == 3.0
+
+
+def test_gap_longer_than_window_clears_every_bucket():
+    counters = DemandCounters(window_days=3)
+
+    for day in (8, 9, 10):
+        counters.add(KEY, ACCEPTED, 10.0, day=day)
+
+    counters.add(KEY, ACCEPTED, 1.0, day=20)
+
+    assert counters.counts[0, ACCEPTED].sum() == 1.0
+    assert counters.totals(20)[0, ACCEPTED] == 1.0
+    assert counters.last_day[0] == 20
+
+
+def test_capacity_grows_and_keeps_counts():
+    counters = DemandCounters(window_days=3, capacity=2)
+
+    keys = [("D%d" % i, "biochar") for i in range(5)]
+    for i, key in enumerate(keys):
+        counters.add(key, BIDS, float(i + 1), day=10)
+
+    assert len(counters.counts) >= 5
+    assert len(counters.last_day) == len(counters.counts)
+    assert counters.totals(10)[:, BIDS].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_load_arrays_round_trip(tmp_path):
+    counters = DemandCounters(window_days=3)
+    counters.add(KEY, BIDS, 2.0, day=9)
+    counters.add(OTHER, LISTINGS, 1.0, day=10)
+    counters.add(OTHER, ACCEPTED, 12.5, day=10)
+
+    path = tmp_path / "counters.npz"
+    np.savez(path, **counters.arrays())
+
+    restored = DemandCounters(window_days=3)
+    with np.load(path) as data:
+        restored.load_arrays(data)
+
+    assert restored.keys == counters.keys
+    assert restored.index == counters.index
+    np.testing.assert_array_equal(restored.totals(10), counters.totals(10))
+
+    # Restored counters keep rolling like the originals
+    restored.add(KEY, BIDS, 1.0, day=11)
+    counters.add(KEY, BIDS, 1.0, day=11)
+    np.testing.assert_array_equal(restored.totals(11), counters.totals(11))
+
+
+def test_load_arrays_rejects_another_window():
+    counters = DemandCounters(window_days=3)
+    counters.add(KEY, BIDS, 1.0, day=10)
+
+    with pytest.raises(ValueError):
+        DemandCounters(window_days=5).load_arrays(counters.arrays())
+
+
+# ---------------------------------------------------------
+# Generation
+# ---------------------------------------------------------
+
+def test_generation_follows_price_levels(scores):
+    start = demand_generation()
+
+    demand_service._set_scores({KEY: (0.2, 100.0)})
+    assert demand_generation() == start + 1
+
+    # Served at once, but priced at the same demand level
+    before = demand_score(*KEY)
+    demand_service._set_scores({KEY: (0.2005, 100.0)})
+    assert demand_score(*KEY) > before
+    assert demand_generation() == start + 1
+
+    demand_service._set_scores({KEY: (0.5, 100.0)})
+    assert demand_generation() == start + 2
+
+    # Losing all evidence falls back to the prior's level
+    demand_service._set_scores({})
+    assert demand_generation() == start + 3
+
+
+def test_scores_at_the_prior_level_do_not_bump(scores):
+    start = demand_generation()
+    prior = demand_service.get_snapshot().district_demand["Pune"]["biochar"]
+
+    demand_service._set_scores({KEY: (prior, 100.0)})
+
+    assert demand_generation() == start
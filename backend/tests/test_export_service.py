@@ -0,0 +1,62 @@
+# tests/test_export_service.py
+
+import asyncio
+import gzip
+import json
+import zlib
+
+import pytest
+from bson import ObjectId
+
+from app.core.config import settings
+from app.services.export_service import _csv_chunks, _gzip, _ndjson_chunks
+
+
+async def docs(count):
+    for n in range(count):
+        yield {"_id": ObjectId(), "n": n, "pad": "x" * 100}
+
+
+def collect(chunks):
+    async def main():
+        return [chunk async for chunk in chunks]
+
+    return asyncio.run(main())
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 20)
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_BYTES", 2000)
+
+
+def test_ndjson_sends_first_row_then_flushes_on_size():
+    chunks = collect(_ndjson_chunks(docs(50)))
+
+    # One row, then ~2000-byte chunks well below EXPORT_BATCH_SIZE rows
+    assert [chunk.count(b"\n") for chunk in chunks] == [1, 13, 13, 13, 10]
+    assert [json.loads(line)["n"] for line in b"".join(chunks).splitlines()] == list(range(50))
+
+
+def test_ndjson_flushes_on_batch_size(monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_BYTES", 10 ** 6)
+
+    chunks = collect(_ndjson_chunks(docs(50)))
+
+    assert [chunk.count(b"\n") for chunk in chunks] == [1, 20, 20, 9]
+
+
+def test_csv_sends_header_and_first_row_early():
+    chunks = collect(_csv_chunks(docs(30), ["id", "n"]))
+
+    assert chunks[0] == b"id,n\r\n"
+    assert chunks[1].count(b"\n") == 1
+    assert b"".join(chunks).count(b"\n") == 31
+
+
+def test_gzip_emits_the_first_row_without_waiting():
+    chunks = collect(_gzip(_ndjson_chunks(docs(50))))
+
+    first = zlib.decompressobj(wbits=31).decompress(chunks[0])
+    assert json.loads(first)["n"] == 0
+    assert len(gzip.decompress(b"".join(chunks)).splitlines()) == 50
@@ -0,0 +1,129 @@
+# tests/test_online_prices.py
+
+import math
+
+import pytest
+
+from app.core.config import settings
+from app.ml import online_prices
+from app.ml.online_prices import ADJUSTMENT_STEP, OnlinePriceStats, apply_corrections
+from app.ml.price_table import PriceTable, get_price_table
+from app.services.reference_data import get_snapshot
+
+
+KEY = ("Pune", "biochar")
+HOUR = 3600.0
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = OnlinePriceStats(
+        half_life_seconds=HOUR,
+        prior_weight=0.0,
+        max_ratio=3.0,
+    )
+    monkeypatch.setattr(online_prices, "online_prices", stats)
+    return stats
+
+
+@pytest.fixture
+def table():
+    return PriceTable(get_snapshot(), settings.PRICE_TABLE_DEMAND_LEVELS)
+
+
+def served(table):
+    return table.adjustment[table.district_index["Pune"], table.type_index["biochar"]]
+
+
+def test_adjustments_move_in_steps(stats, table, monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr(online_prices.time, "time", lambda: now)
+
+    stats.state[KEY] = [math.log(1.2), 100.0, now]
+    assert apply_corrections(table)
+    assert served(table) == pytest.approx(1.2)
+
+    # Within the step: served price stays put
+    stats.state[KEY] = [math.log(1.2 * (1 + ADJUSTMENT_STEP / 2)), 100.0, now]
+    assert not apply_corrections(table)
+    assert served(table) == pytest.approx(1.2)
+
+    stats.state[KEY] = [math.log(1.2 * (1 + 2 * ADJUSTMENT_STEP)), 100.0, now]
+    assert apply_corrections(table)
+    assert served(table) == pytest.approx(1.2 * (1 + 2 * ADJUSTMENT_STEP))
+
+
+# ---------------------------------------------------------
+# OnlinePriceStats
+# ---------------------------------------------------------
+
+def test_update_decays_older_observations():
+    stats = OnlinePriceStats(half_life_seconds=HOUR, prior_weight=0.0, max_ratio=3.0)
+
+    stats.update(KEY, 0.2, now=0.0)
+    stats.update(KEY, -0.1, now=HOUR)
+
+    mean, weight, last = stats.state[KEY]
+
+    # The first observation counts half after one half-life
+    assert weight == pytest.approx(1.5)
+    assert mean == pytest.approx((0.2 * 0.5 - 0.1) / 1.5)
+    assert last == HOUR
+
+
+def test_out_of_order_update_does_not_decay():
+    stats = OnlinePriceStats(half_life_seconds=HOUR, prior_weight=0.0, max_ratio=3.0)
+
+    stats.update(KEY, 0.2, now=HOUR)
+    stats.update(KEY, 0.4, now=0.0)
+
+    mean, weight, last = stats.state[KEY]
+    assert weight == pytest.approx(2.0)
+    assert mean == pytest.approx(0.3)
+    assert last == HOUR
+
+
+def test_correction_is_shrunk_towards_zero():
+    stats = OnlinePriceStats(half_life_seconds=HOUR, prior_weight=5.0, max_ratio=3.0)
+
+    for _ in range(5):
+        correction = stats.update(KEY, 0.3, now=0.0)
+
+    assert correction == pytest.approx(0.3 * 5 / (5 + 5))
+    assert stats.correction(KEY, now=0.0) == pytest.approx(correction)
+
+    # Weight decays while no bids arrive, so the shrink grows
+    assert stats.correction(KEY, now=HOUR) == pytest.approx(0.3 * 2.5 / (2.5 + 5))
+    assert stats.correction(("Pune", "pellets"), now=0.0) == 0.0
+
+
+def test_update_clips_outliers():
+    stats = OnlinePriceStats(half_life_seconds=HOUR, prior_weight=0.0, max_ratio=3.0)
+
+    assert stats.update(KEY, math.log(100.0), now=0.0) == pytest.approx(math.log(3.0))
+
+
+def test_checkpoint_round_trip():
+    stats = OnlinePriceStats(half_life_seconds=HOUR, prior_weight=5.0, max_ratio=3.0)
+    stats.update(KEY, 0.3, now=10.0)
+
+    restored = OnlinePriceStats(half_life_seconds=HOUR, prior_weight=5.0, max_ratio=3.0)
+    restored.load_dict(stats.to_dict())
+
+    assert restored.state == stats.state
+
+
+# ---------------------------------------------------------
+# Model swaps
+# ---------------------------------------------------------
+
+def test_model_swap_drops_stats(stats, monkeypatch):
+    stats.state[KEY] = [0.2, 10.0, 0.0]
+    monkeypatch.setattr(online_prices, "_basis", object())
+    monkeypatch.setattr(online_prices, "_watermark", online_prices.EPOCH)
+
+    online_prices._apply_to_current(get_snapshot())
+
+    assert stats.state == {}
+    assert online_prices._watermark is None
+    assert online_prices._basis is get_price_table().model
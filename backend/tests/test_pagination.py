@@ -0,0 +1,60 @@
+# tests/test_pagination.py
+
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.core.config import settings
+from app.utils.pagination import (
+    clamp_page_size,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+)
+
+
+def test_cursor_round_trip():
+    doc = {"_id": ObjectId(), "created_at": datetime(2026, 3, 4, 5, 6, 7, 890000)}
+
+    token = encode_cursor(doc, "created_at")
+
+    assert "=" not in token
+    assert decode_cursor(token, "created_at") == (doc["created_at"], doc["_id"])
+
+
+def test_cursor_without_sort_field():
+    doc = {"_id": ObjectId()}
+
+    assert decode_cursor(encode_cursor(doc, None), None) == (None, doc["_id"])
+
+
+@pytest.mark.parametrize("token", ["", "not-a-cursor", "eyJpZCI6Inh4In0"])
+def test_invalid_cursor_raises_value_error(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token, "created_at")
+
+
+def test_keyset_filter_continues_after_last_item():
+    doc = {"_id": ObjectId(), "created_at": datetime(2026, 1, 1)}
+    token = encode_cursor(doc, "created_at")
+
+    query = keyset_filter({"status": "open"}, token, "created_at")
+
+    assert query == {"$and": [
+        {"status": "open"},
+        {"$or": [
+            {"created_at": {"$lt": doc["created_at"]}},
+            {"created_at": doc["created_at"], "_id": {"$lt": doc["_id"]}},
+        ]},
+    ]}
+
+
+def test_keyset_filter_without_cursor_is_unchanged():
+    assert keyset_filter({"status": "open"}, None, "created_at") == {"status": "open"}
+
+
+def test_clamp_page_size():
+    assert clamp_page_size(None) == settings.PAGE_SIZE_DEFAULT
+    assert clamp_page_size(0) == settings.PAGE_SIZE_DEFAULT
+    assert clamp_page_size(10 ** 9) == settings.PAGE_SIZE_MAX
@@ -0,0 +1,122 @@
+# tests/test_ranking_service.py
+
+import numpy as np
+import pytest
+
+from app.services.ranking_service import (
+    OBJECTIVES,
+    pareto_front,
+    rank_matrix,
+    score_matrix,
+    top_k,
+)
+
+
+def _metrics(rng, rows, cols, levels=4):
+    # Few distinct values so ties and equal objectives are common
+    return {
+        name: rng.integers(0, levels, size=(rows, cols)).astype(float)
+        for name in ("profit", "break_even", "co2", "irr")
+    }
+
+
+# ---------------------------------------------------------
+# top_k
+# ---------------------------------------------------------
+
+@pytest.mark.parametrize("k", [None, 1, 2, 3, 5, 8, 20])
+def test_top_k_matches_stable_argsort(k):
+    rng = np.random.default_rng(1)
+    scores = rng.integers(0, 5, size=(200, 8)).astype(float)
+
+    expected = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+
+    np.testing.assert_array_equal(top_k(scores, k), expected)
+
+
+def test_top_k_pushes_excluded_to_the_end():
+    scores = np.array([[-np.inf, 3.0, -np.inf, 3.0, 1.0]])
+
+    np.testing.assert_array_equal(top_k(scores, 3), [[1, 3, 4]])
+
+
+# ---------------------------------------------------------
+# pareto_front
+# ---------------------------------------------------------
+
+def _brute_force_front(metrics, objectives, row):
+    oriented = [
+        [metrics[name][row, col] * OBJECTIVES[name] for name in objectives]
+        for col in range(metrics[objectives[0]].shape[1])
+    ]
+
+    def dominates(a, b):
+        return all(x >= y for x, y in zip(a, b)) and any(x > y for x, y in zip(a, b))
+
+    return [
+        not any(dominates(other, candidate) for other in oriented)
+        for candidate in oriented
+    ]
+
+
+@pytest.mark.parametrize("objectives", [
+    ["profit"],
+    ["profit", "break_even"],
+    ["profit", "break_even", "co2", "irr"],
+])
+def test_pareto_front_matches_brute_force(objectives):
+    rng = np.random.default_rng(2)
+    metrics = _metrics(rng, 100, 6)
+
+    front = pareto_front(metrics, objectives)
+
+    for row in range(100):
+        assert front[row].tolist() == _brute_force_front(metrics, objectives, row)
+
+
+def test_pareto_front_keeps_at_least_one_per_row():
+    rng = np.random.default_rng(3)
+    metrics = _metrics(rng, 100, 5, levels=2)
+
+    assert pareto_front(metrics, list(metrics)).any(axis=1).all()
+
+
+# ---------------------------------------------------------
+# Scores & Ranking
+# ---------------------------------------------------------
+
+def test_missing_values_rank_below_the_worst():
+    # NaN break-even (never reached) must not tie with the slowest payback
+    metrics = {"break_even": np.array([[np.nan, 3.0, 3.0, 7.0]])}
+
+    scores = score_matrix(metrics, {"break_even": 1.0})
+
+    assert scores[0, 0] < scores[0, 3] < scores[0, 1]
+
+
+def test_rank_matrix_pareto_only_masks_dominated():
+    metrics = {
+        "profit": np.array([[10.0, 5.0, 10.0]]),
+        "co2": np.array([[1.0, 0.5, 2.0]]),
+    }
+
+    scores, order, keep = rank_matrix(
+        metrics, {"profit": 0.5, "co2": 0.5}, top_n=3, pareto_only=True,
+    )
+
+    assert order[0, 0] == 2
+    assert [int(c) for c, k in zip(order[0], keep[0]) if k] == [2]
+
+
+def test_rank_matrix_order_follows_scores():
+    rng = np.random.default_rng(4)
+    metrics = _metrics(rng, 50, 6)
+    weights = {"profit": 0.4, "break_even": 0.3, "co2": 0.3}
+
+    scores, order, keep = rank_matrix(metrics, weights, top_n=4)
+
+    assert keep.all()
+    ranked = np.take_along_axis(scores, order, axis=1)
+    assert (np.diff(ranked, axis=1) <= 0).all()
+
+    np.testing.assert_array_equal(ranked[:, 0], scores.max(axis=1))
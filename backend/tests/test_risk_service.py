@@ -0,0 +1,77 @@
+# tests/test_risk_service.py
+
+import asyncio
+from dataclasses import replace
+
+import pytest
+
+from app.core.config import settings
+from app.services.advisory_service import build_recommendations
+from app.services.reference_data import get_snapshot
+from app.services.risk_service import (
+    _budget_samples,
+    simulate_risk,
+    simulate_risk_async,
+)
+
+
+@pytest.fixture
+def financials():
+    return {rec["type"]: rec for rec in build_recommendations(13.5, "Pune")}
+
+
+def test_budget_caps_samples_below_max():
+    affordable = int(
+        settings.RISK_LATENCY_BUDGET_MS * 1e6 / (settings.RISK_NS_PER_DRAW * 4)
+    )
+
+    assert affordable < settings.RISK_SAMPLES_MAX
+    assert _budget_samples(settings.RISK_SAMPLES_MAX, 4) == affordable
+    assert _budget_samples(None, 4) == min(settings.RISK_SAMPLES_DEFAULT, affordable)
+
+
+def test_same_seed_reproduces(financials):
+    first = simulate_risk(financials, 2000, seed=7)
+    second = simulate_risk(financials, 2000, seed=7)
+
+    assert first["alternatives"] == second["alternatives"]
+    assert first["samples"] == 2000
+
+
+def test_break_even_matches_cash_flow_model(financials):
+    # Without volatility every run is the deterministic case
+    snapshot = get_snapshot()
+    calm = replace(snapshot, risk={
+        **snapshot.risk,
+        "price_volatility": 0.0,
+        "yield_volatility": 0.0,
+        "cost_volatility": 0.0,
+    })
+
+    risk = simulate_risk(financials, 500, seed=1, snapshot=calm)
+
+    for alt, rec in financials.items():
+        result = risk["alternatives"][alt]
+        assert result["expected_break_even_months"] == rec["break_even_months"]
+        assert result["probability_of_break_even"] == 1.0
+        assert result["profit_p50"] == pytest.approx(rec["profit"], abs=0.01)
+
+
+def test_break_even_not_reached_is_none(financials):
+    losing = {
+        alt: {**rec, "expected_income": 0.0, "carbon_credit_income": 0.0}
+        for alt, rec in financials.items()
+    }
+
+    risk = simulate_risk(losing, 500, seed=1)
+
+    for result in risk["alternatives"].values():
+        assert result["expected_break_even_months"] is None
+        assert result["probability_of_break_even"] == 0.0
+        assert result["probability_of_loss"] == 1.0
+
+
+def test_async_matches_sync(financials):
+    risk = asyncio.run(simulate_risk_async(financials, 1000, seed=3))
+
+    assert risk["alternatives"] == simulate_risk(financials, 1000, seed=3)["alternatives"]
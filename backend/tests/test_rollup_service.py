@@ -0,0 +1,72 @@
+# tests/test_rollup_service.py
+
+import asyncio
+from datetime import datetime
+
+from app.services import advisory_service, rollup_service
+from app.services.advisory_service import persist_advisory
+from app.services.rollup_service import drain_rollups, rollup_match
+
+
+def test_rollup_match_truncates_both_bounds():
+    match = rollup_match(
+        district="Pune",
+        start=datetime(2026, 3, 1, 18, 30),
+        end=datetime(2026, 3, 31, 9, 15),
+    )
+
+    assert match == {
+        "district": "Pune",
+        "day": {"$gte": datetime(2026, 3, 1), "$lt": datetime(2026, 3, 31)},
+    }
+
+
+class FakeDatabase(dict):
+    __getattr__ = dict.__getitem__
+
+
+class FakeCollection:
+    def __init__(self, release=None):
+        self.release = release
+        self.docs = []
+        self.writes = []
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+    async def bulk_write(self, updates, ordered=False):
+        await self.release.wait()
+        self.writes.extend(updates)
+
+
+def test_rollups_are_updated_off_the_request_path(monkeypatch):
+    monkeypatch.setattr(advisory_service.settings, "ADVISORY_WRITE_BEHIND", False)
+
+    async def main():
+        advisories = FakeCollection()
+        rollups = FakeCollection(asyncio.Event())
+
+        monkeypatch.setattr(advisory_service, "get_database", lambda: FakeDatabase(advisories=advisories))
+        monkeypatch.setattr(
+            rollup_service, "get_database",
+            lambda: {rollup_service.ROLLUP_COLLECTION: rollups},
+        )
+
+        doc = {
+            "created_at": datetime(2026, 3, 1, 12),
+            "state": "Maharashtra",
+            "location_district": "Pune",
+            "recommendations": [],
+        }
+
+        # Returns while the rollup write is still blocked
+        await asyncio.wait_for(persist_advisory(doc), timeout=1)
+        assert advisories.docs == [doc]
+        assert rollups.writes == []
+
+        rollups.release.set()
+        await drain_rollups()
+
+        assert len(rollups.writes) == 1
+
+    asyncio.run(main())
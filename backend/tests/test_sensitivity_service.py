@@ -0,0 +1,178 @@
+# tests/test_sensitivity_service.py
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.schemas.advisory_schema import SensitivityRequestSchema
+from app.services import demand_service, sensitivity_service
+from app.services.advisory_service import build_recommendations
+from app.services.financial_service import get_financial_engine
+from app.services.reference_data import get_snapshot
+from app.services.sensitivity_service import _flips, sensitivity_sweep
+
+
+MONTH = 10
+RATIO = 1.5
+
+
+def request(**sweeps):
+    return SensitivityRequestSchema(
+        field_size_acres=9,
+        crop_type="wheat",
+        location_district="Pune",
+        state="Maharashtra",
+        **sweeps,
+    )
+
+
+# ---------------------------------------------------------
+# Flip Points
+# ---------------------------------------------------------
+
+def test_flips_along_each_axis():
+    best = np.array([
+        [0, 0, 1],
+        [0, 1, 1],
+    ])
+    axes = {"a": np.array([1.0, 2.0]), "b": np.array([10.0, 20.0, 30.0])}
+
+    assert _flips(best, axes, ["x", "y"]) == [
+        {"parameter": "a", "between": [1.0, 2.0], "from": "x", "to": "y", "at": {"b": 20.0}},
+        {"parameter": "b", "between": [20.0, 30.0], "from": "x", "to": "y", "at": {"a": 1.0}},
+        {"parameter": "b", "between": [10.0, 20.0], "from": "x", "to": "y", "at": {"a": 2.0}},
+    ]
+
+
+def test_flips_without_winner_change():
+    best = np.zeros((3, 2), dtype=int)
+    axes = {"a": np.arange(3.0), "b": np.arange(2.0)}
+
+    assert _flips(best, axes, ["x"]) == []
+
+
+def test_flips_are_capped(monkeypatch):
+    monkeypatch.setattr(sensitivity_service, "MAX_FLIPS", 2)
+
+    best = np.array([0, 1, 0, 1, 0])
+    axes = {"a": np.arange(5.0)}
+
+    flips = _flips(best, axes, ["x", "y"])
+
+    assert [flip["between"] for flip in flips] == [[0.0, 1.0], [1.0, 2.0]]
+
+
+# ---------------------------------------------------------
+# Tornado
+# ---------------------------------------------------------
+
+def _profit(column, demand, **values):
+    """
+    Biochar-targeted engine profit at baseline, with overrides.
+    """
+
+    baseline = {
+        "price_multiplier": 1.0,
+        "residue_ratio": RATIO,
+        "setup_cost_multiplier": 1.0,
+    }
+    baseline.update(values)
+
+    engine = get_financial_engine(get_snapshot())
+    target = np.array(engine.alternative_types) == "biochar"
+
+    fin = engine.compute(
+        np.array([round(9 * baseline["residue_ratio"], 2)]),
+        ["Pune"],
+        demand,
+        MONTH,
+        price_multiplier=np.where(target, baseline["price_multiplier"], 1.0)[None, :],
+        cost_multiplier=np.where(target, baseline["setup_cost_multiplier"], 1.0)[None, :],
+    )
+    return fin["profit"][0, column]
+
+
+def test_tornado_layout():
+    snapshot = get_snapshot()
+    column = snapshot.alternative_types.index("biochar")
+
+    result = sensitivity_sweep(
+        request(
+            target="biochar",
+            price_multiplier={"min": 0.5, "max": 1.2, "steps": 3},
+            setup_cost_multiplier={"min": 0.8, "max": 1.6, "steps": 2},
+        ),
+        RATIO,
+        MONTH,
+        snapshot,
+    )
+
+    tornado = result["tornado"]
+    bars = tornado["bars"]
+    demand = np.array([list(result["baseline"]["demand_score"].values())])
+
+    assert tornado["alternative"] == "biochar"
+    assert tornado["baseline_profit"] == pytest.approx(_profit(column, demand))
+
+    # Widest swing first, one bar per swept parameter
+    assert [bar["parameter"] for bar in bars] == ["price_multiplier", "setup_cost_multiplier"]
+    assert bars[0]["swing"] >= bars[1]["swing"]
+
+    price = bars[0]
+    assert (price["low"], price["high"]) == (0.5, 1.2)
+    assert price["profit_at_low"] == pytest.approx(_profit(column, demand, price_multiplier=0.5))
+    assert price["profit_at_high"] == pytest.approx(_profit(column, demand, price_multiplier=1.2))
+    assert price["swing"] == pytest.approx(abs(price["profit_at_high"] - price["profit_at_low"]))
+
+    cost = bars[1]
+    assert cost["profit_at_low"] > cost["profit_at_high"]
+
+
+def test_grid_shape_and_cap():
+    snapshot = get_snapshot()
+
+    result = sensitivity_sweep(
+        request(
+            price_multiplier={"min": 0.5, "max": 1.5, "steps": 4},
+            residue_ratio={"min": 1.0, "max": 2.0, "steps": 3},
+        ),
+        RATIO,
+        MONTH,
+        snapshot,
+    )
+
+    assert result["shape"] == [4, 3]
+    assert np.array(result["best_alternative"]).shape == (4, 3)
+
+    with pytest.raises(ValueError):
+        sensitivity_sweep(
+            request(
+                price_multiplier={"min": 0.5, "max": 1.5, "steps": 1000},
+                residue_ratio={"min": 1.0, "max": 2.0, "steps": 1000},
+            ),
+            RATIO,
+            MONTH,
+            snapshot,
+        )
+
+
+def test_baseline_prices_with_live_demand(monkeypatch):
+    # Live demand well below the district_demand prior
+    monkeypatch.setattr(demand_service, "_scores", {("Pune", "biochar"): (0.1, 500.0)})
+    snapshot = get_snapshot()
+
+    result = sensitivity_sweep(
+        request(target="biochar", price_multiplier={"min": 0.5, "max": 1.5, "steps": 3}),
+        RATIO,
+        datetime.utcnow().month,
+        snapshot,
+    )
+
+    advisory = {
+        rec["type"]: rec
+        for rec in build_recommendations(round(9 * RATIO, 2), "Pune")
+    }
+
+    assert result["baseline"]["demand_score"]["biochar"] < 0.2
+    assert result["tornado"]["baseline_profit"] == advisory["biochar"]["profit"]
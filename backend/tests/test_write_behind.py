@@ -0,0 +1,163 @@
+# tests/test_write_behind.py
+
+import asyncio
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from app.services import write_behind
+from app.services.write_behind import DUPLICATE_KEY, WriteBehindQueue
+
+
+class FakeCollection:
+    """
+    insert_many that replays a script of failures, then stores.
+    """
+
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.docs = {}
+        self.calls = 0
+
+    async def insert_many(self, docs, ordered=False):
+        self.calls += 1
+
+        for doc in docs:
+            doc.setdefault("_id", ObjectId())
+
+        failure = self.failures.pop(0) if self.failures else None
+        if isinstance(failure, Exception):
+            raise failure
+
+        errors = []
+        for i, doc in enumerate(docs):
+            if doc["_id"] in self.docs:
+                errors.append({"index": i, "code": DUPLICATE_KEY})
+            elif failure and i in failure:
+                errors.append({"index": i, "code": failure[i]})
+            else:
+                self.docs[doc["_id"]] = doc
+
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    col = FakeCollection()
+    monkeypatch.setattr(write_behind, "get_database", lambda: {"items": col})
+    return col
+
+
+def make_queue(**kwargs):
+    flushed = []
+
+    async def on_flush(docs):
+        flushed.extend(docs)
+
+    options = dict(
+        max_size=100,
+        batch_size=10,
+        flush_interval_seconds=0.01,
+        on_flush=on_flush,
+        retry_backoff_seconds=0.001,
+    )
+    options.update(kwargs)
+
+    return WriteBehindQueue("items", **options), flushed
+
+
+def run(queue, docs):
+    async def main():
+        queue.start()
+        for doc in docs:
+            await queue.put(doc)
+        await queue.stop()
+
+    asyncio.run(main())
+
+
+def test_transient_failure_is_retried(collection):
+    collection.failures = [AutoReconnect("down"), AutoReconnect("down")]
+    queue, flushed = make_queue()
+
+    run(queue, [{"n": i} for i in range(5)])
+
+    assert len(collection.docs) == 5
+    assert len(flushed) == 5
+    assert queue.retries == 2
+    assert queue.failed == 0
+
+
+def test_retries_are_bounded(collection):
+    collection.failures = [AutoReconnect("down")] * 3
+    queue, flushed = make_queue(max_retries=2)
+
+    run(queue, [{"n": i} for i in range(3)])
+
+    assert collection.docs == {}
+    assert flushed == []
+    assert queue.failed == 3
+
+
+def test_bulk_write_error_retries_only_transient_documents(collection):
+    # Doc 1 is rejected for good, doc 2 hits a retryable write error
+    collection.failures = [{1: 121, 2: 91}]
+    queue, flushed = make_queue()
+
+    run(queue, [{"n": i} for i in range(4)])
+
+    assert sorted(doc["n"] for doc in collection.docs.values()) == [0, 2, 3]
+    assert sorted(doc["n"] for doc in flushed) == [0, 2, 3]
+    assert queue.dropped == 1
+    assert queue.failed == 0
+
+
+def test_duplicate_on_retry_counts_as_written(collection):
+    docs = [{"n": i} for i in range(3)]
+    queue, flushed = make_queue()
+
+    async def landed_then_failed(batch, ordered=False):
+        # The write lands but the acknowledgement is lost
+        await FakeCollection.insert_many(collection, batch)
+        collection.insert_many = FakeCollection.insert_many.__get__(collection)
+        raise AutoReconnect("connection reset")
+
+    collection.insert_many = landed_then_failed
+
+    run(queue, docs)
+
+    assert len(collection.docs) == 3
+    assert len(flushed) == 3
+    assert queue.written == 3
+    assert queue.dropped == 0
+
+
+def test_stop_drains_blocked_puts(collection):
+    queue, flushed = make_queue(max_size=1, batch_size=1)
+
+    async def main():
+        queue.start()
+        puts = [asyncio.create_task(queue.put({"n": i})) for i in range(20)]
+        await asyncio.sleep(0)
+        await queue.stop()
+        await asyncio.gather(*puts)
+
+    asyncio.run(main())
+
+    assert len(collection.docs) == 20
+    assert queue.enqueued == queue.written == 20
+    assert not queue.running
+
+
+def test_put_after_stop_raises(collection):
+    queue, _ = make_queue()
+
+    async def main():
+        queue.start()
+        await queue.stop()
+        with pytest.raises(RuntimeError):
+            await queue.put({"n": 0})
+
+    asyncio.run(main())